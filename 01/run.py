@@ -1,10 +1,17 @@
 #!/usr/bin/env python
 
 import pathlib
+import random
 import re
-from typing import Callable
+import sys
+from typing import Callable, TextIO
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from aoc import inputs  # noqa: E402
+from aoc.output import print  # noqa: E402
+
+HERE = pathlib.Path(__file__).parent
 
 SPELLED_OUT_DIGITS = [
     "one",
@@ -33,6 +40,11 @@ DIGIT_MAP = {
 }
 DIGIT_MAP.update({str(i): str(i) for i in range(1, 10)})
 
+FIRST_DIGIT_PATTERN = re.compile(r"|".join(SPELLED_OUT_DIGITS) + r"|\d")
+LAST_DIGIT_PATTERN = re.compile(
+    r"|".join(SPELLED_OUT_DIGITS_REVERSED) + r"|\d"
+)
+
 
 def calibration_value(line: str) -> int:
     """For part 1."""
@@ -53,30 +65,73 @@ def calibration_value(line: str) -> int:
 def real_calibration_value(line: str) -> int:
     """For part 2."""
 
-    first = re.search(r"|".join(SPELLED_OUT_DIGITS) + r"|\d", line)
+    first = FIRST_DIGIT_PATTERN.search(line)
     assert first is not None
-    last = re.search(
-        r"|".join(SPELLED_OUT_DIGITS_REVERSED) + r"|\d", reverse_string(line)
-    )
+    last = LAST_DIGIT_PATTERN.search(reverse_string(line))
     assert last is not None
     return int(f"{DIGIT_MAP[first[0]]}{DIGIT_MAP[reverse_string(last[0])]}")
 
 
 def calibration_sum(
-    calibration_function: Callable[[str], int], path: str
+    calibration_function: Callable[[str], int], lines: list[str]
 ) -> int:
     answer = 0
-    for line in pathlib.Path(path).read_text().splitlines():
+    for line in lines:
         answer += calibration_function(line)
     return answer
 
 
+def parse(text: str) -> list[str]:
+    return text.splitlines()
+
+
+def part1(lines: list[str]) -> int:
+    return calibration_sum(calibration_value, lines)
+
+
+def part2(lines: list[str]) -> int:
+    return calibration_sum(real_calibration_value, lines)
+
+
+def solve_stream(stream: TextIO) -> dict[str, int]:
+    """Both parts in one pass over the lines of `stream`."""
+
+    answers = {"part1": 0, "part2": 0}
+    for line in inputs.iter_lines(stream):
+        answers["part1"] += calibration_value(line)
+        answers["part2"] += real_calibration_value(line)
+    return answers
+
+
+def generate(scale: int = 1, seed: int = 0) -> str:
+    """Synthetic input with `scale` times the lines of the real one."""
+
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    lines = []
+    for _ in range(1000 * scale):
+        pieces = []
+        for _ in range(rng.randint(2, 8)):
+            match rng.randint(0, 2):
+                case 0:
+                    pieces.append(rng.choice(SPELLED_OUT_DIGITS))
+                case 1:
+                    pieces.append(str(rng.randint(1, 9)))
+                case _:
+                    pieces.append("".join(rng.sample(letters, 3)))
+        # Part 1 needs at least one digit on every line
+        pieces.insert(rng.randint(0, len(pieces)), str(rng.randint(1, 9)))
+        lines.append("".join(pieces))
+    return "\n".join(lines)
+
+
 def main() -> None:
-    assert calibration_sum(calibration_value, "example1.txt") == 142
-    assert calibration_sum(real_calibration_value, "example2.txt") == 281
+    assert part1(parse((HERE / "example1.txt").read_text())) == 142
+    assert part2(parse((HERE / "example2.txt").read_text())) == 281
 
-    assert calibration_sum(calibration_value, "input.txt") == 54331
-    assert calibration_sum(real_calibration_value, "input.txt") == 54518
+    lines = parse((HERE / "input.txt").read_text())
+    assert part1(lines) == 54331
+    assert part2(lines) == 54518
     print("All tests passed.")
 
 
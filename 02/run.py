@@ -2,16 +2,27 @@
 
 import math
 import pathlib
+import random
 import re
-from typing import Generator
+import sys
+from typing import Generator, TextIO
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from aoc import inputs  # noqa: E402
+from aoc.output import print  # noqa: E402
+
+HERE = pathlib.Path(__file__).parent
 
 LIMITS = {"red": 12, "green": 13, "blue": 14}
 
 
-def read_games(path: str) -> list[str]:
-    return pathlib.Path(path).read_text().splitlines()
+def read_games(text: str) -> list[str]:
+    return text.splitlines()
+
+
+def parse(text: str) -> list[str]:
+    return read_games(text)
 
 
 def cube_counts(game_line: str) -> Generator[tuple[int, str], None, None]:
@@ -51,11 +62,38 @@ def part2(game_lines: list[str]) -> int:
     return answer
 
 
+def solve_stream(stream: TextIO) -> dict[str, int]:
+    """Both parts in one pass over the lines of `stream`."""
+
+    answers = {"part1": 0, "part2": 0}
+    for id_, game_line in enumerate(inputs.iter_lines(stream), start=1):
+        if game_possible(game_line):
+            answers["part1"] += id_
+        answers["part2"] += min_power(game_line)
+    return answers
+
+
+def generate(scale: int = 1, seed: int = 0) -> str:
+    """Synthetic input with `scale` times the games of the real one."""
+
+    rng = random.Random(seed)
+    lines = []
+    for id_ in range(1, 100 * scale + 1):
+        draws = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(list(LIMITS), rng.randint(1, 3))
+            draws.append(
+                ", ".join(f"{rng.randint(1, 20)} {color}" for color in colors)
+            )
+        lines.append(f"Game {id_}: " + "; ".join(draws))
+    return "\n".join(lines)
+
+
 def main() -> None:
-    game_lines = read_games("example.txt")
+    game_lines = read_games((HERE / "example.txt").read_text())
     assert part1(game_lines) == 8
     assert part2(game_lines) == 2286
-    game_lines = read_games("input.txt")
+    game_lines = read_games((HERE / "input.txt").read_text())
     assert part1(game_lines) == 2563
     assert part2(game_lines) == 70768
     print("All tests passed.")
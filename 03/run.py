@@ -2,157 +2,68 @@
 
 import collections
 import pathlib
+import random
 import re
-from typing import NamedTuple
+import sys
+from typing import Any, Callable, NamedTuple
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from aoc import synthetic  # noqa: E402
+from aoc.grid import Grid  # noqa: E402
+from aoc.output import print  # noqa: E402
+
+HERE = pathlib.Path(__file__).parent
+
+NUMBER_PATTERN = re.compile(rb"\d+")
+IS_SYMBOL = bytes(
+    not chr(byte).isdigit() and chr(byte) != "." for byte in range(256)
+)
 
 
 class Number(NamedTuple):
     value: int
-    starting_position: tuple[int, int]
+    starting_position: int
     num_digits: int
 
 
 class Symbol(NamedTuple):
     symbol: str
-    position: tuple[int, int]
+    position: int
+
+
+def read_grid(text: str) -> Grid:
+    # The "." border separates the rows, and is not a symbol
+    return Grid.from_text(text, border=".")
 
 
-def read_grid(path: str) -> list[str]:
-    return [row for row in pathlib.Path(path).read_text().splitlines()]
+def parse(text: str) -> Grid:
+    return read_grid(text)
 
 
-def extract_numbers_for_row(row: str, row_index: int) -> list[Number]:
+def extract_numbers(grid: Grid) -> list[Number]:
     return [
         Number(
             value=int(m[0]),
-            starting_position=(row_index, m.start(0)),
+            starting_position=m.start(0),
             num_digits=len(m[0]),
         )
-        for m in re.finditer(r"\d+", row)
+        for m in NUMBER_PATTERN.finditer(grid.cells)
     ]
 
 
-def extract_numbers(grid: list[str]) -> list[Number]:
-    numbers = []
-    for row_index, row in enumerate(grid):
-        numbers.extend(extract_numbers_for_row(row, row_index))
-    return numbers
-
-
-def is_symbol(string: str) -> bool:
-    return not string.isdigit() and string != "."
-
-
-def symbol_on_left(i: int, j: int, grid: list[str]) -> Symbol | None:
-    if j - 1 > 0 and is_symbol(grid[i][j - 1]):
-        return Symbol(grid[i][j - 1], (i, j - 1))
-    return None
-
-
-def symbol_on_top(i: int, j: int, grid: list[str]) -> Symbol | None:
-    if i - 1 > 0 and is_symbol(grid[i - 1][j]):
-        return Symbol(grid[i - 1][j], (i - 1, j))
-    return None
-
-
-def symbol_on_bottom(
-    i: int, j: int, grid: list[str], num_rows: int
-) -> Symbol | None:
-    if i + 1 < num_rows and is_symbol(grid[i + 1][j]):
-        return Symbol(grid[i + 1][j], (i + 1, j))
+def symbol_for_number(number: Number, grid: Grid) -> Symbol | None:
+    cells = grid.cells
+    left = number.starting_position - 1
+    right = number.starting_position + number.num_digits
+    for start in (left - grid.width, left, left + grid.width):
+        for position in range(start, start + right - left + 1):
+            if IS_SYMBOL[cells[position]]:
+                return Symbol(chr(cells[position]), position)
     return None
 
 
-def symbol_on_top_left(i: int, j: int, grid: list[str]) -> Symbol | None:
-    if i - 1 > 0 and j - 1 > 0 and is_symbol(grid[i - 1][j - 1]):
-        return Symbol(grid[i - 1][j - 1], (i - 1, j - 1))
-    return None
-
-
-def symbol_on_bottom_left(
-    i: int, j: int, grid: list[str], num_rows: int
-) -> Symbol | None:
-    if i + 1 < num_rows and j - 1 > 0 and is_symbol(grid[i + 1][j - 1]):
-        return Symbol(grid[i + 1][j - 1], (i + 1, j - 1))
-    return None
-
-
-def symbol_on_right(
-    i: int, j: int, grid: list[str], num_cols: int
-) -> Symbol | None:
-    if j + 1 < num_cols and is_symbol(grid[i][j + 1]):
-        return Symbol(grid[i][j + 1], (i, j + 1))
-    return None
-
-
-def symbol_on_top_right(
-    i: int, j: int, grid: list[str], num_cols: int
-) -> Symbol | None:
-    if i - 1 > 0 and j + 1 < num_cols and is_symbol(grid[i - 1][j + 1]):
-        return Symbol(grid[i - 1][j + 1], (i - 1, j + 1))
-    return None
-
-
-def symbol_on_bottom_right(
-    i: int, j: int, grid: list[str], num_rows: int, num_cols: int
-) -> Symbol | None:
-    if i + 1 < num_rows and j + 1 < num_cols and is_symbol(grid[i + 1][j + 1]):
-        return Symbol(grid[i + 1][j + 1], (i + 1, j + 1))
-    return None
-
-
-def symbol_for_number(number: Number, grid: list[str]) -> Symbol | None:
-    num_rows = len(grid)
-    num_cols = len(grid[0])
-
-    i, start_j = number.starting_position
-    n = number.num_digits
-
-    for j in range(start_j, start_j + n):
-        if j == start_j:
-            if symbol := symbol_on_left(i, j, grid):
-                return symbol
-            if symbol := symbol_on_top(i, j, grid):
-                return symbol
-            if symbol := symbol_on_bottom(i, j, grid, num_rows):
-                return symbol
-            if symbol := symbol_on_top_left(i, j, grid):
-                return symbol
-            if symbol := symbol_on_bottom_left(i, j, grid, num_rows):
-                return symbol
-            if n == 1:
-                if symbol := symbol_on_right(i, j, grid, num_cols):
-                    return symbol
-                if symbol := symbol_on_top_right(i, j, grid, num_cols):
-                    return symbol
-                if symbol := symbol_on_bottom_right(
-                    i, j, grid, num_rows, num_cols
-                ):
-                    return symbol
-        elif j == start_j + n - 1:
-            if symbol := symbol_on_right(i, j, grid, num_cols):
-                return symbol
-            if symbol := symbol_on_top(i, j, grid):
-                return symbol
-            if symbol := symbol_on_bottom(i, j, grid, num_rows):
-                return symbol
-            if symbol := symbol_on_top_right(i, j, grid, num_cols):
-                return symbol
-            if symbol := symbol_on_bottom_right(
-                i, j, grid, num_rows, num_cols
-            ):
-                return symbol
-        else:
-            if symbol := symbol_on_top(i, j, grid):
-                return symbol
-            if symbol := symbol_on_bottom(i, j, grid, num_rows):
-                return symbol
-    return None
-
-
-def part1(grid: list[str]) -> int:
+def part1(grid: Grid) -> int:
     answer = 0
     for number in extract_numbers(grid):
         if symbol_for_number(number, grid):
@@ -160,7 +71,7 @@ def part1(grid: list[str]) -> int:
     return answer
 
 
-def part2(grid: list[str]) -> int:
+def part2(grid: Grid) -> int:
     gears = collections.defaultdict(list)
     for number in extract_numbers(grid):
         if symbol := symbol_for_number(number, grid):
@@ -173,12 +84,43 @@ def part2(grid: list[str]) -> int:
     return answer
 
 
+def microbenchmarks(
+    grid: Grid,
+) -> dict[str, tuple[Callable[..., Any], list[tuple[Any, ...]]]]:
+    return {
+        "symbol_for_number": (
+            symbol_for_number,
+            [(number, grid) for number in extract_numbers(grid)],
+        )
+    }
+
+
+def generate(scale: int = 1, seed: int = 0) -> str:
+    """Synthetic schematic with `scale` times the cells of the real one."""
+
+    rng = random.Random(seed)
+    size = synthetic.side(140, scale)
+    rows = []
+    for _ in range(size):
+        row = ""
+        while len(row) < size:
+            match rng.choices(["number", "symbol", "."], [3, 1, 10])[0]:
+                case "number":
+                    row += str(rng.randint(1, 999)) + "."
+                case "symbol":
+                    row += rng.choice("*#+$/@=%&-")
+                case _:
+                    row += "."
+        rows.append(row[:size])
+    return "\n".join(rows)
+
+
 def main() -> None:
-    grid = read_grid("example.txt")
+    grid = read_grid((HERE / "example.txt").read_text())
     assert part1(grid) == 4361
     assert part2(grid) == 467835
 
-    grid = read_grid("input.txt")
+    grid = read_grid((HERE / "input.txt").read_text())
     assert part1(grid) == 529618
     assert part2(grid) == 77509019
 
@@ -1,13 +1,20 @@
 #!/usr/bin/env python
 
 import dataclasses
+import functools
 import pathlib
+import random
 import re
+import sys
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
+from aoc.output import print  # noqa: E402
 
-@dataclasses.dataclass
+HERE = pathlib.Path(__file__).parent
+
+
+@dataclasses.dataclass(slots=True)
 class Card:
     card_number: int
     num_winning_numbers: int
@@ -47,6 +54,13 @@ class Card:
         )
 
 
+@functools.cache
+def compile_pattern(num_winning_numbers, num_my_numbers) -> re.Pattern:
+    return re.compile(
+        build_pattern(num_winning_numbers, num_my_numbers), re.MULTILINE
+    )
+
+
 def build_pattern(num_winning_numbers, num_my_numbers) -> str:
     winning_numbers = "".join(
         [
@@ -67,13 +81,11 @@ def build_pattern(num_winning_numbers, num_my_numbers) -> str:
 
 
 def read_cards(
-    path: str, num_winning_numbers: int, num_my_numbers: int
+    text: str, num_winning_numbers: int, num_my_numbers: int
 ) -> dict[int, Card]:
     cards = {}
-    for m in re.finditer(
-        build_pattern(num_winning_numbers, num_my_numbers),
-        pathlib.Path(path).read_text(),
-        re.MULTILINE,
+    for m in compile_pattern(num_winning_numbers, num_my_numbers).finditer(
+        text
     ):
         card = Card.from_dict(
             m.groupdict(), num_winning_numbers, num_my_numbers
@@ -82,6 +94,14 @@ def read_cards(
     return cards
 
 
+def parse(text: str) -> dict[int, Card]:
+    first_line = text.split("\n", 1)[0]
+    winning_numbers, my_numbers = first_line.split(":")[1].split("|")
+    return read_cards(
+        text, len(winning_numbers.split()), len(my_numbers.split())
+    )
+
+
 def total_points(cards: dict[int, Card]) -> int:
     return sum(card.points for card in cards.values())
 
@@ -97,11 +117,50 @@ def processed_cards(cards: dict[int, Card]) -> int:
     return processed
 
 
+def part1(cards: dict[int, Card]) -> int:
+    return total_points(cards)
+
+
+def part2(cards: dict[int, Card]) -> int:
+    return processed_cards(cards)
+
+
+def generate(scale: int = 1, seed: int = 0) -> str:
+    """Synthetic input with `scale` times the cards of the real one.
+
+    Copies compound, so cards win less than one match on average to keep
+    the number of processed cards finite.
+    """
+
+    rng = random.Random(seed)
+    num_cards = 200 * scale
+    width = len(str(num_cards))
+    lines = []
+    for card_number in range(1, num_cards + 1):
+        winning_numbers = rng.sample(range(1, 100), 10)
+        num_matches = min(
+            0 if rng.random() < 0.7 else rng.randint(1, 4),
+            num_cards - card_number,
+        )
+        others = [n for n in range(1, 100) if n not in winning_numbers]
+        my_numbers = rng.sample(winning_numbers, num_matches) + rng.sample(
+            others, 25 - num_matches
+        )
+        rng.shuffle(my_numbers)
+        lines.append(
+            f"Card {card_number:>{width}}: "
+            + " ".join(f"{n:>2}" for n in winning_numbers)
+            + " | "
+            + " ".join(f"{n:>2}" for n in my_numbers)
+        )
+    return "\n".join(lines)
+
+
 def main() -> None:
-    cards = read_cards("example.txt", 5, 8)
+    cards = read_cards((HERE / "example.txt").read_text(), 5, 8)
     assert total_points(cards) == 13
     assert processed_cards(cards) == 30
-    cards = read_cards("input.txt", 10, 25)
+    cards = read_cards((HERE / "input.txt").read_text(), 10, 25)
     assert total_points(cards) == 20667
     processed_cards(cards) == 5833065
     print("All tests passed.")
@@ -1,13 +1,21 @@
 #!/usr/bin/env python
 
+import itertools
 import math
 import pathlib
+import random
+import sys
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
+from aoc import inputs  # noqa: E402
+from aoc.output import print  # noqa: E402
 
-def read_races(path):
-    times, distances = pathlib.Path(path).read_text().splitlines()
+HERE = pathlib.Path(__file__).parent
+
+
+def read_races(lines):
+    times, distances = lines
     times = [int(x) for x in times.split()[1:]]
     distances = [int(x) for x in distances.split()[1:]]
     races = []
@@ -16,8 +24,8 @@ def read_races(path):
     return races
 
 
-def read_race(path):
-    times, distances = pathlib.Path(path).read_text().splitlines()
+def read_race(lines):
+    times, distances = lines
     time = int(times.replace("Time:", "").replace(" ", ""))
     distance = int(distances.replace("Distance:", "").replace(" ", ""))
     return time, distance
@@ -40,27 +48,60 @@ def num_ways_to_win(time, distance):
     return wtw
 
 
-def part1(races):
+def parse(text):
+    lines = text.splitlines()
+    return read_races(lines), read_race(lines)
+
+
+def part1(document):
+    races, _ = document
     prod = 1
     for time, distance in races:
         prod *= num_ways_to_win(time, distance)
     return prod
 
 
-def part2(race):
-    time, distance = race
+def part2(document):
+    _, (time, distance) = document
     return num_ways_to_win(time, distance)
 
 
+def solve_stream(stream):
+    """Both parts from the two lines of `stream`, read as they come."""
+
+    lines = list(itertools.islice(inputs.iter_lines(stream), 2))
+    document = read_races(lines), read_race(lines)
+    return {"part1": part1(document), "part2": part2(document)}
+
+
+def generate(scale=1, seed=0):
+    """Synthetic document with `scale` times the races of the real one.
+
+    Part 2 joins all the numbers, so large scales exceed what the float
+    square root can represent.
+    """
+
+    rng = random.Random(seed)
+    times = []
+    distances = []
+    for _ in range(4 * scale):
+        time = rng.randint(7, 99)
+        hold = rng.randint(1, time - 1)
+        times.append(time)
+        distances.append(hold * (time - hold) - rng.randint(1, 5))
+    return (
+        "Time:     " + " ".join(f"{x:>4}" for x in times) + "\n"
+        "Distance: " + " ".join(f"{x:>4}" for x in distances) + "\n"
+    )
+
+
 def main():
-    races = read_races("example.txt")
-    assert part1(races) == 288
-    races = read_races("input.txt")
-    assert part1(races) == 440000
-    race = read_race("example.txt")
-    assert part2(race) == 71503
-    race = read_race("input.txt")
-    assert part2(race) == 26187338
+    document = parse((HERE / "example.txt").read_text())
+    assert part1(document) == 288
+    assert part2(document) == 71503
+    document = parse((HERE / "input.txt").read_text())
+    assert part1(document) == 440000
+    assert part2(document) == 26187338
     print("All tests passed.")
 
 
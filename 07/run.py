@@ -3,12 +3,18 @@
 import collections
 import dataclasses
 import pathlib
-from typing import ClassVar, Self
+import random
+import sys
+from typing import Any, Callable, ClassVar, Self
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
+from aoc.output import print  # noqa: E402
 
-@dataclasses.dataclass
+HERE = pathlib.Path(__file__).parent
+
+
+@dataclasses.dataclass(slots=True)
 class Card:
     label: str
     strength: int
@@ -26,7 +32,7 @@ def make_cards(labels: list[str]) -> dict[str, Card]:
     }
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Hand:
     cards: list[Card]
     bid: int
@@ -105,11 +111,14 @@ class Hand:
         )
 
 
-def read_hands(path: str) -> list[Hand]:
-    return [
-        Hand.from_line(line)
-        for line in pathlib.Path(path).read_text().splitlines()
-    ]
+class JokerHand(Hand):
+    __slots__ = ()
+
+    joker_rules: ClassVar[bool] = True
+
+
+def read_hands(text: str, hand_type: type[Hand] = Hand) -> list[Hand]:
+    return [hand_type.from_line(line) for line in text.splitlines()]
 
 
 def total_winnings(hands: list[Hand]) -> int:
@@ -119,16 +128,57 @@ def total_winnings(hands: list[Hand]) -> int:
     return w
 
 
+def parse(text: str) -> tuple[list[Hand], list[Hand]]:
+    return read_hands(text), read_hands(text, JokerHand)
+
+
+def part1(hands: tuple[list[Hand], list[Hand]]) -> int:
+    return total_winnings(hands[0])
+
+
+def part2(hands: tuple[list[Hand], list[Hand]]) -> int:
+    return total_winnings(hands[1])
+
+
+def microbenchmarks(
+    hands: tuple[list[Hand], list[Hand]],
+) -> dict[str, tuple[Callable[..., Any], list[tuple[Any, ...]]]]:
+    """Comparisons of consecutive hands, and the sorts of part 1 and 2."""
+
+    hands1, hands2 = hands
+    return {
+        "Hand.__lt__": (Hand.__lt__, list(zip(hands1, hands1[1:]))),
+        "JokerHand.__lt__": (JokerHand.__lt__, list(zip(hands2, hands2[1:]))),
+        "sorted(hands)": (sorted, [(hands1,), (hands2,)]),
+    }
+
+
+def generate(scale: int = 1, seed: int = 0) -> str:
+    """Synthetic input with `scale` times the hands of the real one.
+
+    Equal hands cannot be ordered, so at most 13**5 hands are possible.
+    """
+
+    rng = random.Random(seed)
+    num_hands = 1000 * scale
+    labels = list(Hand.all_cards)
+    if num_hands > len(labels) ** 5:
+        raise ValueError(f"at most {len(labels) ** 5} distinct hands")
+    hands: set[str] = set()
+    while len(hands) < num_hands:
+        hands.add("".join(rng.choices(labels, k=5)))
+    return "\n".join(f"{hand} {rng.randint(1, 1000)}" for hand in hands)
+
+
 def main() -> None:
-    hands = read_hands("example.txt")
+    hands = read_hands((HERE / "example.txt").read_text())
     assert total_winnings(hands) == 6440
-    hands = read_hands("input.txt")
+    hands = read_hands((HERE / "input.txt").read_text())
     assert total_winnings(hands) == 251806792
 
-    Hand.joker_rules = True
-    hands = read_hands("example.txt")
+    hands = read_hands((HERE / "example.txt").read_text(), JokerHand)
     assert total_winnings(hands) == 5905
-    hands = read_hands("input.txt")
+    hands = read_hands((HERE / "input.txt").read_text(), JokerHand)
     assert total_winnings(hands) == 252113488
 
     print("All tests passed.")
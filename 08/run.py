@@ -1,61 +1,260 @@
 #!/usr/bin/env python
 
+import itertools
 import math
 import pathlib
+import random
 import re
+import sys
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
+from aoc import graph  # noqa: E402
+from aoc.output import print  # noqa: E402
 
-def read_docs(path):
-    lines = pathlib.Path(path).read_text().splitlines()
-    instructions = list(lines[0])
-    map = {}
+HERE = pathlib.Path(__file__).parent
+
+
+def read_docs(text):
+    """The instructions, as 0 for left and 1 for right, and the network.
+
+    The network is a graph whose nodes have their left and then their
+    right neighbor as successors, with the node names in `nodes`.
+    """
+
+    lines = text.splitlines()
+    instructions = ["LR".index(instruction) for instruction in lines[0]]
+    nodes = graph.Interner()
+    edges = []
     for line in lines[2:]:
-        start, left, right = re.findall(r"[A-Z\d]{3}", line)
-        map[start] = (left, right)
-    return instructions, map
+        start, left, right = map(nodes.intern, re.findall(r"[A-Z\d]{3}", line))
+        edges += [(start, left), (start, right)]
+    return instructions, graph.Graph.from_edges(len(nodes), edges), nodes
+
+
+def instruction_steps(instructions, network):
+    """For each instruction, the node each node leads to."""
 
+    # Every node has two successors, so the left (right) successors of
+    # all the nodes are the even (odd) targets
+    successors = [network.targets[0::2], network.targets[1::2]]
+    return [successors[instruction] for instruction in instructions]
 
-def steps_to_first_end(instructions, map, start="AAA", part=1):
+
+def steps_to_first_end(instructions, network, start, is_end):
+    """Steps from the node `start` to the first node flagged in `is_end`."""
+
+    steps = instruction_steps(instructions, network)
     i, n, position = 0, len(instructions), start
     while True:
-        match instructions[i % n]:
-            case "R":
-                position = map[position][1]
-            case "L":
-                position = map[position][0]
+        position = steps[i % n][position]
         i += 1
-        match part:
-            case 1:
-                if position == "ZZZ":
-                    return i
-            case 2:
-                if position.endswith("Z"):
-                    return i
-
-
-def part2(instructions, map):
-    return math.lcm(
-        *[
-            steps_to_first_end(instructions, map, start=start, part=2)
-            for start in [node for node in map.keys() if node.endswith("A")]
+        if is_end[position]:
+            return i
+
+
+def flags(nodes, names):
+    is_end = bytearray(len(nodes))
+    for name in names:
+        is_end[nodes[name]] = 1
+    return is_end
+
+
+def parse(text):
+    return read_docs(text)
+
+
+def part1(docs):
+    instructions, network, nodes = docs
+    is_end = flags(nodes, ["ZZZ"])
+    return steps_to_first_end(instructions, network, nodes["AAA"], is_end)
+
+
+def walk(instructions, network, start, is_end):
+    """The trajectory of a ghost, observing whether it is on an end.
+
+    A state is the position of the ghost and the next instruction, as
+    `instruction * num_nodes + position`.
+    """
+
+    # Imported here to keep it out of the import time of the day
+    from aoc import cycles
+
+    steps = instruction_steps(instructions, network)
+    n, num_nodes = len(instructions), network.num_nodes
+
+    def step(state):
+        i, position = divmod(state, num_nodes)
+        position = steps[i][position]
+        return (i + 1) % n * num_nodes + position, is_end[position]
+
+    # The cycles run through the instructions many times, and the states
+    # are small, so the window covers them for a single pass
+    return cycles.detect(start, step, window=2**16, name="08 ghost steps")
+
+
+def merge_congruences(first, second):
+    """The congruence `x = r (mod m)` satisfying both, or None."""
+
+    (r1, m1), (r2, m2) = first, second
+    g = math.gcd(m1, m2)
+    if (r2 - r1) % g:
+        return None
+    t = (r2 - r1) // g * pow(m1 // g, -1, m2 // g) % (m2 // g)
+    m = m1 // g * m2
+    return (r1 + m1 * t) % m, m
+
+
+def first_common_end(trajectories):
+    """The first step at which every ghost is on an end.
+
+    Before the last of the ghosts enters its cycle, the steps are checked
+    one by one. After, a ghost on an end at step `k` of its cycle is on an
+    end again every period of its observations, so the steps at which all
+    of them are on an end solve one congruence per ghost. Raises
+    ValueError if there is no such step.
+    """
+
+    last_mu = max(trajectory.mu for trajectory in trajectories)
+    for k in range(1, last_mu + 1):
+        if all(trajectory.value_at(k) for trajectory in trajectories):
+            return k
+    ends = []
+    for trajectory in trajectories:
+        period = trajectory.observation_period()
+        ends.append(
+            [
+                (k, period)
+                for k in range(trajectory.mu + 1, trajectory.mu + period + 1)
+                if trajectory.value_at(k)
+            ]
+        )
+    first = None
+    for congruences in itertools.product(*ends):
+        merged = (0, 1)
+        for congruence in congruences:
+            merged = merge_congruences(merged, congruence)
+            if merged is None:
+                break
+        else:
+            r, m = merged
+            # The first solution past every ghost's mu
+            k = r + (last_mu + 1 - r + m - 1) // m * m if r <= last_mu else r
+            if first is None or k < first:
+                first = k
+    if first is None:
+        raise ValueError("the ghosts are never all on an end at once")
+    return first
+
+
+def end_period(instructions, network, start, is_end):
+    """The steps to the first end, if the ghost is then on an end every as
+    many steps and never in between, or None.
+
+    That holds when the ghost is back on the same end at the same point
+    of the instructions after as many steps again, with no other end on
+    the way.
+    """
+
+    steps = instruction_steps(instructions, network)
+    n = len(instructions)
+    position = start
+    # After as many steps as there are states, it never will be on an end
+    for i in range(n * network.num_nodes):
+        position = steps[i % n][position]
+        if is_end[position]:
+            break
+    else:
+        return None
+    first, end = i + 1, position
+    for i in range(first, 2 * first - 1):
+        position = steps[i % n][position]
+        if is_end[position]:
+            return None
+    position = steps[(2 * first - 1) % n][position]
+    return first if position == end and first % n == 0 else None
+
+
+def part2(docs):
+    instructions, network, nodes = docs
+    is_end = flags(nodes, [name for name in nodes.names if name.endswith("Z")])
+    starts = [nodes[name] for name in nodes.names if name.endswith("A")]
+    periods = [
+        end_period(instructions, network, start, is_end) for start in starts
+    ]
+    if None not in periods:
+        return math.lcm(*periods)
+    return first_common_end(
+        [walk(instructions, network, start, is_end) for start in starts]
+    )
+
+
+def part2_reference(docs):
+    instructions, network, nodes = docs
+    is_end = flags(nodes, [name for name in nodes.names if name.endswith("Z")])
+    return first_common_end(
+        [
+            walk(instructions, network, nodes[name], is_end)
+            for name in nodes.names
+            if name.endswith("A")
         ]
     )
 
 
+ENGINES = {"part2": {"reference": part2_reference, "fast": part2}}
+
+
+def generate(scale=1, seed=0):
+    """Synthetic network with `scale` times the nodes of the real one.
+
+    Like the real input, each ghost walks into a loop through its Z node,
+    and reaches that node first after exactly one period. Node names have
+    three characters, which caps the scale at about 50.
+    """
+
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    middles = [
+        a + b + c
+        for a in alphabet
+        for b in alphabet
+        for c in alphabet
+        if c not in "AZ"
+    ]
+    num_nodes = 750 * scale
+    num_ghosts = 6
+    if num_nodes > len(middles):
+        raise ValueError(f"at most {len(middles)} nodes")
+    names = iter(rng.sample(middles, num_nodes))
+    starts = ["AAA"] + rng.sample(
+        [a + b + "A" for a in alphabet for b in alphabet if a + b != "AA"],
+        num_ghosts - 1,
+    )
+    ends = ["ZZZ"] + rng.sample(
+        [a + b + "Z" for a in alphabet for b in alphabet if a + b != "ZZ"],
+        num_ghosts - 1,
+    )
+    share = num_nodes // num_ghosts
+    lengths = [share - rng.randrange(share // 2) for _ in starts]
+    lines = []
+    for start, end, length in zip(starts, ends, lengths):
+        loop = [next(names) for _ in range(length)]
+        # start -> loop[0] -> ... -> loop[-1] -> end -> loop[0]
+        path = [start] + loop + [end, loop[0]]
+        for node, next_node in zip(path, path[1:]):
+            lines.append(f"{node} = ({next_node}, {next_node})")
+    rng.shuffle(lines)
+    instructions = "".join(rng.choices("LR", k=281))
+    return instructions + "\n\n" + "\n".join(lines)
+
+
 def main():
-    instructions, map = read_docs("example1.txt")
-    assert steps_to_first_end(instructions, map) == 2
-    instructions, map = read_docs("example2.txt")
-    assert steps_to_first_end(instructions, map) == 6
-    instructions, map = read_docs("input.txt")
-    assert steps_to_first_end(instructions, map) == 11309
-
-    instructions, map = read_docs("example3.txt")
-    assert part2(instructions, map) == 6
-    instructions, map = read_docs("input.txt")
-    assert part2(instructions, map) == 13740108158591
+    assert part1(read_docs((HERE / "example1.txt").read_text())) == 2
+    assert part1(read_docs((HERE / "example2.txt").read_text())) == 6
+    assert part1(read_docs((HERE / "input.txt").read_text())) == 11309
+
+    assert part2(read_docs((HERE / "example3.txt").read_text())) == 6
+    assert part2(read_docs((HERE / "input.txt").read_text())) == 13740108158591
 
     print("All tests passed.")
 
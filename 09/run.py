@@ -1,15 +1,20 @@
 #!/usr/bin/env python
 
+import importlib.util
 import pathlib
+import random
+import sys
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
+from aoc import inputs  # noqa: E402
+from aoc.output import print  # noqa: E402
 
-def read_histories(path):
-    return [
-        [int(num) for num in line.split()]
-        for line in pathlib.Path(path).read_text().splitlines()
-    ]
+HERE = pathlib.Path(__file__).parent
+
+
+def read_histories(text):
+    return [[int(num) for num in line.split()] for line in text.splitlines()]
 
 
 def make_triangle(history):
@@ -52,13 +57,134 @@ def find_sum(next_or_prev_func, histories):
     )
 
 
+def extrapolate(history):
+    """Next and previous values, without keeping the whole triangle.
+
+    The next value is the sum of the last value of every row, and the
+    previous one the alternating sum of their first values.
+    """
+
+    next_, previous = 0, 0
+    sign = 1
+    row = history
+    while any(row):
+        next_ += row[-1]
+        previous += sign * row[0]
+        sign = -sign
+        row = [b - a for a, b in zip(row, row[1:])]
+    return next_, previous
+
+
+def extrapolate_all(histories):
+    """Sums of `extrapolate` over histories as the rows of an array.
+
+    Differences at most double the largest magnitude at each level, which
+    `can_vectorize` uses to rule out overflowing 64-bit integers.
+    """
+
+    import numpy as np
+
+    rows = np.array(histories, dtype=np.int64)
+    next_ = np.zeros(len(histories), dtype=np.int64)
+    previous = np.zeros(len(histories), dtype=np.int64)
+    sign = 1
+    while rows.shape[1] and rows.any():
+        next_ += rows[:, -1]
+        previous += sign * rows[:, 0]
+        sign = -sign
+        rows = np.diff(rows, axis=1)
+    return int(next_.sum()), int(previous.sum())
+
+
+def can_vectorize(histories):
+    lengths = {len(history) for history in histories}
+    if len(lengths) != 1:
+        return False
+    largest = max(abs(value) for history in histories for value in history)
+    return largest * len(histories) * 2 ** (lengths.pop() + 1) < 2**63
+
+
+def parse(text):
+    return read_histories(text)
+
+
+def part1(histories):
+    return sum(extrapolate(history)[0] for history in histories)
+
+
+def part2(histories):
+    return sum(extrapolate(history)[1] for history in histories)
+
+
+def part1_reference(histories):
+    return find_sum(next_value, histories)
+
+
+def part2_reference(histories):
+    return find_sum(previous_value, histories)
+
+
+def part1_vectorized(histories):
+    if not can_vectorize(histories):
+        return part1(histories)
+    return extrapolate_all(histories)[0]
+
+
+def part2_vectorized(histories):
+    if not can_vectorize(histories):
+        return part2(histories)
+    return extrapolate_all(histories)[1]
+
+
+ENGINES = {
+    "part1": {"reference": part1_reference, "fast": part1},
+    "part2": {"reference": part2_reference, "fast": part2},
+}
+# Registered if numpy is installed, without importing it, which only
+# extrapolate_all does
+if importlib.util.find_spec("numpy") is not None:
+    ENGINES["part1"]["vectorized"] = part1_vectorized
+    ENGINES["part2"]["vectorized"] = part2_vectorized
+
+
+def solve_stream(stream):
+    """Both parts in one pass, one history in memory at a time."""
+
+    answers = {"part1": 0, "part2": 0}
+    for line in inputs.iter_lines(stream):
+        next_, previous = extrapolate([int(num) for num in line.split()])
+        answers["part1"] += next_
+        answers["part2"] += previous
+    return answers
+
+
+def generate(scale=1, seed=0):
+    """Synthetic report with histories `scale` times as long as the real ones.
+
+    Histories are values of random polynomials of degree at most 12.
+    """
+
+    rng = random.Random(seed)
+    length = 21 * scale
+    lines = []
+    for _ in range(200):
+        coefficients = [rng.randint(-5, 5) for _ in range(rng.randint(1, 13))]
+        lines.append(
+            " ".join(
+                str(sum(c * x**k for k, c in enumerate(coefficients)))
+                for x in range(length)
+            )
+        )
+    return "\n".join(lines)
+
+
 def main():
-    histories = read_histories("example.txt")
-    assert find_sum(next_value, histories) == 114
-    assert find_sum(previous_value, histories) == 2
-    histories = read_histories("input.txt")
-    assert find_sum(next_value, histories) == 1992273652
-    assert find_sum(previous_value, histories) == 1012
+    histories = read_histories((HERE / "example.txt").read_text())
+    assert part1(histories) == 114
+    assert part2(histories) == 2
+    histories = read_histories((HERE / "input.txt").read_text())
+    assert part1(histories) == 1992273652
+    assert part2(histories) == 1012
     print("All tests passed.")
 
 
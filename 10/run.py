@@ -1,75 +1,102 @@
 #!/usr/bin/env python
 
-import dataclasses
 import pathlib
+import random
+import sys
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
+from aoc import synthetic  # noqa: E402
+from aoc.grid import Grid  # noqa: E402
+from aoc.output import print  # noqa: E402
 
-@dataclasses.dataclass(frozen=True)
-class Coord:
-    i: int
-    j: int
+HERE = pathlib.Path(__file__).parent
 
-    def __add__(self, other):
-        return Coord(self.i + other.i, self.j + other.j)
+# Positions are grid offsets and velocities are offset steps, so a
+# velocity is one of grid.up, grid.down, grid.left or grid.right.
 
 
-def read_tiles(path):
-    tiles = []
-    for i, row in enumerate(pathlib.Path(path).read_text().splitlines()):
-        tiles.append([])
-        for j, tile in enumerate(row):
-            if tile == "S":
-                start = Coord(i, j)
-            tiles[i].append(tile)
+def read_tiles(text):
+    tiles = Grid.from_text(text, border=".")
+    start = tiles.cells.index(b"S")
     return tiles, start
 
 
 def set_start_tile(tiles, start, tile):
-    tiles[start.i][start.j] = tile
+    tiles[start] = ord(tile)
     return tiles
 
 
-def advance_on_loop(position, velocity, grid):
-    tile = grid[position.i][position.j]
-    match tile:
-        case "|" | "-":
-            new_velocity = velocity
-        case "L":
-            match velocity:
-                case Coord(1, 0):
-                    new_velocity = Coord(0, 1)
-                case Coord(0, -1):
-                    new_velocity = Coord(-1, 0)
-        case "J":
-            match velocity:
-                case Coord(0, 1):
-                    new_velocity = Coord(-1, 0)
-                case Coord(1, 0):
-                    new_velocity = Coord(0, -1)
-        case "7":
-            match velocity:
-                case Coord(0, 1):
-                    new_velocity = Coord(1, 0)
-                case Coord(-1, 0):
-                    new_velocity = Coord(0, -1)
-        case "F":
-            match velocity:
-                case Coord(0, -1):
-                    new_velocity = Coord(1, 0)
-                case Coord(-1, 0):
-                    new_velocity = Coord(0, 1)
-    return (position + new_velocity), new_velocity
+def arrival_velocities(tiles):
+    """Velocities with which the loop can be entered through each tile."""
+
+    up, down, left, right = tiles.up, tiles.down, tiles.left, tiles.right
+    return {
+        ord("|"): (down, up),
+        ord("-"): (right, left),
+        ord("L"): (down, left),
+        ord("J"): (right, down),
+        ord("7"): (right, up),
+        ord("F"): (left, up),
+    }
+
+
+def turns(tiles):
+    """New velocity for each tile and velocity it is entered with."""
+
+    up, down, left, right = tiles.up, tiles.down, tiles.left, tiles.right
+    turns = {}
+    for tile in b"|-":
+        for velocity in tiles.neighbors4:
+            turns[tile, velocity] = velocity
+    turns[ord("L"), down] = right
+    turns[ord("L"), left] = up
+    turns[ord("J"), right] = up
+    turns[ord("J"), down] = left
+    turns[ord("7"), right] = down
+    turns[ord("7"), up] = left
+    turns[ord("F"), left] = down
+    turns[ord("F"), up] = right
+    return turns
+
+
+def infer_start_tile(tiles, start):
+    up = chr(tiles[start + tiles.up]) in "|7F"
+    down = chr(tiles[start + tiles.down]) in "|LJ"
+    left = chr(tiles[start + tiles.left]) in "-LF"
+    right = chr(tiles[start + tiles.right]) in "-J7"
+    match (up, down, left, right):
+        case (True, True, _, _):
+            return "|"
+        case (_, _, True, True):
+            return "-"
+        case (True, _, _, True):
+            return "L"
+        case (True, _, True, _):
+            return "J"
+        case (_, True, True, _):
+            return "7"
+        case _:
+            return "F"
+
+
+def advance_on_loop(position, velocity, grid, turns):
+    new_velocity = turns[grid.cells[position], velocity]
+    return position + new_velocity, new_velocity
 
 
 def num_steps_to_farthest(tiles, start, initial_velocity1, initial_velocity2):
+    turns_ = turns(tiles)
     position1, position2 = start, start
     velocity1, velocity2 = initial_velocity1, initial_velocity2
     steps = 0
     while True:
-        position1, velocity1 = advance_on_loop(position1, velocity1, tiles)
-        position2, velocity2 = advance_on_loop(position2, velocity2, tiles)
+        position1, velocity1 = advance_on_loop(
+            position1, velocity1, tiles, turns_
+        )
+        position2, velocity2 = advance_on_loop(
+            position2, velocity2, tiles, turns_
+        )
         steps += 1
         if position1 == position2:
             return steps
@@ -80,37 +107,39 @@ def tiles_inside_loop(tiles, start, initial_velocity):
     # is clock(anti)wise from inside and anti(clock)wise from outside.
     # We only need to look in one direction (we choose left to right).
 
+    turns_ = turns(tiles)
     position = start
     velocity = initial_velocity
     loop = {position: initial_velocity}
 
     while True:
-        position, velocity = advance_on_loop(position, velocity, tiles)
+        position, velocity = advance_on_loop(position, velocity, tiles, turns_)
         if position == start:
             break
         loop[position] = velocity
 
     # Assumes the first column has enough outside to cover all pipe encounters
     velocities_from_outside = {}
-    for i in range(len(tiles)):
-        for j in range(len(tiles)):
-            if Coord(i, j) in loop:
-                velocities_from_outside[tiles[i][j]] = loop[Coord(i, j)]
+    for i in range(tiles.rows):
+        for position in range(tiles.offset(i, 0), tiles.offset(i + 1, 0)):
+            if position in loop:
+                velocities_from_outside[tiles[position]] = loop[position]
                 break
 
+    # Scan each row from the right, remembering the closest loop tile
     inside = set()
-    for i in range(len(tiles)):
-        for j in range(len(tiles[i])):
-            if Coord(i, j) in loop:
-                continue
-            for k in range(j + 1, len(tiles[i])):
-                if Coord(i, k) in loop:
-                    if (
-                        loop[Coord(i, k)]
-                        != velocities_from_outside[tiles[i][k]]
-                    ):
-                        inside.add(Coord(i, j))
-                    break
+    for i in range(tiles.rows):
+        closest = None
+        for position in range(
+            tiles.offset(i, tiles.cols - 1), tiles.offset(i, 0) - 1, -1
+        ):
+            if position in loop:
+                closest = position
+            elif (
+                closest is not None
+                and loop[closest] != velocities_from_outside[tiles[closest]]
+            ):
+                inside.add(position)
     return inside, loop
 
 
@@ -118,59 +147,135 @@ BETTER_SYMBOLS = {"-": "─", "|": "│", "L": "└", "J": "┘", "7": "┐", "F
 
 
 def plot(tiles, loop, inside):
-    for i in range(len(tiles)):
-        line = ""
-        for j in range(len(tiles[i])):
-            coord = Coord(i, j)
-            if coord in loop:
-                line += BETTER_SYMBOLS[tiles[i][j]]
-            elif coord in inside:
-                line += "∙"
-            else:
-                line += " "
-        print(line)
+    # Imported here to keep it out of the import time of the day
+    from aoc import render
+
+    print(
+        render.text(
+            tiles,
+            [(loop, None), (inside, "∙")],
+            symbols=BETTER_SYMBOLS,
+            background=" ",
+        )
+    )
     print()
 
 
-def main():
-    tiles, start = read_tiles("example1.txt")
-    set_start_tile(tiles, start, "F")
-    assert num_steps_to_farthest(tiles, start, Coord(-1, 0), Coord(0, -1)) == 4
-    initial_velocity = Coord(-1, 0)
-    inside, loop = tiles_inside_loop(tiles, start, initial_velocity)
-    plot(tiles, loop, inside)
-    assert len(inside) == 1
+def parse(text):
+    tiles, start = read_tiles(text)
+    set_start_tile(tiles, start, infer_start_tile(tiles, start))
+    return tiles, start
 
-    tiles, start = read_tiles("example2.txt")
-    set_start_tile(tiles, start, "7")
-    initial_velocity = Coord(0, 1)
-    inside, loop = tiles_inside_loop(tiles, start, initial_velocity)
-    plot(tiles, loop, inside)
-    assert len(inside) == 10
 
-    tiles, start = read_tiles("example3.txt")
-    set_start_tile(tiles, start, "F")
-    initial_velocity = Coord(-1, 0)
-    inside, loop = tiles_inside_loop(tiles, start, initial_velocity)
-    plot(tiles, loop, inside)
-    assert len(inside) == 8
+def part1(maze):
+    tiles, start = maze
+    return num_steps_to_farthest(
+        tiles, start, *arrival_velocities(tiles)[tiles[start]]
+    )
+
+
+def part2(maze):
+    tiles, start = maze
+    initial_velocity = arrival_velocities(tiles)[tiles[start]][0]
+    inside, _ = tiles_inside_loop(tiles, start, initial_velocity)
+    return len(inside)
+
+
+def microbenchmarks(maze):
+    """`advance_on_loop` from every tile of the loop."""
+
+    tiles, start = maze
+    initial_velocity = arrival_velocities(tiles)[tiles[start]][0]
+    _, loop = tiles_inside_loop(tiles, start, initial_velocity)
+    turns_ = turns(tiles)
+    return {
+        "advance_on_loop": (
+            advance_on_loop,
+            [
+                (position, velocity, tiles, turns_)
+                for position, velocity in loop.items()
+            ],
+        )
+    }
+
+
+def generate(scale=1, seed=0):
+    """Synthetic field with `scale` times the tiles of the real one.
+
+    The loop is the doubled-up outline of a random polygon, and the tiles
+    off the loop are random pipes, except next to the start.
+    """
+
+    rng = random.Random(seed)
+    size = synthetic.side(140, scale)
+    coarse = (size - 2) // 2
+    corners = synthetic.column_convex_polygon(rng, coarse, coarse)
+    # Corners are 2 tiles apart, with a margin of at least 1 tile
+    loop = []
+    for (r1, c1), (r2, c2) in zip(corners, corners[1:] + corners[:1]):
+        i, j = 2 * r1 + 1, 2 * c1 + 1
+        di, dj = (r2 > r1) - (r2 < r1), (c2 > c1) - (c2 < c1)
+        for _ in range(2 * (abs(r2 - r1) + abs(c2 - c1))):
+            loop.append((i, j))
+            i, j = i + di, j + dj
+    pipes = {
+        frozenset([(-1, 0), (1, 0)]): "|",
+        frozenset([(0, -1), (0, 1)]): "-",
+        frozenset([(-1, 0), (0, 1)]): "L",
+        frozenset([(-1, 0), (0, -1)]): "J",
+        frozenset([(1, 0), (0, -1)]): "7",
+        frozenset([(1, 0), (0, 1)]): "F",
+    }
+    rows = [rng.choices(".|-LJ7F", k=size) for _ in range(size)]
+    for k, (i, j) in enumerate(loop):
+        previous, next_ = loop[k - 1], loop[(k + 1) % len(loop)]
+        rows[i][j] = pipes[
+            frozenset(
+                [
+                    (previous[0] - i, previous[1] - j),
+                    (next_[0] - i, next_[1] - j),
+                ]
+            )
+        ]
+    i, j = rng.choice(loop)
+    rows[i][j] = "S"
+    # Only the two loop neighbors of the start may connect to it
+    for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        if (
+            0 <= i + di < size
+            and 0 <= j + dj < size
+            and (i + di, j + dj) not in loop
+        ):
+            rows[i + di][j + dj] = "."
+    return "\n".join("".join(row) for row in rows)
 
-    tiles, start = read_tiles("example4.txt")
-    set_start_tile(tiles, start, "F")
-    initial_velocity = Coord(-1, 0)
+
+def main():
+    tiles, start = parse((HERE / "example1.txt").read_text())
+    assert part1((tiles, start)) == 4
+    initial_velocity = tiles.up
     inside, loop = tiles_inside_loop(tiles, start, initial_velocity)
     plot(tiles, loop, inside)
-    assert len(inside) == 4
+    assert len(inside) == 1
 
-    tiles, start = read_tiles("input.txt")
-    set_start_tile(tiles, start, "|")
-    assert (
-        num_steps_to_farthest(tiles, start, Coord(-1, 0), Coord(1, 0)) == 6846
-    )
-    initial_velocity = Coord(1, 0)
+    for text, num_inside in [
+        ((HERE / "example2.txt").read_text(), 10),
+        ((HERE / "example3.txt").read_text(), 8),
+        ((HERE / "example4.txt").read_text(), 4),
+    ]:
+        tiles, start = parse(text)
+        initial_velocity = arrival_velocities(tiles)[tiles[start]][0]
+        inside, loop = tiles_inside_loop(tiles, start, initial_velocity)
+        plot(tiles, loop, inside)
+        assert len(inside) == num_inside
+
+    maze = parse((HERE / "input.txt").read_text())
+    assert part1(maze) == 6846
+    assert part2(maze) == 325
+    tiles, start = maze
+    initial_velocity = arrival_velocities(tiles)[tiles[start]][0]
     inside, loop = tiles_inside_loop(tiles, start, initial_velocity)
     plot(tiles, loop, inside)
-    assert len(inside) == 325
 
     print("All tests passed.")
 
@@ -1,12 +1,21 @@
 #!/usr/bin/env python
 
+import importlib.util
 import pathlib
+import random
+import sys
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
+from aoc import synthetic  # noqa: E402
+from aoc.intervals import IntervalSet  # noqa: E402
+from aoc.output import print  # noqa: E402
 
-def read_space(path):
-    return pathlib.Path(path).read_text().split()
+HERE = pathlib.Path(__file__).parent
+
+
+def read_space(text):
+    return text.split()
 
 
 def find_empty_space(space):
@@ -64,22 +73,128 @@ def shortest_path_sum(galaxies, empty_rows, empty_cols, multiplier=2):
     return s
 
 
+def expand(coordinates, empty, multiplier):
+    """Coordinates once every empty line grows to `multiplier` lines."""
+
+    empty = IntervalSet.from_points(empty)
+    return [c + (multiplier - 1) * empty.count_below(c) for c in coordinates]
+
+
+def pairwise_distance_sum(coordinates):
+    """Sum of |a - b| over all pairs, in O(n log n).
+
+    Once sorted, the k-th of n coordinates is the larger one in k pairs
+    and the smaller one in n - 1 - k pairs.
+    """
+
+    n = len(coordinates)
+    return sum((2 * k - n + 1) * c for k, c in enumerate(sorted(coordinates)))
+
+
+def distance_sum(galaxies, empty_rows, empty_cols, multiplier=2):
+    rows = expand([i for i, _ in galaxies], empty_rows, multiplier)
+    cols = expand([j for _, j in galaxies], empty_cols, multiplier)
+    return pairwise_distance_sum(rows) + pairwise_distance_sum(cols)
+
+
+def distance_sum_vectorized(galaxies, empty_rows, empty_cols, multiplier=2):
+    import numpy as np
+
+    total = 0
+    for coordinates, empty in zip(
+        np.array(galaxies, dtype=np.int64).reshape(-1, 2).T,
+        (empty_rows, empty_cols),
+    ):
+        expanded = np.sort(
+            coordinates
+            + (multiplier - 1) * np.searchsorted(empty, coordinates)
+        )
+        weights = 2 * np.arange(len(expanded)) - len(expanded) + 1
+        # Each product fits in 64 bits, their sum may not
+        total += int((expanded * weights).astype(object).sum())
+    return total
+
+
+def parse(text):
+    space = read_space(text)
+    empty_rows, empty_cols = find_empty_space(space)
+    return get_galaxies(space), empty_rows, empty_cols
+
+
+def part1(image):
+    return distance_sum(*image)
+
+
+def part2(image):
+    return distance_sum(*image, multiplier=1000000)
+
+
+def part1_reference(image):
+    return shortest_path_sum(*image)
+
+
+def part2_reference(image):
+    return shortest_path_sum(*image, multiplier=1000000)
+
+
+def part1_vectorized(image):
+    return distance_sum_vectorized(*image)
+
+
+def part2_vectorized(image):
+    return distance_sum_vectorized(*image, multiplier=1000000)
+
+
+ENGINES = {
+    "part1": {"reference": part1_reference, "fast": part1},
+    "part2": {"reference": part2_reference, "fast": part2},
+}
+# numpy is only imported by the vectorized engine, as it takes longer to
+# import than most days take to run
+if importlib.util.find_spec("numpy") is not None:
+    ENGINES["part1"]["vectorized"] = part1_vectorized
+    ENGINES["part2"]["vectorized"] = part2_vectorized
+
+
+def generate(scale=1, seed=0):
+    """Synthetic image with `scale` times the pixels of the real one."""
+
+    rng = random.Random(seed)
+    size = synthetic.side(140, scale)
+    empty_rows = set(rng.sample(range(size), size // 20))
+    empty_cols = set(rng.sample(range(size), size // 20))
+    rows = []
+    for i in range(size):
+        rows.append(
+            "".join(
+                (
+                    "#"
+                    if i not in empty_rows
+                    and j not in empty_cols
+                    and rng.random() < 0.022
+                    else "."
+                )
+                for j in range(size)
+            )
+        )
+    return "\n".join(rows)
+
+
 def main():
-    space = read_space("example.txt")
+    space = read_space((HERE / "example.txt").read_text())
     empty_rows, empty_cols = find_empty_space(space)
     galaxies = get_galaxies(space)
-    assert shortest_path_sum(galaxies, empty_rows, empty_cols) == 374
+    assert distance_sum(galaxies, empty_rows, empty_cols) == 374
     assert (
-        shortest_path_sum(galaxies, empty_rows, empty_cols, multiplier=10)
-        == 1030
+        distance_sum(galaxies, empty_rows, empty_cols, multiplier=10) == 1030
     )
 
-    space = read_space("input.txt")
+    space = read_space((HERE / "input.txt").read_text())
     empty_rows, empty_cols = find_empty_space(space)
     galaxies = get_galaxies(space)
-    assert shortest_path_sum(galaxies, empty_rows, empty_cols) == 9556896
+    assert distance_sum(galaxies, empty_rows, empty_cols) == 9556896
     assert (
-        shortest_path_sum(galaxies, empty_rows, empty_cols, multiplier=1000000)
+        distance_sum(galaxies, empty_rows, empty_cols, multiplier=1000000)
         == 685038186836
     )
     print("All tests passed.")
@@ -1,13 +1,20 @@
 #!/usr/bin/env python
 
 import pathlib
+import random
 import re
+import sys
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
+from aoc import progress  # noqa: E402
+from aoc.output import print  # noqa: E402
 
-def read_records(path):
-    return pathlib.Path(path).read_text().splitlines()
+HERE = pathlib.Path(__file__).parent
+
+
+def read_records(text):
+    return text.splitlines()
 
 
 def num_arrangements(record):
@@ -33,14 +40,99 @@ def num_arrangements(record):
     return valid
 
 
+def count_arrangements(record):
+    """`num_arrangements` by dynamic programming over the springs.
+
+    `ways[i]` counts the arrangements of the remaining groups in the
+    springs from `i` on, one group at a time from the last. Index `n + 1`
+    stands for "past the end" after a group ending at the last spring.
+    """
+
+    springs, target_counts = record.split()
+    groups = [int(char) for char in target_counts.split(",")]
+    n = len(springs)
+    # Farthest spring that is not operational, from each position on
+    reach = [0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        reach[i] = 0 if springs[i] == "." else reach[i + 1] + 1
+    ways = [0] * (n + 2)
+    ways[n] = ways[n + 1] = 1
+    for i in range(n - 1, -1, -1):
+        ways[i] = ways[i + 1] if springs[i] != "#" else 0
+    for size in reversed(groups):
+        new_ways = [0] * (n + 2)
+        for i in range(n - size, -1, -1):
+            count = new_ways[i + 1] if springs[i] != "#" else 0
+            end = i + size
+            if reach[i] >= size and (end == n or springs[end] != "#"):
+                count += ways[end + 1]
+            new_ways[i] = count
+        ways = new_ways
+    return ways[0]
+
+
+def parse(text):
+    return read_records(text)
+
+
 def part1(records):
-    return sum(num_arrangements(record) for record in records)
+    return sum(
+        count_arrangements(record)
+        for record in progress.track(records, "12 records")
+    )
+
+
+def part1_reference(records):
+    return sum(
+        num_arrangements(record)
+        for record in progress.track(records, "12 records, 2^k candidates")
+    )
+
+
+ENGINES = {"part1": {"reference": part1_reference, "fast": part1}}
+
+
+def generate(scale=1, seed=0):
+    """Synthetic records, `scale` times as long as the real ones.
+
+    About a third of the springs are unknown, so the brute force grows
+    exponentially with the scale.
+    """
+
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(1000):
+        length = rng.randint(5, 20) * scale
+        springs = []
+        groups = []
+        while len(springs) < length:
+            if springs and springs[-1] == "#":
+                springs.append(".")
+                continue
+            if rng.random() < 0.4:
+                group = rng.randint(1, 5)
+                springs.extend("#" * group)
+                groups.append(group)
+            else:
+                springs.append(".")
+        if not groups:
+            springs[0] = "#"
+            groups.append(1)
+        unknown = [rng.random() < 0.35 for _ in springs]
+        # The brute force expects at least one unknown spring
+        unknown[rng.randrange(len(springs))] = True
+        record = "".join(
+            "?" if is_unknown else spring
+            for spring, is_unknown in zip(springs, unknown)
+        )
+        lines.append(f"{record} {','.join(map(str, groups))}")
+    return "\n".join(lines)
 
 
 def main():
-    records = read_records("example.txt")
+    records = read_records((HERE / "example.txt").read_text())
     assert part1(records) == 21
-    records = read_records("input.txt")
+    records = read_records((HERE / "input.txt").read_text())
     assert part1(records) == 7344
     print("All tests passed.")
 
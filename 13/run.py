@@ -1,21 +1,27 @@
 #!/usr/bin/env python
 
 import pathlib
+import random
+import sys
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from aoc import inputs  # noqa: E402
+from aoc.grid import Grid  # noqa: E402
+from aoc.output import print  # noqa: E402
+
+HERE = pathlib.Path(__file__).parent
 
 
 def get_dimensions(grid):
-    return len(grid), len(grid[0])
+    return grid.rows, grid.cols
 
 
 def is_column_reflection(grid, left, right):
     num_rows, num_cols = get_dimensions(grid)
 
     while left >= 0 and right < num_cols:
-        if not all(
-            grid[row][left] == grid[row][right] for row in range(num_rows)
-        ):
+        if grid.column(left) != grid.column(right):
             return False
         left -= 1
         right += 1
@@ -39,24 +45,16 @@ def find_reflection_lines(grid):
 def is_row_reflection(grid, up, down):
     num_rows, num_cols = get_dimensions(grid)
     while up >= 0 and down < num_rows:
-        if not all(
-            grid[up][col] == grid[down][col] for col in range(num_cols)
-        ):
+        if grid.row(up) != grid.row(down):
             return False
         up -= 1
         down += 1
     return True
 
 
-def swap(grid, i, j):
-    match grid[i][j]:
-        case ".":
-            new_value = "#"
-        case "#":
-            new_value = "."
-    row = list(grid[i])
-    row[j] = new_value
-    grid[i] = "".join(row)
+def swap(grid, offset):
+    # Flips "." and "#"
+    grid[offset] ^= ord(".") ^ ord("#")
 
 
 def add_to_summary(summary, orientation, position):
@@ -67,14 +65,18 @@ def add_to_summary(summary, orientation, position):
             return summary + (position + 1) * 100
 
 
-def read_grids(path):
+def read_grids(text):
     grids = []
-    for grid in pathlib.Path(path).read_text().split("\n\n"):
-        grids.append(grid.split("\n"))
+    for grid in text.split("\n\n"):
+        grids.append(Grid.from_text(grid))
     return grids
 
 
-def part1(grids):
+def parse(text):
+    return read_grids(text)
+
+
+def summarize(grids):
     summary = 0
     reflection_lines = []
     for grid in grids:
@@ -84,32 +86,99 @@ def part1(grids):
     return summary, reflection_lines
 
 
-def part2(grids, reflection_lines):
+def part1(grids):
+    summary, _ = summarize(grids)
+    return summary
+
+
+def part2(grids, reflection_lines=None):
+    if reflection_lines is None:
+        _, reflection_lines = summarize(grids)
     summary = 0
     for i in range(len(grids)):
-        num_rows, num_cols = get_dimensions(grids[i])
-        for j in range(num_rows):
-            for k in range(num_cols):
-                swap(grids[i], j, k)
-                new_reflection_lines = find_reflection_lines(grids[i])
-                swap(grids[i], j, k)
-                if reflection_lines[i] in new_reflection_lines:
-                    new_reflection_lines.remove(reflection_lines[i])
-                if len(new_reflection_lines) == 0:
-                    continue
-                [(new_orientation, new_position)] = new_reflection_lines
+        for offset in grids[i].offsets():
+            swap(grids[i], offset)
+            new_reflection_lines = find_reflection_lines(grids[i])
+            swap(grids[i], offset)
+            if reflection_lines[i] in new_reflection_lines:
+                new_reflection_lines.remove(reflection_lines[i])
+            if len(new_reflection_lines) == 0:
+                continue
+            [(new_orientation, new_position)] = new_reflection_lines
         summary = add_to_summary(summary, new_orientation, new_position)
     return summary
 
 
+def has_one_smudge(grid):
+    """Whether the pattern reads unambiguously in both parts."""
+
+    reflection_lines = find_reflection_lines(grid)
+    if len(reflection_lines) != 1:
+        return False
+    new_reflection_lines = set()
+    for offset in grid.offsets():
+        swap(grid, offset)
+        found = set(find_reflection_lines(grid)) - set(reflection_lines)
+        swap(grid, offset)
+        if len(found) > 1:
+            return False
+        new_reflection_lines |= found
+    return len(new_reflection_lines) == 1
+
+
+def solve_stream(stream):
+    """Both parts in one pass, one pattern in memory at a time."""
+
+    answers = {"part1": 0, "part2": 0}
+    for record in inputs.iter_records(stream):
+        grids = [Grid.from_lines(record)]
+        summary, reflection_lines = summarize(grids)
+        answers["part1"] += summary
+        answers["part2"] += part2(grids, reflection_lines)
+    return answers
+
+
+def generate(scale=1, seed=0):
+    """Synthetic notes with `scale` times the patterns of the real ones.
+
+    Each pattern is mirrored about one line for part 1, and about another
+    one except for a single smudge for part 2. The smudge sits in columns
+    (or rows) beyond the reach of the first line, so both lines hold after
+    it is fixed.
+    """
+
+    rng = random.Random(seed)
+    patterns = []
+    while len(patterns) < 100 * scale:
+        num_rows, num_cols = rng.randint(7, 17), rng.randint(7, 17)
+        rows = [rng.choices(".#", k=num_cols) for _ in range(num_rows)]
+        left = rng.randint(1, (num_cols - 1) // 2)
+        for row in rows:
+            for k in range(left):
+                row[left + k] = row[left - 1 - k]
+        up = rng.randint(1, num_rows - 1)
+        for k in range(min(up, num_rows - up)):
+            rows[up + k] = list(rows[up - 1 - k])
+        i = rng.randrange(max(0, 2 * up - num_rows), up)
+        j = rng.randrange(2 * left, num_cols)
+        rows[i][j] = "." if rows[i][j] == "#" else "#"
+        if rng.random() < 0.5:
+            rows = [list(column) for column in zip(*rows)]
+        text = "\n".join("".join(row) for row in rows)
+        # Random rows may happen to add reflections of their own
+        if has_one_smudge(Grid.from_text(text)):
+            patterns.append(text)
+    return "\n\n".join(patterns)
+
+
 def main():
-    grids = read_grids("example.txt")
-    summary, reflection_lines = part1(grids)
+    grids = read_grids((HERE / "example.txt").read_text())
+    summary, reflection_lines = summarize(grids)
     assert summary == 405
     assert part2(grids, reflection_lines) == 400
 
-    grids = read_grids("input.txt")
-    summary, reflection_lines = part1(grids)
+    grids = read_grids((HERE / "input.txt").read_text())
+    summary, reflection_lines = summarize(grids)
     assert summary == 35691
     assert part2(grids, reflection_lines) == 39037
 
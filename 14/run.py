@@ -1,140 +1,177 @@
 #!/usr/bin/env python
 
+import builtins
+import functools
 import pathlib
+import random
+import sys
 
-from rich import print as rich_print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
-std_print = print
-print = rich_print
+from aoc import synthetic  # noqa: E402
+from aoc.grid import Grid  # noqa: E402
+from aoc.output import print  # noqa: E402
 
+HERE = pathlib.Path(__file__).parent
 
-def read_grid(path):
-    return [list(line) for line in pathlib.Path(path).read_text().splitlines()]
+ROUND = ord("O")
+CUBE = ord("#")
+EMPTY = ord(".")
+
+
+def read_grid(text):
+    # The border acts as a wall of cube-shaped rocks
+    return Grid.from_text(text, border="#")
+
+
+def parse(text):
+    return read_grid(text)
 
 
 def part1(grid):
-    num_rows, num_cols = len(grid), len(grid[0])
     load = 0
-    for j in range(num_cols):
+    for j in range(grid.cols):
         floor = 0
-        for i in range(num_rows):
-            if grid[i][j] == "#":
+        for i, cell in enumerate(grid.column(j)):
+            if cell == CUBE:
                 floor = i + 1
-            elif grid[i][j] == "O":
-                load += num_rows - floor
+            elif cell == ROUND:
+                load += grid.rows - floor
                 floor += 1
-            else:
-                continue
     return load
 
 
-def tilt_north(grid):
-    num_rows, num_cols = len(grid), len(grid[0])
-    for j in range(num_cols):
-        floor = 0
-        for i in range(num_rows):
-            if grid[i][j] == "#":
-                floor = i + 1
-            elif grid[i][j] == "O":
-                grid[i][j] = "."
-                grid[floor][j] = "O"
-                floor += 1
-            else:
-                continue
+@functools.cache
+def roll(segment):
+    """The segment between two cube-shaped rocks, with its rocks rolled."""
 
+    rounds = segment.count(ROUND)
+    return b"O" * rounds + b"." * (len(segment) - rounds)
 
-def tilt_west(grid):
-    num_rows, num_cols = len(grid), len(grid[0])
-    for i in range(num_rows):
-        floor = 0
-        for j in range(num_cols):
-            if grid[i][j] == "#":
-                floor = j + 1
-            elif grid[i][j] == "O":
-                grid[i][j] = "."
-                grid[i][floor] = "O"
-                floor += 1
-            else:
-                continue
 
+def tilt(grid, starts, step, length):
+    """Rolls the round rocks of each lane towards its start.
+
+    A lane begins at each offset in `starts` and continues for `length`
+    cells in steps of `step`.
+    """
+
+    cells = grid.cells
+    for start in starts:
+        # The border guarantees that `stop` is never negative
+        lane = slice(start, start + length * step, step)
+        cells[lane] = b"#".join(
+            [roll(segment) for segment in bytes(cells[lane]).split(b"#")]
+        )
 
-def tilt_south(grid):
-    num_rows, num_cols = len(grid), len(grid[0])
-    for j in range(num_cols):
-        floor = num_rows - 1
-        for i in reversed(range(num_rows)):
-            if grid[i][j] == "#":
-                floor = i - 1
-            elif grid[i][j] == "O":
-                grid[i][j] = "."
-                grid[floor][j] = "O"
-                floor -= 1
-            else:
-                continue
 
+def tilt_cell_by_cell(grid, starts, step, length):
+    """Reference `tilt`: moves each round rock one cell at a time."""
 
-def tilt_east(grid):
-    num_rows, num_cols = len(grid), len(grid[0])
-    for i in range(num_rows):
-        floor = num_cols - 1
-        for j in reversed(range(num_cols)):
-            if grid[i][j] == "#":
-                floor = j - 1
-            elif grid[i][j] == "O":
-                grid[i][j] = "."
-                grid[i][floor] = "O"
-                floor -= 1
-            else:
+    cells = grid.cells
+    for start in starts:
+        for k in range(length):
+            offset = start + k * step
+            if cells[offset] != ROUND:
                 continue
+            while cells[offset - step] == EMPTY:
+                cells[offset - step] = ROUND
+                cells[offset] = EMPTY
+                offset -= step
+
+
+def tilt_north(grid, tilt_lanes=tilt):
+    starts = [grid.offset(0, j) for j in range(grid.cols)]
+    tilt_lanes(grid, starts, grid.down, grid.rows)
+
+
+def tilt_west(grid, tilt_lanes=tilt):
+    starts = [grid.offset(i, 0) for i in range(grid.rows)]
+    tilt_lanes(grid, starts, grid.right, grid.cols)
+
+
+def tilt_south(grid, tilt_lanes=tilt):
+    starts = [grid.offset(grid.rows - 1, j) for j in range(grid.cols)]
+    tilt_lanes(grid, starts, grid.up, grid.rows)
+
+
+def tilt_east(grid, tilt_lanes=tilt):
+    starts = [grid.offset(i, grid.cols - 1) for i in range(grid.rows)]
+    tilt_lanes(grid, starts, grid.left, grid.cols)
 
 
 def find_north_load(grid):
-    num_rows, num_cols = len(grid), len(grid[0])
     load = 0
-    for j in range(num_cols):
-        for i in range(num_rows):
-            if grid[i][j] == "O":
-                load += num_rows - i
+    for i in range(grid.rows):
+        start = grid.offset(i, 0)
+        load += (grid.rows - i) * grid.cells.count(
+            ROUND, start, start + grid.cols
+        )
     return load
 
 
-def cycle(grid):
-    tilt_north(grid)
-    tilt_west(grid)
-    tilt_south(grid)
-    tilt_east(grid)
+def cycle(grid, tilt_lanes=tilt):
+    tilt_north(grid, tilt_lanes)
+    tilt_west(grid, tilt_lanes)
+    tilt_south(grid, tilt_lanes)
+    tilt_east(grid, tilt_lanes)
 
 
 def print_grid(grid):
-    for row in grid:
-        std_print("".join(row))
-    print()
-
-
-def part2(grid):
-    seen = {}
-    i = 0
-    loads = []
-    while True:
-        cycle(grid)
-        loads.append(find_north_load(grid))
-        state = tuple(map(tuple, grid))
-        if state in seen:
-            break
-        else:
-            seen[state] = i
-        i += 1
-    first_seen = seen[state]
-    loads = loads[first_seen:i]
-    return loads[(1000000000 - first_seen - 1) % len(loads)]
+    # Imported here, like the cycle search below, to keep them out of the
+    # import time of the day
+    from aoc import render
+
+    # Plain output, so the grid is never styled
+    builtins.print(render.text(grid))
+    builtins.print()
+
+
+def part2(grid, tilt_lanes=tilt):
+    from aoc import cycles
+
+    def spin(cells):
+        grid.cells[:] = cells
+        cycle(grid, tilt_lanes)
+        return bytes(grid.cells), find_north_load(grid)
+
+    # Only hashes of the cells are kept, with the cells every few cycles
+    trajectory = cycles.detect(bytes(grid.cells), spin, name="14 spin cycles")
+    return trajectory.value_at(1000000000)
+
+
+def part1_reference(grid):
+    tilt_north(grid, tilt_cell_by_cell)
+    return find_north_load(grid)
+
+
+def part2_reference(grid):
+    return part2(grid, tilt_cell_by_cell)
+
+
+ENGINES = {
+    "part1": {"reference": part1_reference, "fast": part1},
+    "part2": {"reference": part2_reference, "fast": part2},
+}
+
+
+def generate(scale=1, seed=0):
+    """Synthetic platform with `scale` times the cells of the real one."""
+
+    rng = random.Random(seed)
+    size = synthetic.side(100, scale)
+    return "\n".join(
+        "".join(rng.choices(".O#", weights=[14, 4, 2], k=size))
+        for _ in range(size)
+    )
 
 
 def main():
-    grid = read_grid("example.txt")
+    grid = read_grid((HERE / "example.txt").read_text())
     assert part1(grid) == 136
     assert part2(grid) == 64
 
-    grid = read_grid("input.txt")
+    grid = read_grid((HERE / "input.txt").read_text())
     assert part1(grid) == 108857
     assert part2(grid) == 95273
     print("All tests passed.")
@@ -2,8 +2,15 @@
 
 import collections
 import pathlib
+import random
+import sys
 
-from rich import print
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from aoc import inputs  # noqa: E402
+from aoc.output import print  # noqa: E402
+
+HERE = pathlib.Path(__file__).parent
 
 
 def hash(string):
@@ -15,8 +22,12 @@ def hash(string):
     return current_value
 
 
-def read_steps(path):
-    return pathlib.Path(path).read_text().split(",")
+def read_steps(text):
+    return text.split(",")
+
+
+def parse(text):
+    return read_steps(text)
 
 
 def part1(steps):
@@ -57,12 +68,53 @@ def part2(steps):
     return focusing_power
 
 
+def solve_stream(stream):
+    """Both parts in one pass over the steps, a chunk of `stream` at a time.
+
+    Part 2 only keeps the lenses currently in the boxes.
+    """
+
+    part1_answer = 0
+
+    def steps():
+        nonlocal part1_answer
+        for step in inputs.iter_split(stream, ","):
+            step = step.strip()
+            part1_answer += hash(step)
+            yield step
+
+    part2_answer = part2(steps())
+    return {"part1": part1_answer, "part2": part2_answer}
+
+
+def microbenchmarks(steps):
+    return {"hash": (hash, [(step,) for step in steps])}
+
+
+def generate(scale=1, seed=0):
+    """Synthetic sequence with `scale` times the steps of the real one."""
+
+    rng = random.Random(seed)
+    labels = [
+        "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(2, 6)))
+        for _ in range(500)
+    ]
+    steps = []
+    for _ in range(4000 * scale):
+        label = rng.choice(labels)
+        if rng.random() < 0.3:
+            steps.append(f"{label}-")
+        else:
+            steps.append(f"{label}={rng.randint(1, 9)}")
+    return ",".join(steps)
+
+
 def main():
-    steps = read_steps("example.txt")
+    steps = read_steps((HERE / "example.txt").read_text())
     assert part1(steps) == 1320
     assert part2(steps) == 145
 
-    steps = read_steps("input.txt")
+    steps = read_steps((HERE / "input.txt").read_text())
     assert part1(steps) == 510273
     assert part2(steps) == 212449
     print("All tests passed.")
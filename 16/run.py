@@ -2,167 +2,198 @@
 
 import collections
 import pathlib
-
-
-def read_grid(path):
-    return [list(line) for line in pathlib.Path(path).read_text().splitlines()]
-
-
-def next_positions(position, velocity, grid):
-    i, j = position
-    tile = grid[i][j]
-    num_rows, num_cols = len(grid), len(grid[0])
-    match velocity:
-        case (0, 1):
-            match tile:
-                case "." | "-":
-                    if j == num_cols - 1:
-                        return []
-                    else:
-                        return [((i, j + 1), velocity)]
-                case "|":
-                    down = ((i + 1, j), (1, 0))
-                    up = ((i - 1, j), (-1, 0))
-                    next_ = [up, down]
-                    if i == 0:
-                        next_.remove(up)
-                    elif i == num_rows - 1:
-                        next_.remove(down)
-                    return next_
-                case "/":
-                    if i == 0:
-                        return []
-                    else:
-                        return [((i - 1, j), (-1, 0))]
-                case "\\":
-                    if i == num_rows - 1:
-                        return []
-                    else:
-                        return [((i + 1, j), (1, 0))]
-        case (0, -1):
-            match tile:
-                case "." | "-":
-                    if j == 0:
-                        return []
-                    else:
-                        return [((i, j - 1), velocity)]
-                case "|":
-                    down = ((i + 1, j), (1, 0))
-                    up = ((i - 1, j), (-1, 0))
-                    next_ = [up, down]
-                    if i == 0:
-                        next_.remove(up)
-                    elif i == num_rows - 1:
-                        next_.remove(down)
-                    return next_
-                case "/":
-                    if i == num_rows - 1:
-                        return []
-                    else:
-                        return [((i + 1, j), (1, 0))]
-                case "\\":
-                    if i == 0:
-                        return []
-                    else:
-                        return [((i - 1, j), (-1, 0))]
-
-        case (1, 0):
-            match tile:
-                case "." | "|":
-                    if i == num_rows - 1:
-                        return []
-                    else:
-                        return [((i + 1, j), velocity)]
-                case "-":
-                    right = ((i, j + 1), (0, 1))
-                    left = ((i, j - 1), (0, -1))
-                    next_ = [right, left]
-                    if j == 0:
-                        next_.remove(left)
-                    elif j == num_cols - 1:
-                        next_.remove(right)
-                    return next_
-                case "/":
-                    if j == 0:
-                        return []
-                    else:
-                        return [((i, j - 1), (0, -1))]
-                case "\\":
-                    if j == num_cols - 1:
-                        return []
-                    else:
-                        return [((i, j + 1), (0, 1))]
-        case (-1, 0):
-            match tile:
-                case "." | "|":
-                    if i == 0:
-                        return []
-                    else:
-                        return [((i - 1, j), velocity)]
-                case "-":
-                    right = ((i, j + 1), (0, 1))
-                    left = ((i, j - 1), (0, -1))
-                    next_ = [right, left]
-                    if j == 0:
-                        next_.remove(left)
-                    elif j == num_cols - 1:
-                        next_.remove(right)
-                    return next_
-                case "/":
-                    if j == num_cols - 1:
-                        return []
-                    else:
-                        return [((i, j + 1), (0, 1))]
-                case "\\":
-                    if j == 0:
-                        return []
-                    else:
-                        return [((i, j - 1), (0, -1))]
+import random
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from aoc import graph, progress, synthetic  # noqa: E402
+from aoc.grid import Grid  # noqa: E402
+
+HERE = pathlib.Path(__file__).parent
+
+# Positions are grid offsets and velocities are offset steps. Beams stop
+# when they step onto the border.
+OUTSIDE = ord(" ")
+
+
+def read_grid(text):
+    return Grid.from_text(text, border=" ")
+
+
+def bounces(grid):
+    """Outgoing velocities for each tile and incoming velocity."""
+
+    up, down, left, right = grid.up, grid.down, grid.left, grid.right
+    bounces = {}
+    for velocity in grid.neighbors4:
+        bounces[ord("."), velocity] = (velocity,)
+    for velocity in (left, right):
+        bounces[ord("-"), velocity] = (velocity,)
+        bounces[ord("|"), velocity] = (up, down)
+    for velocity in (up, down):
+        bounces[ord("|"), velocity] = (velocity,)
+        bounces[ord("-"), velocity] = (right, left)
+    mirrors = {
+        "/": {right: up, left: down, down: left, up: right},
+        "\\": {right: down, left: up, down: right, up: left},
+    }
+    for mirror, turns in mirrors.items():
+        for velocity, new_velocity in turns.items():
+            bounces[ord(mirror), velocity] = (new_velocity,)
+    return bounces
+
+
+def next_positions(position, velocity, grid, bounces):
+    cells = grid.cells
+    return [
+        (position + new_velocity, new_velocity)
+        for new_velocity in bounces[cells[position], velocity]
+        if cells[position + new_velocity] != OUTSIDE
+    ]
+
+
+def beam_graph(grid):
+    """Where a beam goes next, as a graph of beam states.
+
+    A beam at `position` moving with the k-th velocity of
+    `grid.neighbors4` is the node `4 * position + k`.
+    """
+
+    bounces_ = bounces(grid)
+    cells = grid.cells
+    directions = {velocity: k for k, velocity in enumerate(grid.neighbors4)}
+    return graph.Graph.from_successors(
+        (
+            [
+                4 * new_position + directions[new_velocity]
+                for new_position, new_velocity in next_positions(
+                    position, velocity, grid, bounces_
+                )
+            ]
+            if cells[position] != OUTSIDE
+            else ()
+        )
+        for position in range(len(cells))
+        for velocity in grid.neighbors4
+    )
+
+
+def num_energized_on_graph(beams, initial_state):
+    """Tiles crossed by the beams, on the graph from `beam_graph`."""
+
+    return len(
+        {state >> 2 for state in graph.reachable(beams, [initial_state])}
+    )
 
 
 def num_energized(grid, initial_position, initial_velocity):
+    bounces_ = bounces(grid)
+    # One bit per direction a beam has passed through each cell with
+    direction_bits = {
+        velocity: 1 << i for i, velocity in enumerate(grid.neighbors4)
+    }
+    visited = bytearray(len(grid.cells))
+    visited[initial_position] = direction_bits[initial_velocity]
     queue = collections.deque([(initial_position, initial_velocity)])
-    visited = set()
-    visited_positions = set()
     while queue:
         pos, vel = queue.popleft()
-        visited.add((pos, vel))
-        visited_positions.add(pos)
-        for new_pos, new_vel in next_positions(pos, vel, grid):
-            if (new_pos, new_vel) not in visited:
+        for new_pos, new_vel in next_positions(pos, vel, grid, bounces_):
+            bit = direction_bits[new_vel]
+            if not visited[new_pos] & bit:
+                visited[new_pos] |= bit
                 queue.append((new_pos, new_vel))
-    return len(visited_positions)
+    return len(visited) - visited.count(0)
+
+
+def entry_beams(grid):
+    """Beams entering the grid from each edge tile."""
+
+    def beams():
+        for j in range(grid.cols):
+            yield grid.offset(0, j), grid.down
+            yield grid.offset(grid.rows - 1, j), grid.up
+        for i in range(grid.rows):
+            yield grid.offset(i, 0), grid.right
+            yield grid.offset(i, grid.cols - 1), grid.left
+
+    return progress.track(
+        beams(), "16 entry beams", 2 * (grid.rows + grid.cols)
+    )
 
 
 def max_num_energized(grid):
-    energized = []
+    # Building the graph costs about ten traversals, and saves looking up
+    # the bounces again in each of the hundreds of traversals
+    beams = beam_graph(grid)
+    directions = {velocity: k for k, velocity in enumerate(grid.neighbors4)}
+    return max(
+        num_energized_on_graph(beams, 4 * position + directions[velocity])
+        for position, velocity in entry_beams(grid)
+    )
+
+
+def max_num_energized_reference(grid):
+    return max(
+        num_energized(grid, position, velocity)
+        for position, velocity in entry_beams(grid)
+    )
+
+
+def parse(text):
+    return read_grid(text)
+
+
+def part1(grid):
+    return num_energized(grid, grid.offset(0, 0), grid.right)
+
+
+def part2_reference(grid):
+    return max_num_energized_reference(grid)
+
+
+def part2(grid):
+    return max_num_energized(grid)
+
+
+ENGINES = {"part2": {"reference": part2_reference, "fast": part2}}
+
 
-    for j in range(len(grid[0])):
-        energized.append(num_energized(grid, (0, j), (1, 0)))
+def microbenchmarks(grid):
+    """`next_positions` from every tile of the grid, in every direction."""
 
-    for j in range(len(grid[0])):
-        energized.append(num_energized(grid, (len(grid) - 1, j), (-1, 0)))
+    bounces_ = bounces(grid)
+    return {
+        "next_positions": (
+            next_positions,
+            [
+                (position, velocity, grid, bounces_)
+                for position, cell in enumerate(grid.cells)
+                if cell != OUTSIDE
+                for velocity in grid.neighbors4
+            ],
+        )
+    }
 
-    for i in range(len(grid)):
-        energized.append(num_energized(grid, (i, 0), (0, 1)))
 
-    for i in range(len(grid)):
-        energized.append(num_energized(grid, (i, len(grid[0]) - 1), (0, -1)))
+def generate(scale=1, seed=0):
+    """Synthetic contraption with `scale` times the tiles of the real one."""
 
-    return max(energized)
+    rng = random.Random(seed)
+    size = synthetic.side(110, scale)
+    return "\n".join(
+        "".join(rng.choices(".|-/\\", weights=[90, 3, 3, 2, 2], k=size))
+        for _ in range(size)
+    )
 
 
 def main():
-    grid = read_grid("example.txt")
-    initial_position = (0, 0)
-    initial_velocity = (0, 1)
-    assert num_energized(grid, initial_position, initial_velocity) == 46
+    grid = read_grid((HERE / "example.txt").read_text())
+    assert part1(grid) == 46
     assert max_num_energized(grid) == 51
 
-    grid = read_grid("input.txt")
-    initial_position = (0, 0)
-    initial_velocity = (0, 1)
-    assert num_energized(grid, initial_position, initial_velocity) == 7034
+    grid = read_grid((HERE / "input.txt").read_text())
+    assert part1(grid) == 7034
     assert max_num_energized(grid) == 7759
     print("All tests passed.")
 
@@ -1,27 +1,33 @@
 #!/usr/bin/env python
 
 import pathlib
+import random
+import sys
 
-from rich import print as rprint
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from aoc import inputs, synthetic  # noqa: E402
+from aoc.output import print as rprint  # noqa: E402
+
+HERE = pathlib.Path(__file__).parent
 
 
 def det(matrix):
     return matrix[0][0] * matrix[1][1] - matrix[0][1] * matrix[1][0]
 
 
-def read_dig_plan(path, use_color=False):
+def read_dig_plans(text):
+    """The plans for part 1 and part 2 (from the colors), in one pass."""
+
     map_ = {"0": "R", "1": "D", "2": "L", "3": "U"}
     plan = []
-    for line in pathlib.Path(path).read_text().splitlines():
+    color_plan = []
+    for line in text.splitlines():
         d, s, c = line.split()
-        if not use_color:
-            s = int(s)
-        else:
-            c = c[2:-1]
-            s = int(c[:-1], base=16)
-            d = map_[c[-1]]
-        plan.append((d, s))
-    return plan
+        plan.append((d, int(s)))
+        c = c[2:-1]
+        color_plan.append((map_[c[-1]], int(c[:-1], base=16)))
+    return plan, color_plan
 
 
 def get_corner_points_and_edge_count(plan):
@@ -62,22 +68,121 @@ def compute_area(corner_points, edge_count):
     return int(abs(twice_area / 2) + edge_count / 2 + 1)
 
 
-def main():
-    plan = read_dig_plan("example.txt")
-    points, edge_count = get_corner_points_and_edge_count(plan)
-    assert compute_area(points, edge_count) == 62
+class Lagoon:
+    """Area of the lagoon dug so far, updated one step at a time.
+
+    Accumulates the shoelace sum of the corners and the length of the
+    edge, so that no corner needs to be kept. The area is exact for a
+    closed plan, in integer arithmetic.
+    """
+
+    def __init__(self):
+        self.position = (0, 0)
+        self.twice_area = 0
+        self.edge_count = 0
+
+    def dig(self, direction, step):
+        i, j = self.position
+        match direction:
+            case "L":
+                position = (i, j - step)
+            case "R":
+                position = (i, j + step)
+            case "U":
+                position = (i + step, j)
+            case "D":
+                position = (i - step, j)
+        self.twice_area += det([[i, position[0]], [j, position[1]]])
+        self.edge_count += step
+        self.position = position
+
+    @property
+    def area(self):
+        return abs(self.twice_area) // 2 + self.edge_count // 2 + 1
+
+
+def trench_image(plan, max_size=None):
+    """The trench and its lagoon, with up at the top of the image."""
+
+    # Imported here to keep it out of the import time of the day
+    from aoc import render
+
+    if max_size is None:
+        max_size = render.MAX_SIZE
+    points, _ = get_corner_points_and_edge_count(plan)
+    return render.polygon_image([(-i, j) for i, j in points], max_size)
+
 
-    plan = read_dig_plan("example.txt", use_color=True)
-    points, edge_count = get_corner_points_and_edge_count(plan)
-    assert compute_area(points, edge_count) == 952408144115
+def parse(text):
+    return read_dig_plans(text)
 
-    plan = read_dig_plan("input.txt")
-    points, edge_count = get_corner_points_and_edge_count(plan)
-    assert compute_area(points, edge_count) == 92758
 
-    plan = read_dig_plan("input.txt", use_color=True)
-    points, edge_count = get_corner_points_and_edge_count(plan)
-    assert compute_area(points, edge_count) == 62762509300678
+def part1(plans):
+    points, edge_count = get_corner_points_and_edge_count(plans[0])
+    return compute_area(points, edge_count)
+
+
+def part2(plans):
+    points, edge_count = get_corner_points_and_edge_count(plans[1])
+    return compute_area(points, edge_count)
+
+
+def solve_stream(stream):
+    """Both parts in one pass over the lines of `stream`."""
+
+    map_ = {"0": "R", "1": "D", "2": "L", "3": "U"}
+    lagoon, color_lagoon = Lagoon(), Lagoon()
+    for line in inputs.iter_lines(stream):
+        d, s, c = line.split()
+        lagoon.dig(d, int(s))
+        c = c[2:-1]
+        color_lagoon.dig(map_[c[-1]], int(c[:-1], base=16))
+    return {"part1": lagoon.area, "part2": color_lagoon.area}
+
+
+def generate(scale=1, seed=0):
+    """Synthetic dig plan with about `scale` times the steps of the real one.
+
+    Both plans trace the same random simple polygon, with short edges for
+    part 1 and long ones, encoded in the colors, for part 2.
+    """
+
+    rng = random.Random(seed)
+    columns = 150 * scale
+    corners = synthetic.column_convex_polygon(rng, columns, 40)
+    short = (
+        synthetic.stretch(rng, 40, 1, 6),
+        synthetic.stretch(rng, columns, 1, 6),
+    )
+    long = (
+        synthetic.stretch(rng, 40, 1, 20000),
+        synthetic.stretch(rng, columns, 1, 20000),
+    )
+    codes = {"R": 0, "D": 1, "L": 2, "U": 3}
+    lines = []
+    for (r1, c1), (r2, c2) in zip(corners, corners[1:] + corners[:1]):
+        if r1 != r2:
+            direction = "U" if r2 > r1 else "D"
+            step = abs(short[0][r2] - short[0][r1])
+            color_step = abs(long[0][r2] - long[0][r1])
+        else:
+            direction = "R" if c2 > c1 else "L"
+            step = abs(short[1][c2] - short[1][c1])
+            color_step = abs(long[1][c2] - long[1][c1])
+        lines.append(
+            f"{direction} {step} (#{color_step:05x}{codes[direction]})"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    plans = read_dig_plans((HERE / "example.txt").read_text())
+    assert part1(plans) == 62
+    assert part2(plans) == 952408144115
+
+    plans = read_dig_plans((HERE / "input.txt").read_text())
+    assert part1(plans) == 92758
+    assert part2(plans) == 62762509300678
 
     rprint("All tests passed.")
 
@@ -1,10 +1,20 @@
 #!/usr/bin/env python
 
+import collections
 import dataclasses
+import math
 import pathlib
+import random
 import re
+import sys
 
-from rich import print as rprint
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from aoc import inputs  # noqa: E402
+from aoc.intervals import IntervalSet  # noqa: E402
+from aoc.output import print as rprint  # noqa: E402
+
+HERE = pathlib.Path(__file__).parent
 
 WORKFLOW_PATTERN = re.compile(
     r"^([a-z]+){(([xmas][<>]\d+:[a-zAR]+,)+)([a-zAR]+)}$"
@@ -17,8 +27,11 @@ PART_PATTERN = re.compile(
     r"^{x=(?P<x>\d+),m=(?P<m>\d+),a=(?P<a>\d+),s=(?P<s>\d+)}$"
 )
 
+CATEGORIES = "xmas"
+RATINGS = IntervalSet([(1, 4001)])
 
-@dataclasses.dataclass
+
+@dataclasses.dataclass(slots=True)
 class Rule:
     category: str
     operation: str
@@ -60,7 +73,7 @@ class Workflow:
         return cls(groups[0], rules, groups[-1])
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Part:
     x: int
     m: int
@@ -86,9 +99,9 @@ class Part:
 
 
 def read_workflows_and_parts(
-    path: pathlib.Path,
+    text: str,
 ) -> tuple[dict[str, Workflow], list[Part]]:
-    workflows_lines, part_lines = pathlib.Path(path).read_text().split("\n\n")
+    workflows_lines, part_lines = text.split("\n\n")
     workflows = {}
     for line in workflows_lines.split("\n"):
         workflow = Workflow.from_string(line)
@@ -99,21 +112,183 @@ def read_workflows_and_parts(
     return workflows, parts
 
 
-def part1(path):
-    workflows, parts = read_workflows_and_parts(path)
-    ratings = []
+def parse(text):
+    return read_workflows_and_parts(text)
+
+
+def accepted_rating(part, workflows):
+    """The part's total rating if it is accepted, else 0."""
+
+    next_destination = "in"
+    while next_destination not in "RA":
+        next_destination = part.process(workflows[next_destination])
+    return part.add_ratings() if next_destination == "A" else 0
+
+
+def part1(workflows_and_parts):
+    workflows, parts = workflows_and_parts
+    return sum(accepted_rating(part, workflows) for part in parts)
+
+
+def num_accepted(workflows):
+    """The number of rating combinations that are accepted.
+
+    The parts still to sort are boxes, one set of ratings per category,
+    starting with every rating at "in". Each rule splits a box in two
+    along its category: the parts it sends on, and the rest for the next
+    rule.
+    """
+
+    total = 0
+    boxes = [("in", (RATINGS,) * len(CATEGORIES))]
+    while boxes:
+        name, box = boxes.pop()
+        if name == "A":
+            total += math.prod(ratings.size for ratings in box)
+            continue
+        if name == "R":
+            continue
+        workflow = workflows[name]
+        for rule in workflow.rules:
+            k = CATEGORIES.index(rule.category)
+            if rule.operation == "<":
+                sent, rest = box[k].split(rule.rating)
+            else:
+                rest, sent = box[k].split(rule.rating + 1)
+            if sent:
+                boxes.append(
+                    (rule.destination, box[:k] + (sent,) + box[k + 1 :])
+                )
+            if not rest:
+                break
+            box = box[:k] + (rest,) + box[k + 1 :]
+        else:
+            boxes.append((workflow.final_destination, box))
+    return total
+
+
+def part2(workflows_and_parts):
+    workflows, _ = workflows_and_parts
+    return num_accepted(workflows)
+
+
+def num_accepted_reference(workflows, name="in", box=None):
+    """`num_accepted` by recursion, with inclusive `(low, high)` bounds."""
+
+    if box is None:
+        box = {category: (1, 4000) for category in CATEGORIES}
+    if name == "R":
+        return 0
+    if name == "A":
+        return math.prod(high - low + 1 for low, high in box.values())
+    total = 0
+    workflow = workflows[name]
+    for rule in workflow.rules:
+        low, high = box[rule.category]
+        if rule.operation == "<":
+            sent = (low, min(high, rule.rating - 1))
+            rest = (max(low, rule.rating), high)
+        else:
+            sent = (max(low, rule.rating + 1), high)
+            rest = (low, min(high, rule.rating))
+        if sent[0] <= sent[1]:
+            total += num_accepted_reference(
+                workflows, rule.destination, {**box, rule.category: sent}
+            )
+        if rest[0] > rest[1]:
+            return total
+        box = {**box, rule.category: rest}
+    return total + num_accepted_reference(
+        workflows, workflow.final_destination, box
+    )
+
+
+def part2_reference(workflows_and_parts):
+    workflows, _ = workflows_and_parts
+    return num_accepted_reference(workflows)
+
+
+ENGINES = {"part2": {"reference": part2_reference, "fast": part2}}
+
+
+def solve_stream(stream):
+    """Part 1 from `stream`, keeping only the workflows in memory."""
+
+    lines = inputs.iter_lines(stream)
+    workflows = {}
+    for line in lines:
+        if not line:
+            break
+        workflow = Workflow.from_string(line)
+        workflows[workflow.name] = workflow
+    return {
+        "part1": sum(
+            accepted_rating(Part.from_string(line), workflows)
+            for line in lines
+            if line
+        )
+    }
+
+
+def microbenchmarks(workflows_and_parts):
+    """`Rule.evaluate` on the ratings the parts are checked with."""
+
+    workflows, parts = workflows_and_parts
+    arguments = []
     for part in parts:
         next_destination = "in"
         while next_destination not in "RA":
-            next_destination = part.process(workflows[next_destination])
-            if next_destination == "A":
-                ratings.append(part.add_ratings())
-    return sum(ratings)
+            workflow = workflows[next_destination]
+            for rule in workflow.rules:
+                arguments.append((rule, getattr(part, rule.category)))
+            next_destination = part.process(workflow)
+    return {"Rule.evaluate": (Rule.evaluate, arguments)}
+
+
+def generate(scale=1, seed=0):
+    """Synthetic system with `scale` times the workflows and parts.
+
+    Workflows form a random tree below "in", so every part is accepted or
+    rejected.
+    """
+
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    num_workflows = 550 * scale
+    names: set[str] = {"in"}
+    while len(names) < num_workflows:
+        names.add("".join(rng.choices(alphabet, k=rng.randint(2, 5))))
+    order = ["in"] + rng.sample(sorted(names - {"in"}), len(names) - 1)
+    # Each workflow after the first is sent to by an earlier one
+    children = collections.defaultdict(list)
+    for k, name in enumerate(order[1:], start=1):
+        children[order[rng.randrange(k)]].append(name)
+    lines = []
+    for name in order:
+        destinations = children[name] + rng.choices(
+            "AR", k=rng.randint(max(0, 2 - len(children[name])), 2)
+        )
+        rng.shuffle(destinations)
+        rules = [
+            f"{rng.choice('xmas')}{rng.choice('<>')}{rng.randint(1, 4000)}"
+            f":{destination}"
+            for destination in destinations[:-1]
+        ]
+        lines.append(f"{name}{{{','.join(rules)},{destinations[-1]}}}")
+    rng.shuffle(lines)
+    parts = [
+        "{" + ",".join(f"{c}={rng.randint(1, 4000)}" for c in "xmas") + "}"
+        for _ in range(200 * scale)
+    ]
+    return "\n".join(lines) + "\n\n" + "\n".join(parts)
 
 
 def main():
-    assert part1("example.txt") == 19114
-    assert part1("input.txt") == 319062
+    assert part1(parse((HERE / "example.txt").read_text())) == 19114
+    assert part1(parse((HERE / "input.txt").read_text())) == 319062
+
+    assert part2(parse((HERE / "example.txt").read_text())) == 167409079868000
+    assert part2(parse((HERE / "input.txt").read_text())) == 118638369682135
     rprint("All tests passed.")
 
 
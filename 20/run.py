@@ -5,9 +5,17 @@ import collections
 import dataclasses
 import enum
 import pathlib
-from typing import Deque
+import random
+import sys
+from array import array
+from typing import Any, Callable, Deque, Iterator
 
-from rich import print as rprint
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from aoc import graph  # noqa: E402
+from aoc.output import print as rprint  # noqa: E402
+
+HERE = pathlib.Path(__file__).parent
 
 
 class Pulse(enum.Enum):
@@ -15,7 +23,7 @@ class Pulse(enum.Enum):
     HIGH = 1
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Message:
     pulse: Pulse
     source: str
@@ -98,12 +106,12 @@ class ButtonModule(Module):
         ]
 
 
-def read_modules(path: str) -> dict[str, Module]:
+def read_modules(text: str) -> dict[str, Module]:
     modules: dict[str, Module] = {}
     inputs = collections.defaultdict(list)
     conjunction_destinations = {}
 
-    for line in pathlib.Path(path).read_text().splitlines():
+    for line in text.splitlines():
         module_spec, destinations_str = line.split(" -> ")
         destinations = destinations_str.split(", ")
 
@@ -128,31 +136,234 @@ def read_modules(path: str) -> dict[str, Module]:
     return modules
 
 
-def part1(modules: dict[str, Module]) -> int:
+def parse(text: str) -> dict[str, Module]:
+    return read_modules(text)
+
+
+def push_button(modules: dict[str, Module]) -> Iterator[Message]:
+    """The messages sent by one push of the button, as they are received.
+
+    Each message is yielded before its destination processes it.
+    """
+
+    queue: Deque[Message] = collections.deque(modules["button"].process())
+    while queue:
+        message = queue.popleft()
+        yield message
+        module = modules.get(message.destination)
+        if module is not None:
+            next_messages = module.process(message)
+            for next_message in next_messages:
+                queue.append(next_message)
+
+
+def part1_reference(modules: dict[str, Module]) -> int:
     highs = 0
     lows = 0
     for _ in range(1000):
-        queue: Deque[Message] = collections.deque(modules["button"].process())
-        while queue:
-            message = queue.popleft()
+        for message in push_button(modules):
             match message.pulse:
                 case Pulse.HIGH:
                     highs += 1
                 case Pulse.LOW:
                     lows += 1
-            module = modules.get(message.destination)
-            if module is not None:
-                next_messages = module.process(message)
-                for next_message in next_messages:
-                    queue.append(next_message)
 
     return highs * lows
 
 
+FORWARD, FLIP_FLOP, CONJUNCTION = range(3)
+
+
+State = tuple[bytes, bytes, bytes]
+
+
+def pulse_machine(
+    modules: dict[str, Module],
+) -> tuple[State, Callable[[State], tuple[State, tuple[int, int]]]]:
+    """The state of `modules` and a push of the button from a state.
+
+    Simulated on integer ids: the modules are the nodes of a graph, and a
+    message is `2 * edge + pulse`, where `edge` indexes the graph's
+    targets. The state is which flip-flops are on, the last pulse along
+    each edge into a conjunction, and how many of those were high for
+    each. A push returns the next state, and the low and high pulses sent.
+    `modules` are left unchanged.
+    """
+
+    names = graph.Interner(modules)
+    for module in modules.values():
+        for destination in module.destinations:
+            names.intern(destination)
+    network = graph.Graph.from_successors(
+        (
+            [names[destination] for destination in modules[name].destinations]
+            if name in modules
+            else ()
+        )
+        for name in names.names
+    )
+    offsets, targets = network.offsets, network.targets
+
+    kinds = bytearray(len(names))
+    on = bytearray(len(names))
+    last_high = bytearray(len(targets))
+    num_high = array("i", [0]) * len(names)
+    num_inputs = array("i", [0]) * len(names)
+    for name, module in modules.items():
+        node = names[name]
+        if isinstance(module, FlipFlopModule):
+            kinds[node] = FLIP_FLOP
+            on[node] = module.on
+        elif isinstance(module, ConjunctionModule):
+            kinds[node] = CONJUNCTION
+    # Edges are numbered in the order the graph lists them
+    for edge, (source, target) in enumerate(network.edges()):
+        num_inputs[target] += 1
+        module = modules.get(names.names[target])
+        if (
+            isinstance(module, ConjunctionModule)
+            and module.input_states.get(names.names[source]) == Pulse.HIGH
+        ):
+            last_high[edge] = 1
+            num_high[target] += 1
+
+    button = names["button"]
+    queue: Deque[int] = collections.deque()
+
+    def press(state: State) -> tuple[State, tuple[int, int]]:
+        on = bytearray(state[0])
+        last_high = bytearray(state[1])
+        num_high = array("i")
+        num_high.frombytes(state[2])
+        counts = [0, 0]
+        queue.extend(
+            2 * edge for edge in range(offsets[button], offsets[button + 1])
+        )
+        while queue:
+            message = queue.popleft()
+            edge, high = message >> 1, message & 1
+            counts[high] += 1
+            node = targets[edge]
+            kind = kinds[node]
+            if kind == FLIP_FLOP:
+                if high:
+                    continue
+                on[node] ^= 1
+                high = on[node]
+            elif kind == CONJUNCTION:
+                if last_high[edge] != high:
+                    last_high[edge] = high
+                    num_high[node] += 1 if high else -1
+                high = int(num_high[node] != num_inputs[node])
+            queue.extend(
+                2 * next_edge + high
+                for next_edge in range(offsets[node], offsets[node + 1])
+            )
+        state = (bytes(on), bytes(last_high), num_high.tobytes())
+        return state, (counts[0], counts[1])
+
+    return (bytes(on), bytes(last_high), num_high.tobytes()), press
+
+
+def pulse_counts(modules: dict[str, Module], presses: int) -> list[int]:
+    """Low and high pulses sent in `presses` pushes of the button.
+
+    Once the modules are back in an earlier state, the pushes repeat, and
+    the rest of the counts are extrapolated from those of a cycle.
+    """
+
+    # Imported here to keep it out of the import time of the day
+    from aoc import cycles
+
+    start, press = pulse_machine(modules)
+    trajectory = cycles.detect(
+        start, press, limit=presses, name="20 button presses"
+    )
+    lows, highs = trajectory.total(
+        presses, lambda a, b: (a[0] + b[0], a[1] + b[1]), (0, 0)
+    )
+    return [lows, highs]
+
+
+def part1(modules: dict[str, Module]) -> int:
+    lows, highs = pulse_counts(modules, 1000)
+    return lows * highs
+
+
+ENGINES = {"part1": {"reference": part1_reference, "fast": part1}}
+
+
+def microbenchmarks(
+    modules: dict[str, Module],
+) -> dict[str, tuple[Callable[..., Any], list[tuple[Any, ...]]]]:
+    """The `process` of each kind of module, on the messages it receives.
+
+    The messages are those of the first 100 pushes of the button.
+    """
+
+    benchmarks: dict[str, tuple[Callable[..., Any], list[tuple[Any, ...]]]]
+    benchmarks = {
+        "ButtonModule.process": (
+            ButtonModule.process,
+            [(modules["button"],)],
+        )
+    }
+    for _ in range(100):
+        for message in push_button(modules):
+            module = modules.get(message.destination)
+            if module is not None:
+                kind = type(module)
+                benchmarks.setdefault(
+                    f"{kind.__name__}.process", (kind.process, [])
+                )[1].append((module, message))
+    return benchmarks
+
+
+def generate(scale: int = 1, seed: int = 0) -> str:
+    """Synthetic configuration with `scale` times the modules.
+
+    Like the real input, the broadcaster feeds chains of 12 flip-flops
+    that count button presses, each reset by a conjunction.
+    """
+
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    num_chains = 4 * scale
+    names: set[str] = set()
+    while len(names) < num_chains * 14 + 1:
+        name = "".join(rng.choices(alphabet, k=rng.randint(2, 4)))
+        if name not in ("rx", "broadcaster"):
+            names.add(name)
+    fresh = iter(sorted(names))
+    final = next(fresh)
+    lines = [f"&{final} -> rx"]
+    firsts = []
+    for _ in range(num_chains):
+        flip_flops = [next(fresh) for _ in range(12)]
+        conjunction, inverter = next(fresh), next(fresh)
+        firsts.append(flip_flops[0])
+        # Flip-flops whose bits make up the period of the chain
+        feeds = {0, 11} | {k for k in range(1, 11) if rng.random() < 0.5}
+        for k, flip_flop in enumerate(flip_flops):
+            destinations = flip_flops[k + 1 : k + 2]
+            if k in feeds:
+                destinations.append(conjunction)
+            lines.append(f"%{flip_flop} -> {', '.join(destinations)}")
+        resets = [flip_flops[k] for k in range(12) if k not in feeds]
+        lines.append(
+            f"&{conjunction} -> "
+            + ", ".join([flip_flops[0], *resets, inverter])
+        )
+        lines.append(f"&{inverter} -> {final}")
+    lines.append(f"broadcaster -> {', '.join(firsts)}")
+    rng.shuffle(lines)
+    return "\n".join(lines)
+
+
 def main():
-    assert part1(read_modules("example1.txt")) == 32000000
-    assert part1(read_modules("example2.txt")) == 11687500
-    assert part1(read_modules("input.txt")) == 743090292
+    assert part1(read_modules((HERE / "example1.txt").read_text())) == 32000000
+    assert part1(read_modules((HERE / "example2.txt").read_text())) == 11687500
+    assert part1(read_modules((HERE / "input.txt").read_text())) == 743090292
     rprint("All tests passed.")
 
 
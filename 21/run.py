@@ -1,43 +1,67 @@
 #!/usr/bin/env python
 
 import pathlib
+import random
+import sys
 
-from rich import print as rprint
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
 
+from aoc import graph, synthetic  # noqa: E402
+from aoc.grid import Grid  # noqa: E402
+from aoc.output import print as rprint  # noqa: E402
 
-def read_grid(path):
-    rows = []
-    for i, line in enumerate(pathlib.Path(path).read_text().splitlines()):
-        row = []
-        for j in range(len(line)):
-            if line[j] == "S":
-                start = (i, j)
-            row.append(line[j])
-        rows.append(row)
-    return rows, start
+HERE = pathlib.Path(__file__).parent
+
+ROCK = ord("#")
+
+
+def read_grid(text):
+    # The border is rock, so every neighbor offset stays in the grid
+    grid = Grid.from_text(text, border="#")
+    start = grid.cells.index(b"S")
+    return grid, start
 
 
 def get_neighbors(tile, grid):
-    num_rows = len(grid)
-    num_cols = len(grid[0])
-    i, j = tile
-    neighbors = [(i, j + 1), (i, j - 1), (i + 1, j), (i - 1, j)]
-    if i == 0:
-        neighbors.remove((i - 1, j))
-    if j == 0:
-        neighbors.remove((i, j - 1))
-    if i == num_rows - 1:
-        neighbors.remove((i + 1, j))
-    if j == num_cols - 1:
-        neighbors.remove((i, j + 1))
+    cells = grid.cells
     return [
         neighbor
-        for neighbor in neighbors
-        if grid[neighbor[0]][neighbor[1]] in ".S"
+        for neighbor in (tile + step for step in grid.neighbors4)
+        if cells[neighbor] != ROCK
     ]
 
 
-def part1(grid, start, max_steps):
+def parse(text):
+    return read_grid(text)
+
+
+def garden_graph(grid):
+    """Each plot leads to the plots next to it; the rocks lead nowhere."""
+
+    cells = grid.cells
+    return graph.Graph.from_successors(
+        get_neighbors(tile, grid) if cells[tile] != ROCK else ()
+        for tile in range(len(cells))
+    )
+
+
+def num_reachable(grid, start, max_steps):
+    """Plots where a walk of exactly `max_steps` steps can end.
+
+    Every step changes the parity of the row plus the column, and a walk
+    can step back and forth to waste two steps, so these are the plots at
+    a distance of at most `max_steps` with the same parity.
+    """
+
+    distances = graph.bfs(garden_graph(grid), [start], max_steps)
+    return sum(
+        1
+        for distance in distances
+        if distance != graph.UNREACHED and distance % 2 == max_steps % 2
+    )
+
+
+def num_reachable_reference(grid, start, max_steps):
     depths = {0: [start]}
     for i in range(1, max_steps + 1):
         children = set([])
@@ -48,12 +72,51 @@ def part1(grid, start, max_steps):
     return len(depths[max_steps])
 
 
+def part1_reference(garden):
+    grid, start = garden
+    return num_reachable_reference(grid, start, 64)
+
+
+def part1(garden):
+    grid, start = garden
+    return num_reachable(grid, start, 64)
+
+
+ENGINES = {"part1": {"reference": part1_reference, "fast": part1}}
+
+
+def microbenchmarks(garden):
+    """`get_neighbors` of every plot."""
+
+    grid, _ = garden
+    return {
+        "get_neighbors": (
+            get_neighbors,
+            [
+                (tile, grid)
+                for tile, cell in enumerate(grid.cells)
+                if cell != ROCK
+            ],
+        )
+    }
+
+
+def generate(scale=1, seed=0):
+    """Synthetic garden with `scale` times the plots of the real one."""
+
+    rng = random.Random(seed)
+    size = synthetic.side(131, scale) | 1
+    rows = [rng.choices(".#", weights=[85, 15], k=size) for _ in range(size)]
+    rows[size // 2][size // 2] = "S"
+    return "\n".join("".join(row) for row in rows)
+
+
 def main():
-    grid, start = read_grid("example.txt")
-    assert part1(grid, start, 6) == 16
+    grid, start = read_grid((HERE / "example.txt").read_text())
+    assert num_reachable(grid, start, 6) == 16
+    assert num_reachable_reference(grid, start, 6) == 16
 
-    grid, start = read_grid("input.txt")
-    assert part1(grid, start, 64) == 3562
+    assert part1(parse((HERE / "input.txt").read_text())) == 3562
     rprint("All tests passed.")
 
 
@@ -0,0 +1,660 @@
+"""Command line entry point, run as `python -m aoc <command>`."""
+
+import argparse
+import json
+import os
+import pathlib
+import resource
+import sys
+import time
+
+from aoc import (
+    batch,
+    bench,
+    cache,
+    daemon,
+    days,
+    engines,
+    history,
+    inputs,
+    layout,
+    memory,
+    microbench,
+    parallel,
+    profiling,
+    results,
+    scaling,
+    startup,
+    watch,
+)
+
+
+def select_days(names: list[str]) -> list[pathlib.Path]:
+    if not names:
+        return days.day_directories()
+    return [days.find_day(name) for name in names]
+
+
+def bench_command(args: argparse.Namespace) -> int:
+    if args.profile is not None:
+        for day_directory in select_days(args.days):
+            print(
+                profiling.profile_phase(
+                    day_directory, args.profile, args.top, engine=args.engine
+                )
+            )
+        return 0
+    if args.memory:
+        usages = []
+        for day_directory in select_days(args.days):
+            usages.extend(memory.measure_day(day_directory, args.top))
+        print(memory.format_report(usages))
+        return 0
+    tasks = parallel.make_tasks(select_days(args.days), args.split_parts)
+    jobs = args.jobs or os.cpu_count() or 1
+    start = time.perf_counter()
+    result_cache = results.ResultCache(
+        {
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+            "parse_cache": args.parse_cache,
+            "engine": args.engine,
+            "progress": args.progress,
+        },
+        force=args.force,
+    )
+    timings, failures, invalidations = parallel.run(
+        tasks,
+        jobs,
+        args.warmup,
+        args.repeat,
+        args.parse_cache,
+        result_cache,
+        args.engine,
+        args.progress,
+    )
+    wall_time = time.perf_counter() - start
+    print(bench.format_table(timings))
+    print(f"wall time {wall_time:.3f} s on {jobs} process(es)")
+    if any(timing.throughput for timing in timings):
+        print(bench.format_throughput(timings))
+    if invalidations:
+        print(bench.format_invalidations(invalidations))
+    if failures:
+        print(bench.format_failures(failures))
+    if args.json is not None:
+        args.json.write_text(
+            bench.to_json(timings, failures, invalidations) + "\n"
+        )
+    measured = [timing for timing in timings if not timing.cached]
+    # The history tracks the engines that normally run, uninstrumented,
+    # parsing rather than loading from the parse cache
+    if (
+        args.record
+        and measured
+        and args.engine == engines.DEFAULT
+        and not args.progress
+        and not args.parse_cache
+    ):
+        history.record(measured)
+    return 1 if failures else 0
+
+
+def cache_command(args: argparse.Namespace) -> int:
+    parse_cache = cache.ParseCache()
+    if args.clear:
+        parse_cache.clear()
+    entries = parse_cache.entries()
+    print(
+        f"{len(entries)} parsed input(s), {parse_cache.size() / 2**20:.1f}"
+        f" MiB of {parse_cache.max_bytes / 2**20:.0f} MiB"
+        f" in {parse_cache.directory}"
+    )
+    return 0
+
+
+def compare_command(args: argparse.Namespace) -> int:
+    with history.connect() as connection:
+        commits = history.recorded_commits(connection)
+        if args.candidate is not None:
+            candidate = history.git("rev-parse", args.candidate)
+        elif commits:
+            candidate = commits[0]
+        else:
+            print("no benchmark history on this machine")
+            return 2
+        if args.baseline is not None:
+            baseline = history.git("rev-parse", args.baseline)
+        else:
+            older = [commit for commit in commits if commit != candidate]
+            if not older:
+                print("no other commit to compare against")
+                return 2
+            baseline = older[0]
+        comparisons = history.compare(
+            history.load_samples(connection, baseline),
+            history.load_samples(connection, candidate),
+            args.threshold,
+            args.alpha,
+        )
+    print(f"{baseline[:12]} -> {candidate[:12]}")
+    print(history.format_comparisons(comparisons))
+    regressions = [c for c in comparisons if c.regression]
+    if regressions:
+        print(f"{len(regressions)} regression(s)")
+        return 1
+    return 0
+
+
+def scaling_command(args: argparse.Namespace) -> int:
+    points = []
+    fits = []
+    for day_directory in select_days(args.days):
+        module = days.load(day_directory)
+        if not hasattr(module, "generate"):
+            continue
+        day_points = scaling.scale_day(
+            day_directory, tuple(args.scales), args.seed, args.timeout
+        )
+        points.extend(day_points)
+        fits.extend(scaling.fit(day_points, args.tolerance))
+    print(scaling.format_report(points, fits, tuple(args.scales)))
+    return 1 if any(fit.flagged for fit in fits) else 0
+
+
+def importtime_command(args: argparse.Namespace) -> int:
+    costs = [
+        startup.measure(day_directory)
+        for day_directory in select_days(args.days)
+    ]
+    print(startup.format_report(costs, args.top))
+    return 0
+
+
+def diff_command(args: argparse.Namespace) -> int:
+    mismatches = []
+    for day_directory in select_days(args.days):
+        compared, day_mismatches = engines.diff_day(
+            day_directory, args.random, args.seed
+        )
+        for line in compared:
+            print(line)
+        mismatches.extend(day_mismatches)
+    if mismatches:
+        print(engines.format_mismatches(mismatches))
+        return 1
+    print("all engines agree")
+    return 0
+
+
+def batch_command(args: argparse.Namespace) -> int:
+    paths = batch.expand(args.inputs)
+    if not paths:
+        print("no input files", file=sys.stderr)
+        return 2
+    jobs = args.jobs or os.cpu_count() or 1
+    output = sys.stdout if args.output is None else args.output.open("w")
+    failed = 0
+    start = time.perf_counter()
+    try:
+        for record in batch.run(args.day, paths, jobs, args.engine):
+            failed += record["error"] is not None
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(
+        f"{len(paths)} file(s), {failed} failed,"
+        f" {time.perf_counter() - start:.3f} s on {jobs} process(es)",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+def layout_command(args: argparse.Namespace) -> int:
+    layouts = []
+    for day_directory in select_days(args.days):
+        layouts.extend(layout.audit_day(day_directory))
+    print(layout.format_report(layouts))
+    return 0
+
+
+def microbench_command(args: argparse.Namespace) -> int:
+    results = []
+    for day_directory in select_days(args.days):
+        results.extend(
+            microbench.bench_day(
+                day_directory, args.samples, args.warmup, args.min_time
+            )
+        )
+    print(microbench.format_report(results))
+    if args.baseline is not None:
+        print()
+        print(
+            microbench.format_comparison(
+                microbench.load_json(args.baseline), results
+            )
+        )
+    if args.json is not None:
+        args.json.write_text(microbench.to_json(results) + "\n")
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    server = daemon.Daemon(args.workers, args.cache_size)
+    print(
+        f"{server.num_days} days loaded, listening on {args.socket}",
+        file=sys.stderr,
+    )
+    try:
+        server.serve(args.socket)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def client_command(args: argparse.Namespace) -> int:
+    payload = {"op": args.op}
+    if args.op in ("solve", "bench"):
+        if args.day is None:
+            print(f"{args.op} needs a day", file=sys.stderr)
+            return 2
+        payload.update(day=args.day, engine=args.engine)
+        if args.part is not None:
+            payload["part"] = args.part
+        if args.input == "-":
+            payload["input"] = sys.stdin.read()
+        elif args.input is not None:
+            # The daemon may run from another directory
+            payload["path"] = str(pathlib.Path(args.input).resolve())
+        if args.op == "bench":
+            payload.update(warmup=args.warmup, repeat=args.repeat)
+    try:
+        response = daemon.request(payload, args.socket)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"no daemon listening on {args.socket}", file=sys.stderr)
+        return 2
+    print(json.dumps(response, indent=2, default=str))
+    return 0 if response["ok"] else 1
+
+
+def watch_command(args: argparse.Namespace) -> int:
+    watcher = watch.Watcher(days.find_day(args.day), args.inputs or None)
+    changed = watcher.changed()
+    try:
+        while True:
+            watcher.reload(changed)
+            if watcher.load_error is not None:
+                print(watcher.load_error)
+            else:
+                print(watch.format_runs(watcher.run()))
+            changed = watcher.wait(args.interval)
+            print(
+                "\nchanged "
+                + ", ".join(
+                    str(path.relative_to(days.ROOT)) for path in changed
+                )
+            )
+    except KeyboardInterrupt:
+        return 0
+
+
+def stream_command(args: argparse.Namespace) -> int:
+    module = days.load(days.find_day(args.day))
+    solve_stream = getattr(module, "solve_stream", None)
+    if solve_stream is None:
+        print(
+            f"day {args.day} cannot be solved from a stream", file=sys.stderr
+        )
+        return 2
+    start = time.perf_counter()
+    with inputs.open_input(args.input, args.mmap) as stream:
+        answers = solve_stream(stream)
+    elapsed = time.perf_counter() - start
+    for part, answer in answers.items():
+        print(f"{part}: {answer}")
+    # ru_maxrss is in KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed:.3f} s, peak RSS {peak} KiB", file=sys.stderr)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m aoc")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    bench_parser = subparsers.add_parser(
+        "bench", help="time the parse, part 1 and part 2 phases of each day"
+    )
+    bench_parser.add_argument(
+        "days", nargs="*", help="days to run (default: all)"
+    )
+    bench_parser.add_argument(
+        "--warmup", type=bench.non_negative_int, default=1
+    )
+    bench_parser.add_argument("--repeat", type=bench.positive_int, default=5)
+    bench_parser.add_argument(
+        "--json", type=pathlib.Path, help="also write the timings as JSON"
+    )
+    bench_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="worker processes, 0 for one per CPU (default: 1, serial)",
+    )
+    bench_parser.add_argument(
+        "--split-parts",
+        action="store_true",
+        help="schedule part 1 and part 2 of a day as separate tasks",
+    )
+    bench_parser.add_argument(
+        "--no-record",
+        dest="record",
+        action="store_false",
+        help="do not store the timings in the benchmark history",
+    )
+    bench_parser.add_argument(
+        "--parse-cache",
+        action="store_true",
+        help="load parsed inputs from the on-disk cache",
+    )
+    bench_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="rerun days even if their code and inputs are unchanged",
+    )
+    bench_parser.add_argument(
+        "--engine",
+        choices=engines.NAMES,
+        default=engines.DEFAULT,
+        help="implementation of the parts, where a day has several"
+        f" (default: {engines.DEFAULT})",
+    )
+    bench_parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="show progress bars of the long loops, and report their"
+        " throughput",
+    )
+    bench_parser.add_argument(
+        "--profile",
+        choices=bench.PHASES,
+        help="profile this phase of the days instead of timing them",
+    )
+    bench_parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="report peak memory and allocation sites instead of timings",
+    )
+    bench_parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="functions or allocation sites to list (default: 20)",
+    )
+    bench_parser.set_defaults(func=bench_command)
+
+    cache_parser = subparsers.add_parser(
+        "cache", help="show or clear the cache of parsed inputs"
+    )
+    cache_parser.add_argument("--clear", action="store_true")
+    cache_parser.set_defaults(func=cache_command)
+
+    compare_parser = subparsers.add_parser(
+        "compare",
+        help="compare recorded timings of two commits, exit 1 on regression",
+    )
+    compare_parser.add_argument(
+        "baseline",
+        nargs="?",
+        help="baseline commit (default: previous benchmarked commit)",
+    )
+    compare_parser.add_argument(
+        "candidate",
+        nargs="?",
+        help="candidate commit (default: last benchmarked commit)",
+    )
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown of the median to flag (default: 0.1)",
+    )
+    compare_parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="significance level of the rank test (default: 0.05)",
+    )
+    compare_parser.set_defaults(func=compare_command)
+
+    scaling_parser = subparsers.add_parser(
+        "scaling",
+        help="fit how each phase scales on synthetic inputs, exit 1 if"
+        " superlinear",
+    )
+    scaling_parser.add_argument(
+        "days", nargs="*", help="days to run (default: all)"
+    )
+    scaling_parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=list(scaling.SCALES),
+        help="input sizes relative to the real input (default: 1 10 100"
+        " 1000)",
+    )
+    scaling_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="seconds allowed per scale, after which larger scales are"
+        " skipped (default: 30)",
+    )
+    scaling_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="flag phases whose exponent exceeds 1 + tolerance"
+        " (default: 0.25)",
+    )
+    scaling_parser.add_argument("--seed", type=int, default=0)
+    scaling_parser.set_defaults(func=scaling_command)
+
+    importtime_parser = subparsers.add_parser(
+        "importtime",
+        help="import cost of each day in a fresh interpreter",
+    )
+    importtime_parser.add_argument(
+        "days", nargs="*", help="days to run (default: all)"
+    )
+    importtime_parser.add_argument(
+        "--top",
+        type=int,
+        default=3,
+        help="heaviest imports to list per day (default: 3)",
+    )
+    importtime_parser.set_defaults(func=importtime_command)
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="solve a day for many input files, as JSON lines",
+    )
+    batch_parser.add_argument("day")
+    batch_parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="input files, directories of *.txt files, or globs",
+    )
+    batch_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=0,
+        help="worker processes, 0 for one per CPU (default: 0)",
+    )
+    batch_parser.add_argument(
+        "--engine", choices=engines.NAMES, default=engines.DEFAULT
+    )
+    batch_parser.add_argument(
+        "--output",
+        "-o",
+        type=pathlib.Path,
+        help="write the JSON lines here instead of standard output",
+    )
+    batch_parser.set_defaults(func=batch_command)
+
+    diff_parser = subparsers.add_parser(
+        "diff",
+        help="check that all engines of each part agree, exit 1 if not",
+    )
+    diff_parser.add_argument(
+        "days", nargs="*", help="days to run (default: all)"
+    )
+    diff_parser.add_argument(
+        "--random",
+        type=int,
+        default=5,
+        help="generated inputs to check on top of the files (default: 5)",
+    )
+    diff_parser.add_argument("--seed", type=int, default=0)
+    diff_parser.set_defaults(func=diff_command)
+
+    layout_parser = subparsers.add_parser(
+        "layout",
+        help="memory and speed of the record types, with and without slots",
+    )
+    layout_parser.add_argument(
+        "days", nargs="*", help="days to run (default: all)"
+    )
+    layout_parser.set_defaults(func=layout_command)
+
+    microbench_parser = subparsers.add_parser(
+        "microbench",
+        help="time the inner functions of the days, per call",
+    )
+    microbench_parser.add_argument(
+        "days", nargs="*", help="days to run (default: all with benchmarks)"
+    )
+    microbench_parser.add_argument(
+        "--samples",
+        type=bench.positive_int,
+        default=microbench.SAMPLES,
+        help=f"timed samples per benchmark (default: {microbench.SAMPLES})",
+    )
+    microbench_parser.add_argument(
+        "--warmup",
+        type=bench.non_negative_int,
+        default=microbench.WARMUP,
+        help=f"untimed samples first (default: {microbench.WARMUP})",
+    )
+    microbench_parser.add_argument(
+        "--min-time",
+        type=float,
+        default=microbench.MIN_SECONDS,
+        help="seconds a sample lasts at least, to calibrate the loops"
+        f" (default: {microbench.MIN_SECONDS})",
+    )
+    microbench_parser.add_argument(
+        "--json", type=pathlib.Path, help="write the results as JSON here"
+    )
+    microbench_parser.add_argument(
+        "--baseline",
+        type=pathlib.Path,
+        help="compare with results saved by --json, e.g. on another commit",
+    )
+    microbench_parser.set_defaults(func=microbench_command)
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="keep the days loaded and answer requests on a Unix socket",
+    )
+    serve_parser.add_argument(
+        "--socket", type=pathlib.Path, default=daemon.SOCKET
+    )
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=daemon.WORKERS,
+        help=f"solver processes (default: {daemon.WORKERS})",
+    )
+    serve_parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=daemon.CACHE_SIZE,
+        help=f"parsed inputs kept in memory (default: {daemon.CACHE_SIZE})",
+    )
+    serve_parser.set_defaults(func=serve_command)
+
+    client_parser = subparsers.add_parser(
+        "client", help="send one request to the daemon started by serve"
+    )
+    client_parser.add_argument(
+        "op", choices=("solve", "bench", "ping", "stats", "shutdown")
+    )
+    client_parser.add_argument("day", nargs="?")
+    client_parser.add_argument("--part", choices=days.PARTS)
+    client_parser.add_argument(
+        "--input",
+        help="input file, or - for standard input (default: the day's own)",
+    )
+    client_parser.add_argument(
+        "--engine", choices=engines.NAMES, default=engines.DEFAULT
+    )
+    client_parser.add_argument(
+        "--warmup", type=bench.non_negative_int, default=1
+    )
+    client_parser.add_argument("--repeat", type=bench.positive_int, default=5)
+    client_parser.add_argument(
+        "--socket", type=pathlib.Path, default=daemon.SOCKET
+    )
+    client_parser.set_defaults(func=client_command)
+
+    watch_parser = subparsers.add_parser(
+        "watch",
+        help="rerun a day in this process whenever its files change",
+    )
+    watch_parser.add_argument("day")
+    watch_parser.add_argument(
+        "inputs",
+        nargs="*",
+        help="input file names in the day's directory (default: all *.txt)",
+    )
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=watch.INTERVAL,
+        help=f"seconds between polls (default: {watch.INTERVAL})",
+    )
+    watch_parser.set_defaults(func=watch_command)
+
+    stream_parser = subparsers.add_parser(
+        "stream",
+        help="solve a day in one pass over a file or standard input",
+    )
+    stream_parser.add_argument("day")
+    stream_parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="input file, or - for standard input (default: -)",
+    )
+    stream_parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="read the file through a memory map",
+    )
+    stream_parser.set_defaults(func=stream_command)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except days.UnknownDay as error:
+        # Reported like the usage errors of the parser
+        parser.exit(2, f"{parser.prog}: error: {error}\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Solving one day for many input files, on a process pool.
+
+Each worker loads the day once, so module-level setup (compiled patterns,
+lookup tables, caches filled by earlier files) is shared by every file the
+worker solves. Results come back as one JSON-serializable record per file,
+in the order they finish.
+"""
+
+import concurrent.futures
+import copy
+import glob
+import os
+import pathlib
+import time
+from types import ModuleType
+from typing import Any, Iterator
+
+from aoc import days, engines, parallel
+
+# The day module of this worker process, loaded by `init_worker`
+_module: ModuleType | None = None
+_engine = engines.DEFAULT
+
+
+def init_worker(day: str, engine: str = engines.DEFAULT) -> None:
+    global _module, _engine
+    _module = days.load(days.find_day(day))
+    _engine = engine
+
+
+def solve_file(path: pathlib.Path) -> dict[str, Any]:
+    """Answers and per-phase timings for one input file."""
+
+    assert _module is not None, "init_worker was not called"
+    record: dict[str, Any] = {
+        "file": str(path),
+        "answers": {},
+        "seconds": {},
+        "error": None,
+    }
+    try:
+        text = path.read_text()
+        start = time.perf_counter()
+        parsed = _module.parse(text)
+        record["seconds"]["parse"] = time.perf_counter() - start
+        for part in days.PARTS:
+            solve = engines.select(_module, part, _engine)
+            if solve is None:
+                continue
+            argument = copy.deepcopy(parsed)
+            start = time.perf_counter()
+            record["answers"][part] = solve(argument)
+            record["seconds"][part] = time.perf_counter() - start
+    except Exception as error:
+        record["error"] = parallel.describe(error)
+    return record
+
+
+def expand(patterns: list[str]) -> list[pathlib.Path]:
+    """Input files from paths, directories (their `*.txt`) and globs."""
+
+    paths = []
+    for pattern in patterns:
+        path = pathlib.Path(pattern)
+        if path.is_dir():
+            paths.extend(sorted(path.glob("*.txt")))
+        elif glob.has_magic(pattern):
+            paths.extend(
+                pathlib.Path(match)
+                for match in sorted(glob.glob(pattern, recursive=True))
+                if os.path.isfile(match)
+            )
+        else:
+            paths.append(path)
+    return paths
+
+
+def run(
+    day: str,
+    paths: list[pathlib.Path],
+    jobs: int,
+    engine: str = engines.DEFAULT,
+) -> Iterator[dict[str, Any]]:
+    """Solves `paths` on `jobs` processes, or in this one if `jobs` is 1."""
+
+    if jobs == 1:
+        init_worker(day, engine)
+        for path in paths:
+            yield solve_file(path)
+        return
+    with concurrent.futures.ProcessPoolExecutor(
+        jobs, initializer=init_worker, initargs=(day, engine)
+    ) as executor:
+        futures = [executor.submit(solve_file, path) for path in paths]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
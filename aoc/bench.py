@@ -0,0 +1,234 @@
+"""Timing of the parse, part 1 and part 2 phases of each day."""
+
+import argparse
+import contextlib
+import copy
+import dataclasses
+import json
+import math
+import pathlib
+import statistics
+import sys
+import time
+from typing import Any, Callable
+
+from aoc import cache, days, engines, progress, throughput
+from aoc.throughput import Throughput
+
+PARTS = days.PARTS
+PHASES = ("parse",) + PARTS
+
+
+@dataclasses.dataclass
+class Timing:
+    day: str
+    phase: str
+    samples: list[float]
+    answer: Any = None
+    # Reported from the result cache rather than measured in this run
+    cached: bool = False
+    # The loops tracked by `aoc.progress`, over all the calls
+    throughput: list[Throughput] = dataclasses.field(default_factory=list)
+
+    @property
+    def min(self) -> float:
+        return min(self.samples)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def p95(self) -> float:
+        # Nearest-rank percentile, so it is always an observed sample
+        ordered = sorted(self.samples)
+        return ordered[math.ceil(0.95 * len(ordered)) - 1]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "day": self.day,
+            "phase": self.phase,
+            "min": self.min,
+            "median": self.median,
+            "p95": self.p95,
+            "samples": self.samples,
+            "answer": self.answer,
+            "cached": self.cached,
+            "throughput": [record.to_dict() for record in self.throughput],
+        }
+
+
+def positive_int(text: str) -> int:
+    """An argument type for `--repeat`, which needs at least one run."""
+
+    number = int(text)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{number} is not positive")
+    return number
+
+
+def non_negative_int(text: str) -> int:
+    number = int(text)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"{number} is negative")
+    return number
+
+
+@dataclasses.dataclass
+class Failure:
+    day: str
+    phases: tuple[str, ...]
+    error: str
+
+
+def time_calls(
+    function: Callable[[Any], Any],
+    make_argument: Callable[[], Any],
+    warmup: int,
+    repeat: int,
+) -> tuple[list[float], Any]:
+    """Time `function` on fresh arguments; returns samples and last result.
+
+    Arguments are built outside the timed region, which matters for the
+    days that mutate their parsed input (14 and 20).
+    """
+
+    if repeat < 1 or warmup < 0:
+        raise ValueError("repeat must be positive and warmup not negative")
+    for _ in range(warmup):
+        function(make_argument())
+    samples = []
+    result = None
+    for _ in range(repeat):
+        argument = make_argument()
+        start = time.perf_counter()
+        result = function(argument)
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def bench_day(
+    day_directory: pathlib.Path,
+    warmup: int = 1,
+    repeat: int = 5,
+    input_name: str = "input.txt",
+    parts: tuple[str, ...] = PARTS,
+    time_parse: bool = True,
+    parse_cache: cache.ParseCache | None = None,
+    engine: str = engines.DEFAULT,
+    track: bool = False,
+) -> list[Timing]:
+    """Times the phases of a day.
+
+    With a `parse_cache`, the parse phase loads the input from the cache
+    (after the first warmup fills it) rather than parsing it. Parts run
+    on `engine` where the day has it, and on its default engine otherwise.
+    With `track`, the parts record the throughput of their loops, and show
+    progress bars if the standard error is a terminal.
+    """
+
+    day = day_directory.name
+    module = days.load(day_directory)
+    if parse_cache is None:
+        parse = module.parse
+    else:
+        parse = lambda text: parse_cache.parse(module, text)  # noqa: E731
+    text = days.read_input(day_directory, input_name)
+    timings = []
+    if time_parse:
+        samples, parsed = time_calls(parse, lambda: text, warmup, repeat)
+        timings.append(Timing(day, "parse", samples))
+    else:
+        parsed = parse(text)
+    for part in parts:
+        solve = engines.select(module, part, engine)
+        if solve is None:
+            continue
+        records: list[Throughput] = []
+        with contextlib.ExitStack() as stack:
+            if track:
+                records = stack.enter_context(
+                    progress.recording(sys.stderr.isatty())
+                )
+            samples, answer = time_calls(
+                solve, lambda: copy.deepcopy(parsed), warmup, repeat
+            )
+        timings.append(
+            Timing(
+                day, part, samples, answer, False, throughput.combine(records)
+            )
+        )
+    return timings
+
+
+def format_table(timings: list[Timing]) -> str:
+    total = sum(timing.median for timing in timings)
+    header = (
+        f"{'day':>3}  {'phase':<6}  {'min ms':>10}  {'median ms':>10}"
+        f"  {'p95 ms':>10}  {'share':>6}  answer"
+    )
+    lines = [header, "-" * len(header)]
+    for timing in timings:
+        share = timing.median / total if total else 0.0
+        answer = "" if timing.answer is None else str(timing.answer)
+        if timing.cached:
+            answer = f"{answer} (cached)".lstrip()
+        lines.append(
+            f"{timing.day:>3}  {timing.phase:<6}"
+            f"  {timing.min * 1000:>10.3f}"
+            f"  {timing.median * 1000:>10.3f}"
+            f"  {timing.p95 * 1000:>10.3f}"
+            f"  {share:>6.1%}  {answer}"
+        )
+    lines.append("-" * len(header))
+    lines.append(f"{'total median':<13}  {total * 1000:>32.3f}")
+    return "\n".join(lines)
+
+
+def format_throughput(timings: list[Timing]) -> str:
+    header = (
+        f"{'day':>3}  {'phase':<6}  {'loop':<24}  {'items':>9}"
+        f"  {'items/s':>10}  {'p50 <':>9}  {'p99 <':>9}"
+    )
+    lines = [header, "-" * len(header)]
+    for timing in timings:
+        for record in timing.throughput:
+            lines.append(
+                f"{timing.day:>3}  {timing.phase:<6}  {record.name:<24}"
+                f"  {record.items:>9}  {record.rate:>10.1f}"
+                f"  {record.quantile(0.5) * 1000:>6.3f} ms"
+                f"  {record.quantile(0.99) * 1000:>6.3f} ms"
+            )
+            histogram = throughput.format_histogram(record.histogram)
+            lines.append(f"{'':>13}latency {histogram}")
+    return "\n".join(lines)
+
+
+def format_failures(failures: list[Failure]) -> str:
+    lines = [f"{len(failures)} failed:"]
+    for failure in failures:
+        lines.append(
+            f"  day {failure.day} ({', '.join(failure.phases)}):"
+            f" {failure.error}"
+        )
+    return "\n".join(lines)
+
+
+def format_invalidations(invalidations: list[str]) -> str:
+    return "\n".join(["recomputed:"] + [f"  {line}" for line in invalidations])
+
+
+def to_json(
+    timings: list[Timing],
+    failures: list[Failure],
+    invalidations: list[str] | None = None,
+) -> str:
+    return json.dumps(
+        {
+            "timings": [timing.to_dict() for timing in timings],
+            "failures": [dataclasses.asdict(failure) for failure in failures],
+            "invalidations": invalidations or [],
+        },
+        indent=2,
+        default=str,
+    )
@@ -0,0 +1,119 @@
+"""On-disk cache of parsed inputs, keyed by content hash.
+
+An entry is named after the SHA-256 of the input bytes and of the day's
+source, with the `aoc` modules it imports, which stands in for the parser's
+version: editing the input, the solution or a module whose classes end up
+in the pickles (`aoc.grid`, `aoc.intervals`...) gives a new key. The
+modules are found like the result cache finds them, by
+`aoc.results.dependencies`. Entries are pickles (protocol 5) read back
+through `mmap`, and the least recently used ones are evicted once the cache
+outgrows its size limit.
+"""
+
+import hashlib
+import mmap
+import os
+import pathlib
+import pickle
+import tempfile
+from types import ModuleType
+from typing import Any
+
+from aoc import days
+
+DIRECTORY = days.STATE / "cache" / "parsed"
+MAX_BYTES = 256 * 2**20
+SUFFIX = ".pickle"
+
+
+class ParseCache:
+    def __init__(
+        self, directory: pathlib.Path = DIRECTORY, max_bytes: int = MAX_BYTES
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Parser versions by the path of the day's run.py
+        self.versions: dict[str, str] = {}
+
+    def parser_version(self, module: ModuleType) -> str:
+        # Imported here, as aoc.results imports aoc.bench, which imports
+        # this module
+        from aoc import results
+
+        assert module.__file__ is not None
+        if module.__file__ not in self.versions:
+            digest = hashlib.sha256()
+            day_directory = pathlib.Path(module.__file__).parent
+            for path in results.dependencies(day_directory):
+                if path.suffix == ".py":
+                    digest.update(str(path.relative_to(days.ROOT)).encode())
+                    digest.update(hashlib.sha256(path.read_bytes()).digest())
+            self.versions[module.__file__] = digest.hexdigest()
+        return self.versions[module.__file__]
+
+    def key(self, module: ModuleType, data: bytes) -> str:
+        digest = hashlib.sha256(data)
+        digest.update(self.parser_version(module).encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> pathlib.Path:
+        return self.directory / (key + SUFFIX)
+
+    def load(self, key: str) -> tuple[bool, Any]:
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    value = pickle.loads(m)
+        except FileNotFoundError:
+            return False, None
+        # The modification time records the last use, for eviction
+        os.utime(path)
+        return True, value
+
+    def store(self, key: str, value: Any) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed, so concurrent readers never see a
+        # partial entry
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        ) as f:
+            pickle.dump(value, f, protocol=5)
+        os.replace(f.name, self.path(key))
+        self.evict()
+
+    def parse(self, module: ModuleType, text: str) -> Any:
+        """`module.parse(text)`, or its cached result."""
+
+        key = self.key(module, text.encode())
+        hit, value = self.load(key)
+        if not hit:
+            value = module.parse(text)
+            self.store(key, value)
+        return value
+
+    def entries(self) -> list[pathlib.Path]:
+        """Entries from the least to the most recently used."""
+
+        if not self.directory.exists():
+            return []
+        return sorted(
+            self.directory.glob("*" + SUFFIX),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self.entries())
+
+    def evict(self) -> None:
+        entries = self.entries()
+        size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if size <= self.max_bytes:
+                break
+            size -= entry.stat().st_size
+            entry.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for entry in self.entries():
+            entry.unlink(missing_ok=True)
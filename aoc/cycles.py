@@ -0,0 +1,287 @@
+"""Running a deterministic process until it repeats, and extrapolating.
+
+A process is a start state and a `step(state) -> (state, observation)`
+function that returns the next state and something observed during the
+step (a load, a count of pulses...). Since the next state only depends on
+the current one, once a state repeats the process cycles: with `mu` steps
+before the cycle and a cycle of `lam` steps, state `k + lam` equals state
+`k` for every `k >= mu`, and so do the observations after them.
+
+`floyd` and `brent` find `(mu, lam)` by comparing states, keeping only two
+of them. `detect` steps once through the process in bounded memory: it
+remembers a 64-bit fingerprint of each of the last `window` states rather
+than the states, plus a full state every `checkpoint_every` steps among
+them to verify a repeated fingerprint by replaying the steps since that
+checkpoint. That finds any cycle of up to `window` steps as soon as a
+state repeats. Longer cycles are found by running Brent's algorithm
+alongside, with the state at the last power of two steps as its tortoise.
+It returns the observations of the steps until the first repeat, from
+which `Trajectory` gives the observation of any step `n`, or the total of
+the first `n`:
+
+    >>> trajectory = detect(0, lambda x: ((x * x + 1) % 6, x))
+    >>> trajectory.mu, trajectory.lam
+    (2, 2)
+    >>> trajectory.value_at(10**9), trajectory.total(10**9)
+    (5, 3499999994)
+"""
+
+import collections
+import dataclasses
+import functools
+import itertools
+import operator
+from typing import Any, Callable, Hashable
+
+from aoc import progress
+
+CHECKPOINT_EVERY = 16
+WINDOW = 1024
+
+Step = Callable[[Any], tuple[Any, Any]]
+
+
+@dataclasses.dataclass
+class Trajectory:
+    # Observation of steps 1, 2..., up to the first repeated state
+    observations: list[Any]
+    # Steps before the cycle and its length, or None if the process was
+    # stopped before a state repeated
+    mu: int | None = None
+    lam: int | None = None
+
+    def step_index(self, n: int) -> int:
+        """The step of the trajectory with the same observation as `n`."""
+
+        if n <= len(self.observations):
+            return n
+        if self.mu is None or self.lam is None:
+            raise ValueError(f"step {n} is past the end, and no cycle")
+        return self.mu + 1 + (n - self.mu - 1) % self.lam
+
+    def value_at(self, n: int) -> Any:
+        return self.observations[self.step_index(n) - 1]
+
+    def observation_period(self) -> int:
+        """The shortest period of the observations within the cycle.
+
+        It divides `lam`, and is shorter when different states are
+        observed the same, such as a walker that comes back to the same
+        place at a different point of its instructions.
+        """
+
+        if self.mu is None or self.lam is None:
+            raise ValueError("no cycle")
+        cycle = self.observations[self.mu : self.mu + self.lam]
+        for period in range(1, self.lam + 1):
+            if self.lam % period == 0 and cycle == (
+                cycle[period:] + cycle[:period]
+            ):
+                return period
+        return self.lam
+
+    def total(
+        self,
+        n: int,
+        add: Callable[[Any, Any], Any] = operator.add,
+        zero: Any = 0,
+    ) -> Any:
+        """The observations of the first `n` steps, added up."""
+
+        observations = self.observations
+        if n <= len(observations):
+            return functools.reduce(add, observations[:n], zero)
+        if self.mu is None or self.lam is None:
+            raise ValueError(f"step {n} is past the end, and no cycle")
+        mu, lam = self.mu, self.lam
+        cycles, remainder = divmod(n - mu, lam)
+        prefix = functools.reduce(add, observations[:mu], zero)
+        cycle = functools.reduce(add, observations[mu : mu + lam], zero)
+        rest = functools.reduce(add, observations[mu : mu + remainder], zero)
+        return add(add(prefix, repeat(add, cycle, cycles, zero)), rest)
+
+
+def repeat(
+    add: Callable[[Any, Any], Any], value: Any, times: int, zero: Any
+) -> Any:
+    """`value` added `times` times, by doubling."""
+
+    result = zero
+    while times:
+        if times & 1:
+            result = add(result, value)
+        value = add(value, value)
+        times >>= 1
+    return result
+
+
+def floyd(
+    start: Any, step: Step, limit: int | None = None
+) -> tuple[int, int] | None:
+    """`(mu, lam)` by Floyd's tortoise and hare, or None after `limit`
+    steps of the hare without a repeat."""
+
+    def f(state: Any) -> Any:
+        return step(state)[0]
+
+    tortoise, hare = f(start), f(f(start))
+    steps = 2
+    while tortoise != hare:
+        if limit is not None and steps > 2 * limit:
+            return None
+        tortoise, hare = f(tortoise), f(f(hare))
+        steps += 2
+    mu = 0
+    tortoise = start
+    while tortoise != hare:
+        tortoise, hare = f(tortoise), f(hare)
+        mu += 1
+    lam = 1
+    hare = f(tortoise)
+    while tortoise != hare:
+        hare = f(hare)
+        lam += 1
+    return mu, lam
+
+
+def brent(
+    start: Any, step: Step, limit: int | None = None
+) -> tuple[int, int] | None:
+    """`(mu, lam)` by Brent's algorithm, or None after `limit` steps of
+    the hare without a repeat.
+
+    Takes fewer steps than Floyd's, as the tortoise teleports instead of
+    stepping.
+    """
+
+    def f(state: Any) -> Any:
+        return step(state)[0]
+
+    power = lam = 1
+    tortoise, hare = start, f(start)
+    steps = 1
+    while tortoise != hare:
+        if limit is not None and steps > 2 * limit:
+            return None
+        if power == lam:
+            tortoise = hare
+            power *= 2
+            lam = 0
+        hare = f(hare)
+        lam += 1
+        steps += 1
+    return cycle_start(start, step, lam), lam
+
+
+def cycle_start(start: Any, step: Step, lam: int) -> int:
+    """`mu` of a process with a cycle of `lam` steps."""
+
+    tortoise = hare = start
+    for _ in range(lam):
+        hare = step(hare)[0]
+    mu = 0
+    while tortoise != hare:
+        tortoise, hare = step(tortoise)[0], step(hare)[0]
+        mu += 1
+    return mu
+
+
+def observe(start: Any, step: Step, num_steps: int) -> list[Any]:
+    observations = []
+    state = start
+    for _ in range(num_steps):
+        state, observation = step(state)
+        observations.append(observation)
+    return observations
+
+
+def detect(
+    start: Any,
+    step: Step,
+    limit: int | None = None,
+    fingerprint: Callable[[Any], Hashable] = hash,
+    checkpoint_every: int = CHECKPOINT_EVERY,
+    window: int = WINDOW,
+    name: str = "cycle search",
+) -> Trajectory:
+    """The trajectory up to the first repeated state, or `limit` steps.
+
+    `fingerprint` maps a state to a compact key, 64 bits for the default
+    `hash`; two states with the same key are compared in full before they
+    count as a repeat. Besides the observations, at most `window`
+    fingerprints and `window // checkpoint_every + 2` states are kept. A
+    cycle longer than `window` is found up to about twice as many steps
+    late, and then takes `2 * mu + lam` more steps to find where it
+    starts, so one may also go unnoticed before `limit`. The steps are
+    tracked by `aoc.progress` as `name`.
+    """
+
+    # Steps of the last `window` states by fingerprint, and the
+    # fingerprints in step order
+    seen: dict[Hashable, list[int]] = {fingerprint(start): [0]}
+    recent = collections.deque([fingerprint(start)])
+    checkpoints = collections.deque([(0, start)])
+
+    def state_at(k: int) -> Any:
+        base, state = next(
+            (base, state) for base, state in reversed(checkpoints) if base <= k
+        )
+        for _ in range(k - base):
+            state = step(state)[0]
+        return state
+
+    # Brent's tortoise, at the last power of two steps
+    tortoise, tortoise_key, power, distance = start, recent[0], 1, 0
+    observations = []
+    state = start
+    steps = itertools.count(1) if limit is None else range(1, limit + 1)
+    for k in progress.track(steps, name, limit):
+        state, observation = step(state)
+        observations.append(observation)
+        key = fingerprint(state)
+        earlier = seen.setdefault(key, [])
+        for i in earlier:
+            if state_at(i) == state:
+                return Trajectory(observations, i, k - i)
+        earlier.append(k)
+        recent.append(key)
+        if len(recent) > window:
+            # Forget step k - window, the oldest one
+            old = recent.popleft()
+            seen[old].pop(0)
+            if not seen[old]:
+                del seen[old]
+        if k % checkpoint_every == 0:
+            checkpoints.append((k, state))
+            # Keep the checkpoint the oldest remembered step replays from
+            while len(checkpoints) > 1 and checkpoints[1][0] <= k - window:
+                checkpoints.popleft()
+
+        distance += 1
+        if key == tortoise_key and state == tortoise:
+            # A cycle longer than the window
+            mu = cycle_start(start, step, distance)
+            return Trajectory(observations[: mu + distance], mu, distance)
+        if distance == power:
+            tortoise, tortoise_key, power, distance = state, key, 2 * power, 0
+    return Trajectory(observations)
+
+
+def detect_with(
+    method: Callable[..., tuple[int, int] | None],
+    start: Any,
+    step: Step,
+    limit: int | None = None,
+) -> Trajectory:
+    """The trajectory from `floyd` or `brent`, which keep two states.
+
+    Their `(mu, lam)` is followed by a second run through the first
+    `mu + lam` steps to collect the observations.
+    """
+
+    found = method(start, step, limit)
+    if found is None:
+        assert limit is not None
+        return Trajectory(observe(start, step, limit))
+    mu, lam = found
+    return Trajectory(observe(start, step, mu + lam), mu, lam)
@@ -0,0 +1,308 @@
+"""A long-lived solver process, answering requests over a Unix socket.
+
+The daemon keeps every day loaded and the most recently parsed inputs in
+memory, so a repeated request costs only the parts themselves, with no
+interpreter startup, imports or parsing. Each connection is read by a
+thread of its own, but the solving, being pure Python, is done by solver
+processes, so that requests from different clients run in parallel
+rather than one at a time under the GIL. Each solver process loads the
+days and caches its own parsed inputs; a request goes to the process
+chosen by the hash of its day and input, so repeated requests find their
+parsed input where they run.
+
+The protocol is one JSON object per line each way. A request names an
+operation and its arguments, and gets back either its result with
+`"ok": true`, or `"ok": false` and an `"error"`:
+
+    {"op": "solve", "day": "07", "part": "part1", "engine": "fast"}
+    {"ok": true, "answers": {"part1": 251806792}, "seconds": {...}}
+
+`solve` and `bench` take the day, optionally a part (default: all), an
+engine, and the input as a `"path"` or as its text in `"input"` (default:
+the day's own input); `bench` also takes `"warmup"` and `"repeat"`.
+`ping`, `stats` and `shutdown` take no arguments.
+"""
+
+import collections
+import concurrent.futures
+import copy
+import hashlib
+import json
+import os
+import pathlib
+import socket
+import statistics
+import threading
+import time
+from typing import Any
+
+from aoc import bench, days, engines, parallel
+
+SOCKET = days.STATE / "daemon.sock"
+WORKERS = 4
+CACHE_SIZE = 32
+
+
+class Solver:
+    """The loaded days and parsed inputs of a solver process."""
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.modules = {
+            day_directory.name: days.load(day_directory)
+            for day_directory in days.day_directories()
+        }
+        self.cache_size = cache_size
+        # Parsed inputs by (day, SHA-256 of the text), least recently used
+        # first
+        self.parsed: collections.OrderedDict[tuple[str, str], Any] = (
+            collections.OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, day: str, text: str) -> tuple[Any, float]:
+        """The parsed input, and the seconds spent parsing it (0 if warm)."""
+
+        key = (day, hashlib.sha256(text.encode()).hexdigest())
+        if key in self.parsed:
+            self.parsed.move_to_end(key)
+            self.hits += 1
+            return self.parsed[key], 0.0
+        self.misses += 1
+        start = time.perf_counter()
+        parsed = days.parse(self.modules[day], text)
+        seconds = time.perf_counter() - start
+        self.parsed[key] = parsed
+        while len(self.parsed) > self.cache_size:
+            self.parsed.popitem(last=False)
+        return parsed, seconds
+
+    def parts(self, day: str, request: dict[str, Any]) -> list[str]:
+        module = self.modules[day]
+        part = request.get("part")
+        if part is None:
+            return [part for part in days.PARTS if hasattr(module, part)]
+        if not hasattr(module, part):
+            raise ValueError(f"day {day} has no {part}")
+        return [part]
+
+    def solve(self, request: dict[str, Any]) -> dict[str, Any]:
+        day = request["day"]
+        engine = request.get("engine", engines.DEFAULT)
+        parsed, parse_seconds = self.parse(day, request["input"])
+        answers = {}
+        seconds = {"parse": parse_seconds}
+        for part in self.parts(day, request):
+            solve = engines.select(self.modules[day], part, engine)
+            assert solve is not None
+            # Parts may modify their input, which stays cached
+            argument = copy.deepcopy(parsed)
+            start = time.perf_counter()
+            answers[part] = solve(argument)
+            seconds[part] = time.perf_counter() - start
+        return {"answers": answers, "seconds": seconds}
+
+    def bench(self, request: dict[str, Any]) -> dict[str, Any]:
+        day = request["day"]
+        engine = request.get("engine", engines.DEFAULT)
+        parsed, _ = self.parse(day, request["input"])
+        timings = {}
+        for part in self.parts(day, request):
+            solve = engines.select(self.modules[day], part, engine)
+            assert solve is not None
+            samples, answer = bench.time_calls(
+                solve,
+                lambda: copy.deepcopy(parsed),
+                request.get("warmup", 1),
+                request.get("repeat", 5),
+            )
+            timings[part] = {
+                "answer": answer,
+                "min": min(samples),
+                "median": statistics.median(samples),
+                "samples": samples,
+            }
+        return {"timings": timings}
+
+    def cache_stats(self) -> dict[str, int]:
+        return {
+            "cached": len(self.parsed),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# The solver of this process, in the solver processes
+_solver: Solver | None = None
+
+
+def start_solver(cache_size: int) -> None:
+    global _solver
+
+    _solver = Solver(cache_size)
+
+
+def run_solver(op: str, request: dict[str, Any]) -> dict[str, Any]:
+    """Runs `op` in this solver process, returning its result and the
+    statistics of the parsed input cache."""
+
+    assert _solver is not None
+    result = {} if op == "ping" else getattr(_solver, op)(request)
+    return {"result": result, "cache": _solver.cache_stats()}
+
+
+class Daemon:
+    def __init__(self, workers: int = WORKERS, cache_size: int = CACHE_SIZE):
+        self.num_days = len(days.day_directories())
+        # One process per pool, so that a request can be sent to a chosen
+        # solver. They are started, loading the days, before any thread
+        # is, as they are forked.
+        self.solvers = [
+            concurrent.futures.ProcessPoolExecutor(
+                1, initializer=start_solver, initargs=(cache_size,)
+            )
+            for _ in range(workers)
+        ]
+        self.cache = [
+            solver.submit(run_solver, "ping", {}).result()["cache"]
+            for solver in self.solvers
+        ]
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.connections: set[socket.socket] = set()
+        self.threads: list[threading.Thread] = []
+        self.stopping = threading.Event()
+        self.started = time.time()
+
+    def read(self, day: str, request: dict[str, Any]) -> str:
+        if "input" in request:
+            return request["input"]
+        if "path" in request:
+            return pathlib.Path(request["path"]).read_text()
+        return days.read_input(days.find_day(day))
+
+    def run(self, op: str, request: dict[str, Any]) -> dict[str, Any]:
+        """Runs a solve or bench request on the solver for its input."""
+
+        day = days.find_day(request["day"]).name
+        text = self.read(day, request)
+        digest = hashlib.sha256(f"{day}\n{text}".encode()).digest()
+        k = int.from_bytes(digest[:8], "big") % len(self.solvers)
+        response = (
+            self.solvers[k]
+            .submit(run_solver, op, {**request, "day": day, "input": text})
+            .result()
+        )
+        with self.lock:
+            self.cache[k] = response["cache"]
+        return response["result"]
+
+    def stats(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "pid": os.getpid(),
+                "uptime": time.time() - self.started,
+                "days": self.num_days,
+                "solvers": len(self.solvers),
+                "requests": self.requests,
+                **{
+                    name: sum(cache[name] for cache in self.cache)
+                    for name in ("cached", "hits", "misses")
+                },
+            }
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        with self.lock:
+            self.requests += 1
+        try:
+            match request.get("op"):
+                case "solve" | "bench" as op:
+                    result = self.run(op, request)
+                case "ping":
+                    result = {}
+                case "stats":
+                    result = self.stats()
+                case "shutdown":
+                    self.stopping.set()
+                    result = {}
+                case op:
+                    raise ValueError(f"unknown operation {op!r}")
+        except Exception as error:
+            return {"ok": False, "error": parallel.describe(error)}
+        return {"ok": True, **result}
+
+    def serve_connection(self, connection: socket.socket) -> None:
+        try:
+            with connection, connection.makefile("rw") as stream:
+                for line in stream:
+                    try:
+                        response = self.handle(json.loads(line))
+                    except json.JSONDecodeError as error:
+                        response = {
+                            "ok": False,
+                            "error": parallel.describe(error),
+                        }
+                    stream.write(json.dumps(response, default=str) + "\n")
+                    stream.flush()
+        except OSError:
+            # The client went away, or the daemon is stopping
+            pass
+        finally:
+            with self.lock:
+                self.connections.discard(connection)
+
+    def serve(self, path: pathlib.Path = SOCKET) -> None:
+        """Serves connections on `path` until a shutdown request."""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(str(path))
+            server.listen()
+            # Wakes up regularly to notice a shutdown request
+            server.settimeout(0.2)
+            try:
+                while not self.stopping.is_set():
+                    try:
+                        connection, _ = server.accept()
+                    except TimeoutError:
+                        continue
+                    connection.settimeout(None)
+                    with self.lock:
+                        self.connections.add(connection)
+                    thread = threading.Thread(
+                        target=self.serve_connection, args=(connection,)
+                    )
+                    thread.start()
+                    self.threads = [
+                        thread for thread in self.threads if thread.is_alive()
+                    ]
+                    self.threads.append(thread)
+            finally:
+                path.unlink(missing_ok=True)
+                # Ends the reads of idle clients, which would otherwise
+                # keep their threads waiting, but lets the threads still
+                # running a request write its response
+                with self.lock:
+                    for connection in self.connections:
+                        try:
+                            connection.shutdown(socket.SHUT_RD)
+                        except OSError:
+                            pass
+                for thread in self.threads:
+                    thread.join()
+                for solver in self.solvers:
+                    solver.shutdown(cancel_futures=True)
+
+
+def request(
+    payload: dict[str, Any], path: pathlib.Path = SOCKET
+) -> dict[str, Any]:
+    """Sends one request to the daemon listening on `path`."""
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(path))
+        with client.makefile("rw") as stream:
+            stream.write(json.dumps(payload) + "\n")
+            stream.flush()
+            return json.loads(stream.readline())
@@ -0,0 +1,82 @@
+"""Discovery and loading of the `NN/run.py` solutions.
+
+Every day is an importable module with `parse(text)`, `part1(parsed)` and,
+except for the last days, `part2(parsed)`. None of them depends on the
+current directory, so one process can run all the days back to back:
+
+    >>> from aoc import days
+    >>> days.solve("06")
+    {'part1': 440000, 'part2': 26187338}
+"""
+
+import copy
+import importlib.util
+import pathlib
+import sys
+from types import ModuleType
+from typing import Any
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+# Untracked local state such as past timings
+STATE = ROOT / ".aoc"
+PARTS = ("part1", "part2")
+
+
+class UnknownDay(ValueError):
+    pass
+
+
+def day_directories(root: pathlib.Path = ROOT) -> list[pathlib.Path]:
+    return sorted(
+        path
+        for path in root.iterdir()
+        if path.name.isdigit() and (path / "run.py").is_file()
+    )
+
+
+def find_day(day: str, root: pathlib.Path = ROOT) -> pathlib.Path:
+    path = root / day.zfill(2)
+    if not (path / "run.py").is_file():
+        raise UnknownDay(f"no solution for day {day}")
+    return path
+
+
+def load(day_directory: pathlib.Path) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(
+        f"day{day_directory.name}", day_directory / "run.py"
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    # Registered so that pickle can find the classes of the module
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def read_input(day_directory: pathlib.Path, name: str = "input.txt") -> str:
+    return (day_directory / name).read_text()
+
+
+def parse(module: ModuleType, data: str | bytes) -> Any:
+    """`module.parse` on an input given as text or UTF-8 bytes."""
+
+    if not isinstance(data, str):
+        data = bytes(data).decode()
+    return module.parse(data)
+
+
+def solve(day: str, data: str | bytes | None = None) -> dict[str, Any]:
+    """Answers of a day, on its own input unless `data` is given."""
+
+    day_directory = find_day(day)
+    module = load(day_directory)
+    if data is None:
+        data = read_input(day_directory)
+    answers = {}
+    parsed = parse(module, data)
+    for part in PARTS:
+        solve_part = getattr(module, part, None)
+        if solve_part is not None:
+            # Parts may modify their input (14 and 20 do)
+            answers[part] = solve_part(copy.deepcopy(parsed))
+    return answers
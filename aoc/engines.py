@@ -0,0 +1,191 @@
+"""Alternative implementations of the parts, and cross-checks between them.
+
+A day can keep its straightforward solution next to an optimized one by
+registering both in a module-level `ENGINES` dict:
+
+    ENGINES = {
+        "part1": {"reference": part1_reference, "fast": part1},
+        "part2": {"reference": part2_reference, "fast": part2},
+    }
+
+`part1` and `part2` themselves are the "fast" engine of days that register
+nothing. A "vectorized" engine, when a day has one, needs numpy and is
+only registered when it can be imported.
+
+`diff_day` runs every engine of a part on the same inputs and reports the
+inputs they disagree on, shrunk line by line to a minimal one that still
+shows the disagreement.
+"""
+
+import copy
+import dataclasses
+import pathlib
+from types import ModuleType
+from typing import Any, Callable, Iterator
+
+from aoc import days
+
+NAMES = ("reference", "fast", "vectorized")
+DEFAULT = "fast"
+
+
+def engines(module: ModuleType, part: str) -> dict[str, Callable[[Any], Any]]:
+    solve = getattr(module, part, None)
+    if solve is None:
+        return {}
+    registered = dict(getattr(module, "ENGINES", {}).get(part, {}))
+    registered.setdefault(DEFAULT, solve)
+    return registered
+
+
+def select(
+    module: ModuleType, part: str, engine: str = DEFAULT
+) -> Callable[[Any], Any] | None:
+    """The `engine` of a part, or the default one if the day lacks it."""
+
+    registered = engines(module, part)
+    return registered.get(engine, registered.get(DEFAULT))
+
+
+@dataclasses.dataclass
+class Mismatch:
+    day: str
+    part: str
+    source: str
+    # Answer, or exception, of each engine on the minimized input
+    outcomes: dict[str, str]
+    minimized: str
+
+
+def outcome(solve: Callable[[Any], Any], parsed: Any) -> str:
+    try:
+        return repr(solve(copy.deepcopy(parsed)))
+    except Exception as error:
+        return f"raised {type(error).__name__}: {error}"
+
+
+def outcomes(
+    module: ModuleType, part: str, text: str
+) -> dict[str, str] | None:
+    """Outcome of each engine, or None if the input does not parse."""
+
+    try:
+        parsed = module.parse(text)
+    except Exception:
+        return None
+    return {
+        name: outcome(solve, parsed)
+        for name, solve in engines(module, part).items()
+    }
+
+
+def disagree(results: dict[str, str] | None) -> bool:
+    return results is not None and len(set(results.values())) > 1
+
+
+def raising(results: dict[str, str]) -> set[str]:
+    return {
+        name
+        for name, result in results.items()
+        if result.startswith("raised ")
+    }
+
+
+def minimize(
+    lines: list[str], failing: Callable[[list[str]], bool]
+) -> list[str]:
+    """A 1-minimal sublist of `lines` that is still `failing` (ddmin)."""
+
+    granularity = 2
+    while len(lines) >= 2:
+        size = -(-len(lines) // granularity)
+        chunks = [lines[i : i + size] for i in range(0, len(lines), size)]
+        for k, chunk in enumerate(chunks):
+            if failing(chunk):
+                lines, granularity = chunk, 2
+                break
+            complement = [
+                line
+                for other in chunks[:k] + chunks[k + 1 :]
+                for line in other
+            ]
+            if failing(complement):
+                lines = complement
+                granularity = max(granularity - 1, 2)
+                break
+        else:
+            if granularity >= len(lines):
+                break
+            granularity = min(2 * granularity, len(lines))
+    return lines
+
+
+def inputs(
+    day_directory: pathlib.Path,
+    module: ModuleType,
+    random_inputs: int,
+    seed: int,
+) -> Iterator[tuple[str, str]]:
+    """The examples, the real input and generated ones, with their names."""
+
+    for path in sorted(day_directory.glob("*.txt")):
+        yield path.name, path.read_text()
+    generate = getattr(module, "generate", None)
+    if generate is not None:
+        for k in range(random_inputs):
+            yield f"generate(1, {seed + k})", generate(1, seed + k)
+
+
+def diff_day(
+    day_directory: pathlib.Path, random_inputs: int = 5, seed: int = 0
+) -> tuple[list[str], list[Mismatch]]:
+    """Descriptions of the engines compared, and their mismatches."""
+
+    module = days.load(day_directory)
+    parts = [part for part in days.PARTS if len(engines(module, part)) > 1]
+    compared = [
+        f"day {day_directory.name} {part}: " + ", ".join(engines(module, part))
+        for part in parts
+    ]
+    mismatches = []
+    if not parts:
+        return compared, mismatches
+    for source, text in inputs(day_directory, module, random_inputs, seed):
+        for part in parts:
+            results = outcomes(module, part, text)
+            if not disagree(results):
+                continue
+            assert results is not None
+
+            # Shrinks towards the same kind of disagreement: the same
+            # engines failing with an exception, if any did
+            def failing(lines: list[str], failed=raising(results)) -> bool:
+                candidate = outcomes(module, part, "\n".join(lines))
+                return disagree(candidate) and raising(candidate) == failed
+
+            minimized = "\n".join(minimize(text.splitlines(), failing))
+            mismatches.append(
+                Mismatch(
+                    day_directory.name,
+                    part,
+                    source,
+                    outcomes(module, part, minimized) or results,
+                    minimized,
+                )
+            )
+    return compared, mismatches
+
+
+def format_mismatches(mismatches: list[Mismatch]) -> str:
+    lines = [f"{len(mismatches)} mismatch(es):"]
+    for mismatch in mismatches:
+        lines.append(
+            f"  day {mismatch.day} {mismatch.part} on {mismatch.source}"
+        )
+        for name, result in mismatch.outcomes.items():
+            lines.append(f"    {name:<10} {result}")
+        lines.append("    minimized input:")
+        lines.extend(
+            f"      {line}" for line in mismatch.minimized.splitlines()
+        )
+    return "\n".join(lines)
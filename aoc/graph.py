@@ -0,0 +1,269 @@
+"""Graphs over dense integer node ids, with their traversals.
+
+Nodes are the integers `0 .. num_nodes - 1`. Named nodes (day 08's
+"AAA", day 20's modules) get ids from an `Interner`, and grid cells are
+already dense as `Grid` offsets. Adjacency is stored in compressed sparse
+row form: the successors of `node` are
+`targets[offsets[node] : offsets[node + 1]]`, both `array("i")`, so that
+the inner loops index flat arrays instead of hashing tuples or strings.
+
+    >>> nodes = Interner()
+    >>> edges = [(nodes.intern(a), nodes.intern(b)) for a, b in ["ab", "bc"]]
+    >>> network = Graph.from_edges(len(nodes), edges)
+    >>> list(bfs(network, [nodes["a"]]))
+    [0, 1, 2]
+"""
+
+from array import array
+from typing import Hashable, Iterable, Iterator, Self
+
+UNREACHED = -1
+
+
+class Interner:
+    """Dense integer ids for hashable names, in order of first sight."""
+
+    __slots__ = ("ids", "names")
+
+    def __init__(self, names: Iterable[Hashable] = ()):
+        self.ids: dict[Hashable, int] = {}
+        self.names: list[Hashable] = []
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name: Hashable) -> int:
+        id_ = self.ids.get(name)
+        if id_ is None:
+            id_ = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return id_
+
+    def __getitem__(self, name: Hashable) -> int:
+        return self.ids[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.ids
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class Graph:
+    __slots__ = ("offsets", "targets")
+
+    def __init__(self, offsets: array, targets: array):
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_successors(cls, successors: Iterable[Iterable[int]]) -> Self:
+        """The graph whose node k leads to the k-th item of `successors`."""
+
+        offsets = array("i", [0])
+        targets = array("i")
+        for node_successors in successors:
+            targets.extend(node_successors)
+            offsets.append(len(targets))
+        return cls(offsets, targets)
+
+    @classmethod
+    def from_edges(
+        cls, num_nodes: int, edges: Iterable[tuple[int, int]]
+    ) -> Self:
+        """The graph of `edges`, keeping their order among each node's."""
+
+        successors: list[list[int]] = [[] for _ in range(num_nodes)]
+        for source, target in edges:
+            successors[source].append(target)
+        return cls.from_successors(successors)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.offsets) - 1
+
+    def neighbors(self, node: int) -> array:
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def degree(self, node: int) -> int:
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def edges(self) -> Iterator[tuple[int, int]]:
+        offsets, targets = self.offsets, self.targets
+        for node in range(self.num_nodes):
+            for k in range(offsets[node], offsets[node + 1]):
+                yield node, targets[k]
+
+    def reversed(self) -> Self:
+        return type(self).from_edges(
+            self.num_nodes, ((target, node) for node, target in self.edges())
+        )
+
+    def undirected(self) -> Self:
+        """The graph with every edge in both directions."""
+
+        edges = list(self.edges())
+        reversed_edges = [(target, node) for node, target in edges]
+        return type(self).from_edges(self.num_nodes, edges + reversed_edges)
+
+
+class Bitset:
+    """A set of node ids, one bit per possible node."""
+
+    __slots__ = ("bits",)
+
+    def __init__(self, size: int, members: Iterable[int] = ()):
+        self.bits = bytearray((size + 7) >> 3)
+        for member in members:
+            self.add(member)
+
+    def add(self, member: int) -> None:
+        self.bits[member >> 3] |= 1 << (member & 7)
+
+    def discard(self, member: int) -> None:
+        self.bits[member >> 3] &= ~(1 << (member & 7))
+
+    def __contains__(self, member: int) -> bool:
+        return bool(self.bits[member >> 3] >> (member & 7) & 1)
+
+    def __len__(self) -> int:
+        return int.from_bytes(self.bits, "little").bit_count()
+
+    def __iter__(self) -> Iterator[int]:
+        for index, byte in enumerate(self.bits):
+            while byte:
+                low = byte & -byte
+                yield (index << 3) + low.bit_length() - 1
+                byte ^= low
+
+
+def layers(
+    graph: Graph, sources: Iterable[int], max_depth: int | None = None
+) -> Iterator[list[int]]:
+    """The nodes first reached after 0, 1, 2... steps from `sources`."""
+
+    offsets, targets = graph.offsets, graph.targets
+    visited = bytearray(graph.num_nodes)
+    frontier = []
+    for source in sources:
+        if not visited[source]:
+            visited[source] = 1
+            frontier.append(source)
+    depth = 0
+    while frontier:
+        yield frontier
+        depth += 1
+        if max_depth is not None and depth > max_depth:
+            return
+        next_frontier = []
+        for node in frontier:
+            for target in targets[offsets[node] : offsets[node + 1]]:
+                if not visited[target]:
+                    visited[target] = 1
+                    next_frontier.append(target)
+        frontier = next_frontier
+
+
+def bfs(
+    graph: Graph, sources: Iterable[int], max_depth: int | None = None
+) -> array:
+    """Distances from the nearest of `sources`, or `UNREACHED`."""
+
+    distances = array("i", [UNREACHED]) * graph.num_nodes
+    for depth, layer in enumerate(layers(graph, sources, max_depth)):
+        for node in layer:
+            distances[node] = depth
+    return distances
+
+
+def reachable(graph: Graph, sources: Iterable[int]) -> list[int]:
+    """The nodes reachable from `sources`, in breadth-first order."""
+
+    return [node for layer in layers(graph, sources) for node in layer]
+
+
+def dfs(graph: Graph, source: int) -> Iterator[int]:
+    """The nodes reachable from `source`, in depth-first preorder."""
+
+    offsets, targets = graph.offsets, graph.targets
+    visited = bytearray(graph.num_nodes)
+    stack = [source]
+    while stack:
+        node = stack.pop()
+        if visited[node]:
+            continue
+        visited[node] = 1
+        yield node
+        # Reversed, so that the first successor is visited first
+        stack.extend(reversed(targets[offsets[node] : offsets[node + 1]]))
+
+
+def connected_components(graph: Graph) -> tuple[int, array]:
+    """The number of components and the component of each node.
+
+    Edge directions are ignored.
+    """
+
+    undirected = graph.undirected()
+    labels = array("i", [UNREACHED]) * graph.num_nodes
+    count = 0
+    for root in range(graph.num_nodes):
+        if labels[root] != UNREACHED:
+            continue
+        for node in reachable(undirected, [root]):
+            labels[node] = count
+        count += 1
+    return count, labels
+
+
+def strongly_connected_components(graph: Graph) -> list[list[int]]:
+    """Tarjan's algorithm, without recursion.
+
+    Components come out in reverse topological order: no edge leads from
+    a component to a later one.
+    """
+
+    offsets, targets = graph.offsets, graph.targets
+    num_nodes = graph.num_nodes
+    index = array("i", [UNREACHED]) * num_nodes
+    low = array("i", [0]) * num_nodes
+    on_stack = bytearray(num_nodes)
+    stack: list[int] = []
+    components = []
+    counter = 0
+    for root in range(num_nodes):
+        if index[root] != UNREACHED:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        # (node, next edge to follow) for the nodes being visited
+        work = [(root, offsets[root])]
+        while work:
+            node, k = work[-1]
+            if k < offsets[node + 1]:
+                work[-1] = (node, k + 1)
+                target = targets[k]
+                if index[target] == UNREACHED:
+                    index[target] = low[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack[target] = 1
+                    work.append((target, offsets[target]))
+                elif on_stack[target]:
+                    low[node] = min(low[node], index[target])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
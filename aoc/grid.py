@@ -0,0 +1,160 @@
+"""A compact character grid stored in one flat `bytearray`.
+
+Cells are addressed by integer offsets rather than `(i, j)` tuples. The
+grid is surrounded by a one cell wide border filled with a chosen byte, so
+a step from any real cell to a neighbor (`offset + grid.right`, ...) always
+lands inside the buffer and the border value can stop walks and searches
+without explicit bounds checks.
+"""
+
+from typing import Iterator, Self
+
+
+class Grid:
+    __slots__ = ("cells", "rows", "cols", "width", "border")
+
+    def __init__(self, cells: bytearray, rows: int, cols: int, border: int):
+        self.cells = cells
+        self.rows = rows
+        self.cols = cols
+        # Stride of a row in `cells`, including the two border cells
+        self.width = cols + 2
+        self.border = border
+
+    @classmethod
+    def from_lines(cls, lines: list[str], border: str = " ") -> Self:
+        rows, cols = len(lines), len(lines[0])
+        border_byte = border.encode()
+        edge = border_byte * (cols + 2)
+        cells = bytearray(edge)
+        for line in lines:
+            if len(line) != cols:
+                raise ValueError("grid rows must have the same length")
+            cells += border_byte + line.encode() + border_byte
+        cells += edge
+        return cls(cells, rows, cols, border_byte[0])
+
+    @classmethod
+    def from_text(cls, text: str, border: str = " ") -> Self:
+        return cls.from_lines(text.splitlines(), border)
+
+    # Neighbor offsets
+
+    @property
+    def up(self) -> int:
+        return -self.width
+
+    @property
+    def down(self) -> int:
+        return self.width
+
+    @property
+    def left(self) -> int:
+        return -1
+
+    @property
+    def right(self) -> int:
+        return 1
+
+    @property
+    def neighbors4(self) -> tuple[int, int, int, int]:
+        """Offsets to the up, right, down and left neighbors."""
+
+        return -self.width, 1, self.width, -1
+
+    @property
+    def neighbors8(self) -> tuple[int, ...]:
+        w = self.width
+        return -w - 1, -w, -w + 1, -1, 1, w - 1, w, w + 1
+
+    # Addressing
+
+    def offset(self, i: int, j: int) -> int:
+        return (i + 1) * self.width + j + 1
+
+    def position(self, offset: int) -> tuple[int, int]:
+        i, j = divmod(offset, self.width)
+        return i - 1, j - 1
+
+    def __getitem__(self, offset: int) -> int:
+        return self.cells[offset]
+
+    def __setitem__(self, offset: int, value: int) -> None:
+        self.cells[offset] = value
+
+    def offsets(self) -> Iterator[int]:
+        """Offsets of all cells, row by row, skipping the border."""
+
+        for i in range(self.rows):
+            start = self.offset(i, 0)
+            yield from range(start, start + self.cols)
+
+    def find_all(self, value: int) -> Iterator[int]:
+        offset = self.cells.find(value)
+        while offset != -1:
+            yield offset
+            offset = self.cells.find(value, offset + 1)
+
+    def count(self, value: int) -> int:
+        """Occurrences of `value` inside the grid, ignoring the border."""
+
+        count = self.cells.count(value)
+        if value == self.border:
+            count -= 2 * (self.width + self.rows)
+        return count
+
+    # Views, which share memory with the grid
+
+    def row(self, i: int) -> memoryview:
+        start = self.offset(i, 0)
+        return memoryview(self.cells)[start : start + self.cols]
+
+    def column(self, j: int) -> memoryview:
+        start = self.offset(0, j)
+        return memoryview(self.cells)[
+            start : start + self.rows * self.width : self.width
+        ]
+
+    # New grids
+
+    def copy(self) -> Self:
+        return type(self)(
+            bytearray(self.cells), self.rows, self.cols, self.border
+        )
+
+    def _from_columns(self, columns: list[bytes]) -> Self:
+        border = bytes([self.border])
+        edge = border * (self.rows + 2)
+        cells = bytearray(edge)
+        for column in columns:
+            cells += border + column + border
+        cells += edge
+        return type(self)(cells, self.cols, self.rows, self.border)
+
+    def transpose(self) -> Self:
+        return self._from_columns(
+            [self.column(j).tobytes() for j in range(self.cols)]
+        )
+
+    def rotate_clockwise(self) -> Self:
+        return self._from_columns(
+            [self.column(j).tobytes()[::-1] for j in range(self.cols)]
+        )
+
+    def rotate_anticlockwise(self) -> Self:
+        return self._from_columns(
+            [self.column(j).tobytes() for j in reversed(range(self.cols))]
+        )
+
+    # Output
+
+    def lines(self) -> list[str]:
+        return [self.row(i).tobytes().decode() for i in range(self.rows)]
+
+    def __str__(self) -> str:
+        return "\n".join(self.lines())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Grid):
+            return NotImplemented
+        return self.cols == other.cols and self.cells == other.cells
@@ -0,0 +1,205 @@
+"""Benchmark history per commit and machine, and regression detection."""
+
+import dataclasses
+import functools
+import math
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+
+from aoc import bench, days
+
+DATABASE = days.STATE / "history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    commit_hash TEXT NOT NULL,
+    dirty INTEGER NOT NULL,
+    machine TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    day TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_run ON samples (run_id);
+"""
+
+
+def git(*args: str) -> str:
+    return subprocess.run(
+        ["git", *args],
+        cwd=days.ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+
+def current_commit() -> tuple[str, bool]:
+    dirty = git("status", "--porcelain", "--untracked-files=no") != ""
+    return git("rev-parse", "HEAD"), dirty
+
+
+def machine() -> str:
+    return (
+        f"{platform.node()}/{platform.machine()}"
+        f"/{platform.python_implementation()}-{platform.python_version()}"
+    )
+
+
+def connect() -> sqlite3.Connection:
+    DATABASE.parent.mkdir(exist_ok=True)
+    connection = sqlite3.connect(DATABASE)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def record(timings: list[bench.Timing]) -> None:
+    commit_hash, dirty = current_commit()
+    with connect() as connection:
+        run_id = connection.execute(
+            "INSERT INTO runs (commit_hash, dirty, machine, created)"
+            " VALUES (?, ?, ?, ?)",
+            (commit_hash, dirty, machine(), time.time()),
+        ).lastrowid
+        connection.executemany(
+            "INSERT INTO samples (run_id, day, phase, seconds)"
+            " VALUES (?, ?, ?, ?)",
+            [
+                (run_id, timing.day, timing.phase, seconds)
+                for timing in timings
+                for seconds in timing.samples
+            ],
+        )
+
+
+def recorded_commits(connection: sqlite3.Connection) -> list[str]:
+    """Commits benchmarked on this machine, most recent first."""
+
+    rows = connection.execute(
+        "SELECT commit_hash FROM runs WHERE machine = ?"
+        " GROUP BY commit_hash ORDER BY MAX(created) DESC",
+        (machine(),),
+    )
+    return [commit_hash for (commit_hash,) in rows]
+
+
+def load_samples(
+    connection: sqlite3.Connection, commit_hash: str
+) -> dict[tuple[str, str], list[float]]:
+    """All samples of a commit on this machine, pooled over its runs."""
+
+    samples: dict[tuple[str, str], list[float]] = {}
+    for day, phase, seconds in connection.execute(
+        "SELECT day, phase, seconds FROM samples"
+        " JOIN runs ON runs.id = samples.run_id"
+        " WHERE commit_hash = ? AND machine = ?",
+        (commit_hash, machine()),
+    ):
+        samples.setdefault((day, phase), []).append(seconds)
+    return samples
+
+
+@functools.cache
+def u_distribution(n1: int, n2: int) -> tuple[int, ...]:
+    """Number of orderings giving each value of the Mann-Whitney U."""
+
+    if n1 == 0 or n2 == 0:
+        return (1,)
+    # The largest value belongs either to the first or to the second sample
+    with_first = u_distribution(n1 - 1, n2)
+    with_second = u_distribution(n1, n2 - 1)
+    counts = [0] * (n1 * n2 + 1)
+    for u, count in enumerate(with_first):
+        counts[u + n2] += count
+    for u, count in enumerate(with_second):
+        counts[u] += count
+    return tuple(counts)
+
+
+def p_slower(baseline: list[float], candidate: list[float]) -> float:
+    """One-sided Mann-Whitney U test that `candidate` is slower.
+
+    Rank based, so a few noisy outliers cannot produce a regression on
+    their own. Exact for small samples without ties, otherwise uses the
+    normal approximation with a tie correction.
+    """
+
+    n1, n2 = len(candidate), len(baseline)
+    u = 0.0
+    for c in candidate:
+        for b in baseline:
+            u += 1.0 if c > b else 0.5 if c == b else 0.0
+    pooled = candidate + baseline
+    ties = len(pooled) != len(set(pooled))
+    if not ties and n1 * n2 <= 400:
+        counts = u_distribution(n1, n2)
+        return sum(counts[int(u) :]) / math.comb(n1 + n2, n1)
+    n = n1 + n2
+    tie_term = sum(t**3 - t for t in map(pooled.count, set(pooled)))
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance == 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+@dataclasses.dataclass
+class Comparison:
+    day: str
+    phase: str
+    baseline: float
+    candidate: float
+    p_value: float
+    regression: bool
+
+    @property
+    def change(self) -> float:
+        return self.candidate / self.baseline - 1
+
+
+def compare(
+    baseline: dict[tuple[str, str], list[float]],
+    candidate: dict[tuple[str, str], list[float]],
+    threshold: float,
+    alpha: float,
+) -> list[Comparison]:
+    comparisons = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        baseline_median = statistics.median(baseline[key])
+        candidate_median = statistics.median(candidate[key])
+        p_value = p_slower(baseline[key], candidate[key])
+        comparisons.append(
+            Comparison(
+                *key,
+                baseline_median,
+                candidate_median,
+                p_value,
+                candidate_median > baseline_median * (1 + threshold)
+                and p_value < alpha,
+            )
+        )
+    return comparisons
+
+
+def format_comparisons(comparisons: list[Comparison]) -> str:
+    header = (
+        f"{'day':>3}  {'phase':<6}  {'base ms':>10}  {'new ms':>10}"
+        f"  {'change':>8}  {'p':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    for comparison in comparisons:
+        lines.append(
+            f"{comparison.day:>3}  {comparison.phase:<6}"
+            f"  {comparison.baseline * 1000:>10.3f}"
+            f"  {comparison.candidate * 1000:>10.3f}"
+            f"  {comparison.change:>+8.1%}  {comparison.p_value:>7.4f}"
+            + ("  REGRESSION" if comparison.regression else "")
+        )
+    return "\n".join(lines)
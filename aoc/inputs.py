@@ -0,0 +1,105 @@
+"""Reading inputs without holding them in memory all at once.
+
+`parse(text)` needs the whole input as one string, and most days then
+split it into a list of lines, so both live in memory before any work
+starts. The readers here stream instead: `open_input` gives a text stream
+over a file, a memory-mapped file or standard input, and the iterators cut
+it into lines, blank-line-separated records or separator-delimited tokens
+as they are consumed. Days that can work incrementally expose
+`solve_stream(stream)`, which returns the answers of all their parts from
+one pass over such a stream.
+"""
+
+import io
+import mmap
+import os
+import pathlib
+import sys
+from typing import Iterator, TextIO
+
+CHUNK_SIZE = 2**16
+
+
+class MappedFile(io.RawIOBase):
+    """A read-only raw stream over a memory-mapped file.
+
+    Reads copy straight out of the page cache, without a system call per
+    read, and the kernel is told that access is sequential so it can read
+    ahead and drop pages behind.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]):
+        super().__init__()
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._map, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        size = min(len(buffer), len(self._map) - self._position)
+        buffer[:size] = self._map[self._position : self._position + size]
+        self._position += size
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._map.close()
+        super().close()
+
+
+def open_input(
+    source: str | os.PathLike[str], use_mmap: bool = False
+) -> TextIO:
+    """A text stream over the file `source`, or standard input for "-"."""
+
+    if source == "-":
+        return sys.stdin
+    # Empty files cannot be mapped
+    if use_mmap and pathlib.Path(source).stat().st_size > 0:
+        return io.TextIOWrapper(
+            io.BufferedReader(MappedFile(source), CHUNK_SIZE),
+            encoding="utf-8",
+        )
+    return open(source, encoding="utf-8")
+
+
+def iter_lines(stream: TextIO) -> Iterator[str]:
+    """Lines of `stream` without their line endings."""
+
+    for line in stream:
+        yield line.rstrip("\r\n")
+
+
+def iter_records(stream: TextIO) -> Iterator[list[str]]:
+    """Groups of consecutive non-blank lines, as for days 13 and 19."""
+
+    record: list[str] = []
+    for line in iter_lines(stream):
+        if line:
+            record.append(line)
+        elif record:
+            yield record
+            record = []
+    if record:
+        yield record
+
+
+def iter_split(
+    stream: TextIO, separator: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[str]:
+    """Pieces of `stream` between `separator`s, read a chunk at a time.
+
+    Unlike `iter_lines`, this stays in constant memory however long the
+    lines are, which matters for single-line inputs such as day 15's.
+    """
+
+    pending = ""
+    while chunk := stream.read(chunk_size):
+        pieces = (pending + chunk).split(separator)
+        pending = pieces.pop()
+        yield from pieces
+    yield pending
@@ -0,0 +1,202 @@
+"""Sets of integers as sorted intervals, and maps that shift intervals.
+
+Intervals are half-open, `[start, stop)` like `range`. An `IntervalSet`
+keeps its intervals sorted, disjoint and apart (merging those that touch),
+in two parallel lists of starts and stops, so that looking up a number or
+counting the members below it is a bisection. Sets are immutable: the
+operations return new ones.
+
+A `PiecewiseMap` adds an offset to the numbers of each of its pieces,
+disjoint intervals, and leaves the others unchanged, like day 05's
+almanac maps. It maps a number, or a whole set at once:
+
+    >>> seeds = IntervalSet([(79, 93), (55, 68)])
+    >>> soil = PiecewiseMap([(98, 100, -48), (50, 98, 2)])
+    >>> soil.image(seeds)
+    IntervalSet([(57, 70), (81, 95)])
+    >>> soil.image(seeds).split(60)
+    (IntervalSet([(57, 60)]), IntervalSet([(60, 70), (81, 95)]))
+"""
+
+import bisect
+import itertools
+from typing import Iterable, Iterator, Self
+
+
+class IntervalSet:
+    __slots__ = ("starts", "stops", "before")
+
+    def __init__(self, intervals: Iterable[tuple[int, int]] = ()):
+        self.starts: list[int] = []
+        self.stops: list[int] = []
+        for start, stop in sorted(intervals):
+            if start >= stop:
+                continue
+            if self.stops and start <= self.stops[-1]:
+                self.stops[-1] = max(self.stops[-1], stop)
+            else:
+                self.starts.append(start)
+                self.stops.append(stop)
+        # Members in the intervals before each one
+        self.before = list(
+            itertools.accumulate(
+                (stop - start for start, stop in zip(self.starts, self.stops)),
+                initial=0,
+            )
+        )
+
+    @classmethod
+    def from_points(cls, points: Iterable[int]) -> Self:
+        return cls((point, point + 1) for point in points)
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return zip(self.starts, self.stops)
+
+    def __len__(self) -> int:
+        """The number of intervals; `size` is the number of members."""
+
+        return len(self.starts)
+
+    def __bool__(self) -> bool:
+        return bool(self.starts)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self.starts == other.starts and self.stops == other.stops
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+    @property
+    def size(self) -> int:
+        return self.before[-1]
+
+    @property
+    def start(self) -> int:
+        """The smallest member."""
+
+        return self.starts[0]
+
+    @property
+    def stop(self) -> int:
+        """One past the largest member."""
+
+        return self.stops[-1]
+
+    def index(self, number: int) -> int:
+        """The interval `number` is in, or -1."""
+
+        i = bisect.bisect_right(self.starts, number) - 1
+        return i if i >= 0 and number < self.stops[i] else -1
+
+    def __contains__(self, number: int) -> bool:
+        return self.index(number) >= 0
+
+    def count_below(self, number: int) -> int:
+        """The number of members smaller than `number`."""
+
+        i = bisect.bisect_right(self.starts, number) - 1
+        if i < 0:
+            return 0
+        return self.before[i] + min(number, self.stops[i]) - self.starts[i]
+
+    def split(self, at: int) -> tuple[Self, Self]:
+        """The members below `at`, and the others."""
+
+        i = bisect.bisect_right(self.starts, at) - 1
+        below = list(itertools.islice(self, max(i, 0)))
+        above = list(itertools.islice(self, i + 1, None))
+        if i >= 0:
+            start, stop = self.starts[i], self.stops[i]
+            below.append((start, min(stop, at)))
+            above.insert(0, (at, stop))
+        cls = type(self)
+        return cls(below), cls(above)
+
+    def shift(self, offset: int) -> Self:
+        return type(self)(
+            (start + offset, stop + offset) for start, stop in self
+        )
+
+    def union(self, other: "IntervalSet") -> Self:
+        return type(self)(itertools.chain(self, other))
+
+    def intersection(self, other: "IntervalSet") -> Self:
+        intervals = []
+        i = j = 0
+        while i < len(self.starts) and j < len(other.starts):
+            start = max(self.starts[i], other.starts[j])
+            stop = min(self.stops[i], other.stops[j])
+            if start < stop:
+                intervals.append((start, stop))
+            # Drop whichever interval ends first
+            if self.stops[i] < other.stops[j]:
+                i += 1
+            else:
+                j += 1
+        return type(self)(intervals)
+
+    def complement(self, start: int, stop: int) -> Self:
+        """The numbers in `[start, stop)` that are not members."""
+
+        bounds = [start, *itertools.chain.from_iterable(self), stop]
+        return type(self)(
+            (max(gap_start, start), min(gap_stop, stop))
+            for gap_start, gap_stop in zip(bounds[::2], bounds[1::2])
+        )
+
+    def difference(self, other: "IntervalSet") -> Self:
+        if not self:
+            return self
+        return self.intersection(other.complement(self.start, self.stop))
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+
+class PiecewiseMap:
+    """Numbers in each piece shifted by its offset, the others unchanged."""
+
+    __slots__ = ("starts", "stops", "offsets")
+
+    def __init__(self, pieces: Iterable[tuple[int, int, int]] = ()):
+        pieces = sorted(piece for piece in pieces if piece[0] < piece[1])
+        for (_, stop, _), (start, _, _) in zip(pieces, pieces[1:]):
+            if start < stop:
+                raise ValueError(f"pieces overlap at {start}")
+        self.starts = [start for start, _, _ in pieces]
+        self.stops = [stop for _, stop, _ in pieces]
+        self.offsets = [offset for _, _, offset in pieces]
+
+    def __repr__(self) -> str:
+        pieces = list(zip(self.starts, self.stops, self.offsets))
+        return f"{type(self).__name__}({pieces!r})"
+
+    def __call__(self, number: int) -> int:
+        i = bisect.bisect_right(self.starts, number) - 1
+        if i >= 0 and number < self.stops[i]:
+            return number + self.offsets[i]
+        return number
+
+    def image(self, domain: IntervalSet) -> IntervalSet:
+        """The set of the numbers of `domain`, mapped."""
+
+        starts, stops, offsets = self.starts, self.stops, self.offsets
+        n = len(starts)
+        intervals = []
+        for start, stop in domain:
+            # The first piece that ends after `start`
+            i = bisect.bisect_right(stops, start)
+            number = start
+            while number < stop:
+                if i < n and starts[i] <= number:
+                    end = min(stop, stops[i])
+                    intervals.append((number + offsets[i], end + offsets[i]))
+                    i += 1
+                else:
+                    end = min(stop, starts[i]) if i < n else stop
+                    intervals.append((number, end))
+                number = end
+        return IntervalSet(intervals)
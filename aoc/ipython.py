@@ -0,0 +1,195 @@
+"""IPython magics to run, time and profile the days in a warm kernel.
+
+    %load_ext aoc.ipython
+    %aoc_run 16 part2                      # answer and timing statistics
+    %aoc_run 12 --input example.txt --engine reference
+    %aoc_bench 16 part2                    # every engine, side by side
+    %aoc_profile 16 part2 num_energized_on_graph
+    %aoc_reload 16                         # after editing the day
+
+Each day module is loaded once per kernel, and each input parsed once,
+keyed by the SHA-256 of its text, so after the first run a magic costs
+only the part itself. `%aoc_run` returns the answer, as in
+`answer = %aoc_run 16 part2`. `%aoc_reload` reloads the day and forgets
+its parsed inputs, like the watcher does on a change.
+"""
+
+import copy
+import functools
+import hashlib
+import inspect
+import statistics
+from types import ModuleType
+from typing import Any
+
+from IPython.core import magic, magic_arguments
+
+from aoc import bench, days, engines, profiling
+
+
+@magic.magics_class
+class AocMagics(magic.Magics):
+    def __init__(self, shell: Any):
+        super().__init__(shell)
+        self.modules: dict[str, ModuleType] = {}
+        # Parsed inputs by (day, SHA-256 of the text)
+        self.parsed: dict[tuple[str, str], Any] = {}
+
+    def module(self, day: str) -> ModuleType:
+        day = days.find_day(day).name
+        if day not in self.modules:
+            self.modules[day] = days.load(days.find_day(day))
+        return self.modules[day]
+
+    def parse(self, day: str, input_name: str) -> Any:
+        day = days.find_day(day).name
+        text = days.read_input(days.find_day(day), input_name)
+        key = (day, hashlib.sha256(text.encode()).hexdigest())
+        if key not in self.parsed:
+            self.parsed[key] = self.module(day).parse(text)
+        return self.parsed[key]
+
+    def parts(self, day: str, part: str | None) -> list[str]:
+        module = self.module(day)
+        if part is None:
+            return [part for part in days.PARTS if hasattr(module, part)]
+        if not hasattr(module, part):
+            raise magic.UsageError(f"day {day} has no {part}")
+        return [part]
+
+    def time_part(
+        self, day: str, part: str, engine: str, args: Any
+    ) -> bench.Timing:
+        solve = engines.engines(self.module(day), part).get(engine)
+        if solve is None:
+            raise magic.UsageError(f"day {day} {part} has no {engine} engine")
+        parsed = self.parse(day, args.input)
+        samples, answer = bench.time_calls(
+            solve, lambda: copy.deepcopy(parsed), args.warmup, args.repeat
+        )
+        return bench.Timing(days.find_day(day).name, part, samples, answer)
+
+    @magic_arguments.magic_arguments()
+    @magic_arguments.argument("day")
+    @magic_arguments.argument("part", nargs="?", choices=days.PARTS)
+    @magic_arguments.argument("--engine", default=engines.DEFAULT)
+    @magic_arguments.argument("--input", default="input.txt")
+    @magic_arguments.argument(
+        "--warmup", type=bench.non_negative_int, default=1
+    )
+    @magic_arguments.argument("--repeat", type=bench.positive_int, default=5)
+    @magic.line_magic
+    def aoc_run(self, line: str) -> Any:
+        """Runs a part, or every part, and prints timing statistics."""
+
+        args = magic_arguments.parse_argstring(self.aoc_run, line)
+        answers = {}
+        for part in self.parts(args.day, args.part):
+            timing = self.time_part(args.day, part, args.engine, args)
+            answers[part] = timing.answer
+            stdev = (
+                statistics.stdev(timing.samples)
+                if len(timing.samples) > 1
+                else 0.0
+            )
+            print(
+                f"day {timing.day} {part} ({args.engine}): {timing.answer!r}"
+                f"  min {timing.min * 1000:.3f} ms"
+                f"  median {timing.median * 1000:.3f} ms"
+                f"  stdev {stdev * 1000:.3f} ms"
+                f"  over {len(timing.samples)} runs"
+            )
+        return answers[args.part] if args.part is not None else answers
+
+    @magic_arguments.magic_arguments()
+    @magic_arguments.argument("day")
+    @magic_arguments.argument("part", choices=days.PARTS)
+    @magic_arguments.argument(
+        "engines", nargs="*", help="engines to compare (default: all)"
+    )
+    @magic_arguments.argument("--input", default="input.txt")
+    @magic_arguments.argument(
+        "--warmup", type=bench.non_negative_int, default=1
+    )
+    @magic_arguments.argument("--repeat", type=bench.positive_int, default=5)
+    @magic.line_magic
+    def aoc_bench(self, line: str) -> None:
+        """Times engines of a part side by side, against the first one."""
+
+        args = magic_arguments.parse_argstring(self.aoc_bench, line)
+        names = args.engines or list(
+            engines.engines(self.module(args.day), args.part)
+        )
+        timings = {
+            name: self.time_part(args.day, args.part, name, args)
+            for name in names
+        }
+        baseline = timings[names[0]].median
+        header = (
+            f"{'engine':<12}  {'min ms':>10}  {'median ms':>10}"
+            f"  {'speedup':>8}  answer"
+        )
+        print(header)
+        print("-" * len(header))
+        for name, timing in timings.items():
+            print(
+                f"{name:<12}  {timing.min * 1000:>10.3f}"
+                f"  {timing.median * 1000:>10.3f}"
+                f"  {baseline / timing.median:>7.2f}x  {timing.answer!r}"
+            )
+        if len({repr(timing.answer) for timing in timings.values()}) > 1:
+            print("engines disagree")
+
+    @magic_arguments.magic_arguments()
+    @magic_arguments.argument("day")
+    @magic_arguments.argument("part", choices=days.PARTS)
+    @magic_arguments.argument(
+        "function", help="function of the day, or Class.method"
+    )
+    @magic_arguments.argument("--engine", default=engines.DEFAULT)
+    @magic_arguments.argument("--input", default="input.txt")
+    @magic.line_magic
+    def aoc_profile(self, line: str) -> None:
+        """Runs a part once and prints the line profile of a function."""
+
+        args = magic_arguments.parse_argstring(self.aoc_profile, line)
+        module = self.module(args.day)
+        try:
+            function = inspect.unwrap(
+                functools.reduce(getattr, args.function.split("."), module)
+            )
+        except AttributeError:
+            raise magic.UsageError(
+                f"day {args.day} has no {args.function}"
+            ) from None
+        if not inspect.isfunction(function):
+            raise magic.UsageError(f"{args.function} is not a function")
+        solve = engines.engines(module, args.part).get(args.engine)
+        if solve is None:
+            raise magic.UsageError(
+                f"day {args.day} {args.part} has no {args.engine} engine"
+            )
+        stats = profiling.line_profile(
+            function.__code__,
+            solve,
+            copy.deepcopy(self.parse(args.day, args.input)),
+        )
+        print(profiling.format_line_profile(function, stats))
+
+    @magic.line_magic
+    def aoc_reload(self, line: str) -> None:
+        """Reloads a day, or every loaded day, and drops its parsed inputs."""
+
+        names = line.split() or list(self.modules)
+        for name in names:
+            day = days.find_day(name).name
+            self.modules[day] = days.load(days.find_day(day))
+            self.parsed = {
+                key: parsed
+                for key, parsed in self.parsed.items()
+                if key[0] != day
+            }
+
+
+def load_ipython_extension(ipython: Any) -> None:
+    ipython.register_magics(AocMagics)
@@ -0,0 +1,196 @@
+"""Memory layout of the record types of the days, slotted or not.
+
+A dataclass keeps its fields in a per-instance `__dict__` unless it is
+declared with `slots=True`. The audit finds the instances of each record
+type in a day's parsed input, and in the arguments of its micro-benchmarks
+for the types only made while solving (day 20's messages). For every
+slotted type, it builds a twin that keeps a `__dict__` instead, with the
+same methods, and measures both on the same field values: the bytes
+allocated per instance, and the time to create one and to read all its
+fields. Types whose constructor takes more than their fields (an
+`InitVar`) cannot be recreated from an instance, and are left out.
+"""
+
+import dataclasses
+import functools
+import inspect
+import operator
+import pathlib
+import tracemalloc
+from types import ModuleType
+from typing import Any
+
+from aoc import days, microbench
+
+INSTANCES = 10_000
+SAMPLES = 10
+
+
+@dataclasses.dataclass
+class Layout:
+    day: str
+    name: str
+    slotted: bool
+    found: int
+    # Bytes per instance, and seconds per creation and per read of all the
+    # fields, for the type as defined and for its `__dict__` twin
+    size: float
+    twin_size: float | None
+    create: float
+    twin_create: float | None
+    read: float
+    twin_read: float | None
+
+
+def records(module: ModuleType, root: Any) -> dict[type, list[Any]]:
+    """Dataclass instances of types defined in `module`, reachable from
+    `root` through containers and dataclass fields."""
+
+    found: dict[type, list[Any]] = {}
+    seen = set()
+    stack = [root]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            stack.extend(value)
+        elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+            if type(value).__module__ == module.__name__:
+                found.setdefault(type(value), []).append(value)
+            stack.extend(
+                getattr(value, field.name)
+                for field in dataclasses.fields(value)
+            )
+    return found
+
+
+@functools.cache
+def dict_backed(cls: type) -> type:
+    """The slotted dataclass `cls`, with a `__dict__` instead of slots."""
+
+    if not dataclasses.is_dataclass(cls) or "__slots__" not in cls.__dict__:
+        return cls
+    excluded = {"__slots__", "__dict__", "__weakref__", *cls.__slots__}
+    namespace = {
+        name: value
+        for name, value in cls.__dict__.items()
+        if name not in excluded
+    }
+    bases = tuple(dict_backed(base) for base in cls.__bases__)
+    return type(cls)(cls.__name__, bases, namespace)
+
+
+def recreatable(cls: type) -> bool:
+    parameters = list(inspect.signature(cls).parameters)
+    return parameters == [
+        field.name for field in dataclasses.fields(cls) if field.init
+    ]
+
+
+def init_arguments(record: Any) -> tuple[Any, ...]:
+    return tuple(
+        getattr(record, field.name)
+        for field in dataclasses.fields(record)
+        if field.init
+    )
+
+
+def bytes_per_instance(cls: type, arguments: list[tuple[Any, ...]]) -> float:
+    instances: list[Any] = [None] * INSTANCES
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(INSTANCES):
+            instances[i] = cls(*arguments[i % len(arguments)])
+        return (tracemalloc.get_traced_memory()[0] - before) / INSTANCES
+    finally:
+        tracemalloc.stop()
+
+
+def measure(
+    day: str, cls: type, arguments: list[tuple[Any, ...]]
+) -> tuple[float, float, float]:
+    """Bytes per instance, and seconds to create one and read its fields."""
+
+    read_fields = operator.attrgetter(
+        *(field.name for field in dataclasses.fields(cls))
+    )
+    instances = [(cls(*args),) for args in arguments]
+    create = microbench.bench(
+        day, cls.__name__, cls, arguments, samples=SAMPLES
+    )
+    read = microbench.bench(
+        day, cls.__name__, read_fields, instances, samples=SAMPLES
+    )
+    return bytes_per_instance(cls, arguments), create.mean, read.mean
+
+
+def audit_day(day_directory: pathlib.Path) -> list[Layout]:
+    module = days.load(day_directory)
+    parsed = days.parse(module, days.read_input(day_directory))
+    roots = [parsed]
+    microbenchmarks = getattr(module, "microbenchmarks", None)
+    if microbenchmarks is not None:
+        roots.append(
+            [arguments for _, arguments in microbenchmarks(parsed).values()]
+        )
+    layouts = []
+    for cls, instances in records(module, roots).items():
+        if not recreatable(cls):
+            continue
+        arguments = [init_arguments(instance) for instance in instances]
+        size, create, read = measure(day_directory.name, cls, arguments)
+        twin = dict_backed(cls)
+        slotted = twin is not cls
+        if slotted:
+            twin_size, twin_create, twin_read = measure(
+                day_directory.name, twin, arguments
+            )
+        layouts.append(
+            Layout(
+                day_directory.name,
+                cls.__name__,
+                slotted,
+                len(instances),
+                size,
+                twin_size if slotted else None,
+                create,
+                twin_create if slotted else None,
+                read,
+                twin_read if slotted else None,
+            )
+        )
+    return layouts
+
+
+def format_report(layouts: list[Layout]) -> str:
+    header = (
+        f"{'day':>3}  {'type':<18}  {'slots':>5}  {'found':>7}"
+        f"  {'bytes':>13}  {'create ns':>15}  {'read ns':>13}"
+    )
+    lines = [
+        header,
+        f"{'(with a __dict__ in parentheses)':>{len(header)}}",
+        "-" * len(header),
+    ]
+
+    def cell(value: float, twin: float | None, scale: float = 1) -> str:
+        text = f"{value * scale:.0f}"
+        if twin is not None:
+            text += f" ({twin * scale:.0f})"
+        return text
+
+    for layout in layouts:
+        lines.append(
+            f"{layout.day:>3}  {layout.name:<18}"
+            f"  {'yes' if layout.slotted else 'no':>5}  {layout.found:>7}"
+            f"  {cell(layout.size, layout.twin_size):>13}"
+            f"  {cell(layout.create, layout.twin_create, 1e9):>15}"
+            f"  {cell(layout.read, layout.twin_read, 1e9):>13}"
+        )
+    return "\n".join(lines)
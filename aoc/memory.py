@@ -0,0 +1,149 @@
+"""Peak memory and allocation sites of the phases of a day.
+
+Each phase runs under `tracemalloc` while a sampling thread follows both
+the traced memory and the resident set size. The thread takes a snapshot
+whenever the traced memory grows past its previous peak by a margin, so
+the allocation sites reported are those alive near the peak rather than
+only what survives the phase.
+"""
+
+import copy
+import dataclasses
+import gc
+import pathlib
+import resource
+import threading
+import tracemalloc
+from typing import Any, Callable
+
+from aoc import bench, days
+
+SAMPLE_INTERVAL = 0.001
+# Growth over the last snapshot's traced memory that triggers a new one
+SNAPSHOT_GROWTH = 1.1
+
+
+@dataclasses.dataclass
+class MemoryUsage:
+    day: str
+    phase: str
+    peak: int
+    net: int
+    rss_peak: int
+    # (file:line, bytes, allocations) near the peak, largest first
+    sites: list[tuple[str, int, int]]
+
+
+def rss() -> int:
+    """Resident set size of this process in bytes."""
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # Only the peak is available here, in KiB on Linux and bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def site_name(filename: str) -> str:
+    path = pathlib.Path(filename)
+    return f"{path.parent.name}/{path.name}"
+
+
+def measure(
+    function: Callable[[Any], Any], argument: Any, top: int
+) -> tuple[int, int, int, list[tuple[str, int, int]]]:
+    """Peak traced memory, net allocation, RSS growth and top sites."""
+
+    gc.collect()
+    rss_start = rss()
+    rss_peak = rss_start
+    tracemalloc.start()
+    peak_snapshot = tracemalloc.take_snapshot()
+    snapshot_size = 0
+    done = threading.Event()
+
+    def sampler() -> None:
+        nonlocal rss_peak, peak_snapshot, snapshot_size
+        while not done.wait(SAMPLE_INTERVAL):
+            rss_peak = max(rss_peak, rss())
+            current, _ = tracemalloc.get_traced_memory()
+            if current > snapshot_size * SNAPSHOT_GROWTH:
+                peak_snapshot = tracemalloc.take_snapshot()
+                snapshot_size = current
+
+    thread = threading.Thread(target=sampler, daemon=True)
+    thread.start()
+    try:
+        result = function(argument)
+        end_snapshot = tracemalloc.take_snapshot()
+        net, peak = tracemalloc.get_traced_memory()
+    finally:
+        done.set()
+        thread.join()
+        tracemalloc.stop()
+    rss_peak = max(rss_peak, rss())
+    del result
+
+    # Short phases can finish before the first sample
+    if net > snapshot_size:
+        peak_snapshot = end_snapshot
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, threading.__file__),
+        tracemalloc.Filter(False, "*/_weakrefset.py"),
+    ]
+    sites = [
+        (
+            f"{site_name(stat.traceback[0].filename)}"
+            f":{stat.traceback[0].lineno}",
+            stat.size,
+            stat.count,
+        )
+        for stat in peak_snapshot.filter_traces(filters).statistics("lineno")[
+            :top
+        ]
+    ]
+    return peak, net, rss_peak - rss_start, sites
+
+
+def measure_day(
+    day_directory: pathlib.Path, top: int = 5, input_name: str = "input.txt"
+) -> list[MemoryUsage]:
+    day = day_directory.name
+    module = days.load(day_directory)
+    usages = []
+    text = days.read_input(day_directory, input_name)
+    usages.append(MemoryUsage(day, "parse", *measure(module.parse, text, top)))
+    parsed = module.parse(text)
+    for part in bench.PARTS:
+        solve = getattr(module, part, None)
+        if solve is not None:
+            usages.append(
+                MemoryUsage(
+                    day, part, *measure(solve, copy.deepcopy(parsed), top)
+                )
+            )
+    return usages
+
+
+def format_report(usages: list[MemoryUsage]) -> str:
+    header = (
+        f"{'day':>3}  {'phase':<6}  {'peak MiB':>10}  {'net KiB':>10}"
+        f"  {'RSS +MiB':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for usage in usages:
+        lines.append(
+            f"{usage.day:>3}  {usage.phase:<6}"
+            f"  {usage.peak / 2**20:>10.2f}"
+            f"  {usage.net / 2**10:>10.1f}"
+            f"  {usage.rss_peak / 2**20:>10.2f}"
+        )
+        for site, size, count in usage.sites:
+            lines.append(
+                f"{'':>13}{size / 2**10:>10.1f} KiB"
+                f" {count:>9} blocks  {site}"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,254 @@
+"""Micro-benchmarks of the inner functions the days spend their time in.
+
+Whole-day timings cannot tell which kernel a change made slower. A day
+exposes its hot functions with `microbenchmarks(parsed)`, which returns
+the function and the arguments to call it with, drawn from the parsed
+real input so that they follow its distribution:
+
+    def microbenchmarks(steps):
+        return {"hash": (hash, [(step,) for step in steps])}
+
+Each sample calls the function once per argument tuple, for a number of
+loops calibrated so that a sample lasts at least `min_seconds`, and
+records the time per call. Samples outside the Tukey fences are dropped
+as outliers before the mean and its 95% confidence interval are computed.
+
+Results carry the commit and machine they were measured on, and two sets
+of results are compared benchmark by benchmark.
+"""
+
+import dataclasses
+import json
+import math
+import pathlib
+import statistics
+import time
+from typing import Any, Callable
+
+from aoc import days, history
+
+SAMPLES = 20
+WARMUP = 2
+MIN_SECONDS = 0.01
+
+# Two-sided 95% quantiles of Student's t distribution, by degrees of
+# freedom; larger degrees of freedom use the closest smaller entry
+T_QUANTILES = {
+    1: 12.706,
+    2: 4.303,
+    3: 3.182,
+    4: 2.776,
+    5: 2.571,
+    6: 2.447,
+    7: 2.365,
+    8: 2.306,
+    9: 2.262,
+    10: 2.228,
+    12: 2.179,
+    15: 2.131,
+    20: 2.086,
+    25: 2.060,
+    30: 2.042,
+    40: 2.021,
+    60: 2.000,
+    120: 1.980,
+}
+
+Arguments = list[tuple[Any, ...]]
+
+
+@dataclasses.dataclass
+class Result:
+    day: str
+    name: str
+    # Passes over the arguments, and function calls, per sample
+    loops: int
+    calls: int
+    # Seconds per call, without the outliers
+    samples: list[float]
+    outliers: int
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.samples)
+
+    @property
+    def stdev(self) -> float:
+        if len(self.samples) < 2:
+            return 0.0
+        return statistics.stdev(self.samples)
+
+    @property
+    def ci(self) -> float:
+        """Half-width of the 95% confidence interval of the mean."""
+
+        n = len(self.samples)
+        if n < 2:
+            return math.inf
+        return t_quantile(n - 1) * self.stdev / math.sqrt(n)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "day": self.day,
+            "name": self.name,
+            "loops": self.loops,
+            "calls": self.calls,
+            "mean": self.mean,
+            "stdev": self.stdev,
+            "ci": self.ci,
+            "samples": self.samples,
+            "outliers": self.outliers,
+        }
+
+
+def t_quantile(degrees_of_freedom: int) -> float:
+    return T_QUANTILES[
+        max(df for df in T_QUANTILES if df <= degrees_of_freedom)
+    ]
+
+
+def time_loops(
+    function: Callable[..., Any], arguments: Arguments, loops: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        for args in arguments:
+            function(*args)
+    return time.perf_counter() - start
+
+
+def calibrate(
+    function: Callable[..., Any], arguments: Arguments, min_seconds: float
+) -> int:
+    """Loops over the arguments that take at least `min_seconds`."""
+
+    loops = 1
+    while True:
+        seconds = time_loops(function, arguments, loops)
+        if seconds >= min_seconds:
+            return loops
+        # Aim a little past the target, but at most ten times more loops
+        # per step, in case the first ones were dominated by warmup
+        factor = min_seconds / seconds * 1.2 if seconds > 0 else 10
+        loops = math.ceil(loops * min(max(factor, 2), 10))
+
+
+def reject_outliers(samples: list[float]) -> tuple[list[float], int]:
+    """Samples inside the Tukey fences, and the number dropped."""
+
+    if len(samples) < 4:
+        return samples, 0
+    q1, _, q3 = statistics.quantiles(samples, n=4)
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    kept = [sample for sample in samples if low <= sample <= high]
+    return kept, len(samples) - len(kept)
+
+
+def bench(
+    day: str,
+    name: str,
+    function: Callable[..., Any],
+    arguments: Arguments,
+    samples: int = SAMPLES,
+    warmup: int = WARMUP,
+    min_seconds: float = MIN_SECONDS,
+) -> Result:
+    loops = calibrate(function, arguments, min_seconds)
+    calls = loops * len(arguments)
+    for _ in range(warmup):
+        time_loops(function, arguments, loops)
+    per_call = [
+        time_loops(function, arguments, loops) / calls for _ in range(samples)
+    ]
+    kept, outliers = reject_outliers(per_call)
+    return Result(day, name, loops, calls, kept, outliers)
+
+
+def bench_day(
+    day_directory: pathlib.Path,
+    samples: int = SAMPLES,
+    warmup: int = WARMUP,
+    min_seconds: float = MIN_SECONDS,
+) -> list[Result]:
+    module = days.load(day_directory)
+    microbenchmarks = getattr(module, "microbenchmarks", None)
+    if microbenchmarks is None:
+        return []
+    parsed = days.parse(module, days.read_input(day_directory))
+    return [
+        bench(
+            day_directory.name,
+            name,
+            function,
+            arguments,
+            samples,
+            warmup,
+            min_seconds,
+        )
+        for name, (function, arguments) in microbenchmarks(parsed).items()
+    ]
+
+
+def format_report(results: list[Result]) -> str:
+    header = (
+        f"{'day':>3}  {'benchmark':<32}  {'ns/call':>10}  {'± 95%':>8}"
+        f"  {'calls':>9}  {'outliers':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result.day:>3}  {result.name:<32}  {result.mean * 1e9:>10.1f}"
+            f"  {result.ci / result.mean:>8.1%}  {result.calls:>9}"
+            f"  {result.outliers:>8}"
+        )
+    return "\n".join(lines)
+
+
+def to_json(results: list[Result]) -> str:
+    commit_hash, dirty = history.current_commit()
+    return json.dumps(
+        {
+            "commit": commit_hash,
+            "dirty": dirty,
+            "machine": history.machine(),
+            "results": [result.to_dict() for result in results],
+        },
+        indent=2,
+    )
+
+
+def load_json(path: pathlib.Path) -> dict[tuple[str, str], dict[str, Any]]:
+    """Saved results by (day, benchmark)."""
+
+    saved = json.loads(path.read_text())
+    return {
+        (result["day"], result["name"]): result for result in saved["results"]
+    }
+
+
+def format_comparison(
+    baseline: dict[tuple[str, str], dict[str, Any]], results: list[Result]
+) -> str:
+    """Changes from `baseline`, flagged when the intervals do not overlap."""
+
+    header = (
+        f"{'day':>3}  {'benchmark':<32}  {'base ns':>10}  {'new ns':>10}"
+        f"  {'change':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        base = baseline.get((result.day, result.name))
+        if base is None:
+            continue
+        change = result.mean / base["mean"] - 1
+        if result.mean - result.ci > base["mean"] + base["ci"]:
+            verdict = "  slower"
+        elif result.mean + result.ci < base["mean"] - base["ci"]:
+            verdict = "  faster"
+        else:
+            verdict = ""
+        lines.append(
+            f"{result.day:>3}  {result.name:<32}  {base['mean'] * 1e9:>10.1f}"
+            f"  {result.mean * 1e9:>10.1f}  {change:>+8.1%}{verdict}"
+        )
+    return "\n".join(lines)
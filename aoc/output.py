@@ -0,0 +1,25 @@
+"""Console output for the days, importing `rich` only when it is used.
+
+Importing `rich` costs more than some whole days take to run, and is
+wasted when output goes to a pipe or a file, where its styling is dropped
+anyway. `print` writes through the built-in `print` unless the target is a
+terminal, and imports `rich` on the first call that needs it.
+"""
+
+import builtins
+import sys
+from collections.abc import Callable
+
+_rich_print: Callable[..., None] | None = None
+
+
+def print(*objects: object, **kwargs: object) -> None:
+    global _rich_print
+
+    file = kwargs.get("file") or sys.stdout
+    if not file.isatty():
+        builtins.print(*objects, **kwargs)
+        return
+    if _rich_print is None:
+        from rich import print as _rich_print
+    _rich_print(*objects, **kwargs)
@@ -0,0 +1,189 @@
+"""Running the days, or their parts, on a process pool.
+
+Tasks are submitted longest-first using the medians of the previous run,
+so the slowest days start straight away instead of holding up the tail.
+"""
+
+import concurrent.futures
+import dataclasses
+import json
+import math
+import pathlib
+import traceback
+
+from aoc import bench, cache, days, engines, results
+
+PAST_TIMINGS = days.STATE / "timings.json"
+
+
+@dataclasses.dataclass(frozen=True)
+class Task:
+    day: str
+    parts: tuple[str, ...] = bench.PARTS
+    time_parse: bool = True
+
+    @property
+    def phases(self) -> tuple[str, ...]:
+        return (("parse",) if self.time_parse else ()) + self.parts
+
+
+def make_tasks(
+    day_directories: list[pathlib.Path], split_parts: bool = False
+) -> list[Task]:
+    tasks = []
+    for day_directory in day_directories:
+        if split_parts:
+            # Only the first task times the parse, the others still need it
+            tasks.append(Task(day_directory.name, ("part1",)))
+            tasks.append(Task(day_directory.name, ("part2",), False))
+        else:
+            tasks.append(Task(day_directory.name))
+    return tasks
+
+
+def load_past_timings(
+    path: pathlib.Path = PAST_TIMINGS,
+) -> dict[str, dict[str, float]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_past_timings(
+    timings: list[bench.Timing], path: pathlib.Path = PAST_TIMINGS
+) -> None:
+    past = load_past_timings(path)
+    for timing in timings:
+        past.setdefault(timing.day, {})[timing.phase] = timing.median
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(json.dumps(past, indent=2, sort_keys=True) + "\n")
+
+
+def estimated_cost(task: Task, past: dict[str, dict[str, float]]) -> float:
+    # Tasks that have never run might be the slowest, so they go first
+    medians = past.get(task.day, {})
+    cost = 0.0
+    for phase in task.phases:
+        if phase not in medians:
+            return math.inf
+        cost += medians[phase]
+    return cost
+
+
+def schedule(
+    tasks: list[Task], past: dict[str, dict[str, float]]
+) -> list[Task]:
+    return sorted(tasks, key=lambda task: -estimated_cost(task, past))
+
+
+def run_task(
+    task: Task,
+    warmup: int,
+    repeat: int,
+    parse_cache: bool,
+    engine: str = engines.DEFAULT,
+    track: bool = False,
+) -> list[bench.Timing]:
+    return bench.bench_day(
+        days.find_day(task.day),
+        warmup,
+        repeat,
+        parts=task.parts,
+        time_parse=task.time_parse,
+        parse_cache=cache.ParseCache() if parse_cache else None,
+        engine=engine,
+        track=track,
+    )
+
+
+def describe(error: BaseException) -> str:
+    return "".join(traceback.format_exception_only(error)).strip()
+
+
+def run(
+    tasks: list[Task],
+    jobs: int,
+    warmup: int,
+    repeat: int,
+    parse_cache: bool = False,
+    result_cache: results.ResultCache | None = None,
+    engine: str = engines.DEFAULT,
+    track: bool = False,
+) -> tuple[list[bench.Timing], list[bench.Failure], list[str]]:
+    """Run `tasks` on `jobs` processes, or in this process if `jobs` is 1.
+
+    Returns the timings, the failures and, when a `result_cache` is given,
+    why each task that was not served from it had to run.
+    """
+
+    timings: list[bench.Timing] = []
+    failures = []
+    invalidations = []
+    fingerprints = {}
+    if result_cache is not None:
+        pending = []
+        for task in tasks:
+            fingerprints[task] = results.fingerprint(days.find_day(task.day))
+            cached, reason = result_cache.lookup(
+                task.day, task.phases, fingerprints[task]
+            )
+            if cached is None:
+                invalidations.append(
+                    f"day {task.day} ({', '.join(task.phases)}): {reason}"
+                )
+                pending.append(task)
+            else:
+                timings.extend(cached)
+        tasks = pending
+
+    def finish(task: Task, task_timings: list[bench.Timing]) -> None:
+        timings.extend(task_timings)
+        if result_cache is not None:
+            result_cache.store(
+                task.day, task.phases, fingerprints[task], task_timings
+            )
+
+    tasks = schedule(tasks, load_past_timings())
+    if jobs == 1:
+        for task in tasks:
+            try:
+                finish(
+                    task,
+                    run_task(task, warmup, repeat, parse_cache, engine, track),
+                )
+            except Exception as error:
+                failures.append(
+                    bench.Failure(task.day, task.phases, describe(error))
+                )
+    else:
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            futures = {
+                executor.submit(
+                    run_task,
+                    task,
+                    warmup,
+                    repeat,
+                    parse_cache,
+                    engine,
+                    track,
+                ): task
+                for task in tasks
+            }
+            for future in concurrent.futures.as_completed(futures):
+                task = futures[future]
+                error = future.exception()
+                if error is None:
+                    finish(task, future.result())
+                else:
+                    failures.append(
+                        bench.Failure(task.day, task.phases, describe(error))
+                    )
+    # Other engines, and cache loads timed as the parse phase, would skew
+    # the schedule of normal runs
+    if engine == engines.DEFAULT and not parse_cache:
+        save_past_timings(timings)
+    timings.sort(
+        key=lambda timing: (timing.day, bench.PHASES.index(timing.phase))
+    )
+    failures.sort(key=lambda failure: (failure.day, failure.phases))
+    return timings, failures, invalidations
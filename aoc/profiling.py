@@ -0,0 +1,202 @@
+"""Profiling of a single phase of a day.
+
+The phase is run twice: once under `cProfile`, for exact call counts and
+self and cumulative times, and once under a sampling profiler whose stacks
+are written in the collapsed format read by flamegraph tools
+(`flamegraph.pl`, speedscope, ...).
+
+`line_profile` times the lines of one function instead, with a trace
+function that only follows the frames of that function.
+"""
+
+import collections
+import copy
+import cProfile
+import inspect
+import io
+import pathlib
+import pstats
+import sys
+import threading
+import time
+from types import CodeType, FrameType
+from typing import Any, Callable
+
+from aoc import days, engines
+
+DIRECTORY = days.STATE / "profiles"
+SAMPLE_INTERVAL = 0.001
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{pathlib.Path(code.co_filename).name}:{code.co_qualname}"
+
+
+def sample_stacks(
+    function: Callable[[Any], Any], argument: Any
+) -> collections.Counter[str]:
+    """Collapsed stacks of `function(argument)`, sampled from a thread."""
+
+    stacks: collections.Counter[str] = collections.Counter()
+    target = threading.get_ident()
+    done = threading.Event()
+    entry = sample_stacks.__code__
+
+    def sampler() -> None:
+        while not done.wait(SAMPLE_INTERVAL):
+            frame: FrameType | None = sys._current_frames().get(target)
+            labels = []
+            while frame is not None and frame.f_code is not entry:
+                labels.append(frame_label(frame))
+                frame = frame.f_back
+            if labels and frame is not None:
+                stacks[";".join(reversed(labels))] += 1
+
+    # Hand the interpreter to the sampler more often than every 5 ms
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(SAMPLE_INTERVAL / 2)
+    thread = threading.Thread(target=sampler, daemon=True)
+    thread.start()
+    try:
+        function(argument)
+    finally:
+        done.set()
+        thread.join()
+        sys.setswitchinterval(switch_interval)
+    return stacks
+
+
+def profile_phase(
+    day_directory: pathlib.Path,
+    phase: str,
+    top: int = 20,
+    directory: pathlib.Path = DIRECTORY,
+    input_name: str = "input.txt",
+    engine: str = engines.DEFAULT,
+) -> str:
+    """Profiles `phase` of a day and returns the hot-function report.
+
+    A part runs on `engine`, or on the default one if the day lacks it,
+    as in the benchmarks. The `.pstats` and `.collapsed` files are written
+    to `directory`.
+    """
+
+    module = days.load(day_directory)
+    if phase == "parse":
+        function = getattr(module, phase, None)
+    else:
+        function = engines.select(module, phase, engine)
+    if function is None:
+        return f"day {day_directory.name} has no {phase}\n"
+    text = days.read_input(day_directory, input_name)
+    if phase == "parse":
+        make_argument = lambda: text  # noqa: E731
+    else:
+        parsed = module.parse(text)
+        make_argument = lambda: copy.deepcopy(parsed)  # noqa: E731
+
+    profiler = cProfile.Profile()
+    argument = make_argument()
+    profiler.runcall(function, argument)
+    stacks = sample_stacks(function, make_argument())
+
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = directory / f"{day_directory.name}-{phase}"
+    if phase != "parse" and engine != engines.DEFAULT:
+        stem = directory / f"{day_directory.name}-{phase}-{engine}"
+    profiler.dump_stats(stem.with_suffix(".pstats"))
+    stem.with_suffix(".collapsed").write_text(
+        "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+    )
+
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report).strip_dirs()
+    for sort_key, title in (
+        (pstats.SortKey.TIME, "self time"),
+        (pstats.SortKey.CUMULATIVE, "cumulative time"),
+    ):
+        report.write(
+            f"day {day_directory.name} {phase}, top {top} by {title}\n"
+        )
+        stats.sort_stats(sort_key).print_stats(top)
+    report.write(
+        f"wrote {stem.with_suffix('.pstats')} and"
+        f" {stem.with_suffix('.collapsed')}"
+        f" ({sum(stacks.values())} samples)\n"
+    )
+    return report.getvalue()
+
+
+def line_profile(
+    code: CodeType, function: Callable[[Any], Any], argument: Any
+) -> dict[int, tuple[int, float]]:
+    """Hits and seconds of each line of `code` in `function(argument)`.
+
+    The time of a line runs until the next line event of the same frame,
+    so it includes the functions the line calls.
+    """
+
+    stats: dict[int, tuple[int, float]] = {}
+    # The line each frame of `code` is on, and since when
+    current: dict[FrameType, tuple[int, float]] = {}
+
+    def trace_line(frame: FrameType, event: str, arg: Any) -> Any:
+        now = time.perf_counter()
+        previous = current.get(frame)
+        if previous is not None:
+            line, start = previous
+            hits, seconds = stats.get(line, (0, 0.0))
+            stats[line] = (hits, seconds + now - start)
+        if event == "line":
+            hits, seconds = stats.get(frame.f_lineno, (0, 0.0))
+            stats[frame.f_lineno] = (hits + 1, seconds)
+            current[frame] = (frame.f_lineno, time.perf_counter())
+        elif event == "return":
+            # Also on a yield, the next call event resumes the frame
+            current.pop(frame, None)
+        elif previous is not None:
+            current[frame] = (previous[0], time.perf_counter())
+        return trace_line
+
+    def trace_call(frame: FrameType, event: str, arg: Any) -> Any:
+        return trace_line if frame.f_code is code else None
+
+    trace = sys.gettrace()
+    sys.settrace(trace_call)
+    try:
+        function(argument)
+    finally:
+        sys.settrace(trace)
+    return stats
+
+
+def format_line_profile(
+    function: Callable[..., Any], stats: dict[int, tuple[int, float]]
+) -> str:
+    lines, first = inspect.getsourcelines(function)
+    total = sum(seconds for _, seconds in stats.values())
+    header = (
+        f"{'line':>5}  {'hits':>9}  {'ms':>10}  {'us/hit':>9}  {'%':>5}"
+        "  source"
+    )
+    report = [
+        f"{function.__qualname__}, {total * 1000:.3f} ms in lines",
+        header,
+        "-" * len(header),
+    ]
+    for number, source in enumerate(lines, start=first):
+        source = source.rstrip()
+        if number not in stats:
+            report.append(
+                f"{number:>5}  {'':>9}  {'':>10}  {'':>9}  {'':>5}"
+                f"  {source}"
+            )
+            continue
+        hits, seconds = stats[number]
+        share = seconds / total if total else 0.0
+        report.append(
+            f"{number:>5}  {hits:>9}  {seconds * 1000:>10.3f}"
+            f"  {seconds / hits * 1e6:>9.2f}  {share:>5.1%}  {source}"
+        )
+    return "\n".join(report)
@@ -0,0 +1,85 @@
+"""Opt-in progress bars and throughput of the long loops of the days.
+
+A day wraps the items of an outer loop in `track(items, name)`. While
+tracking is off, which is the default, `track` returns the items
+themselves, so the loop runs as before at the cost of one call per loop.
+Within `recording()`, as in `python -m aoc bench --progress`, it yields
+the same items while timing each one, from handing it out to the request
+for the next, which is the body of the loop. Each loop gets an
+`aoc.throughput.Throughput` record of its items, time and per-item
+latencies, and, when the display is on, a `tqdm` bar with its rate and
+time left. Like `rich` in `aoc.output`, `tqdm` is only imported once a
+bar is shown, and the records only once loops are recorded.
+"""
+
+import contextlib
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, TypeVar
+
+if TYPE_CHECKING:
+    from aoc.throughput import Throughput
+
+T = TypeVar("T")
+
+# Records of the loops tracked since `recording` started, or None while
+# tracking is off
+_records: "list[Throughput] | None" = None
+_display = False
+
+
+@contextlib.contextmanager
+def recording(display: bool = False) -> "Iterator[list[Throughput]]":
+    """Tracks loops within the block, into the list it gives."""
+
+    global _records, _display
+
+    saved = _records, _display
+    _records, _display = [], display
+    try:
+        yield _records
+    finally:
+        _records, _display = saved
+
+
+def track(
+    items: Iterable[T], name: str, total: int | None = None
+) -> Iterable[T]:
+    """`items`, timed one by one if tracking is on.
+
+    `total` is the number of items for the bar, where `items` has no
+    length.
+    """
+
+    if _records is None:
+        return items
+    # Imported once tracking is on, as dataclasses takes long to import
+    from aoc.throughput import Throughput
+
+    record = Throughput(name)
+    _records.append(record)
+    return timed(items, record, total, _display)
+
+
+def timed(
+    items: Iterable[T], record: "Throughput", total: int | None, display: bool
+) -> Iterator[T]:
+    bar = None
+    if display:
+        import tqdm
+
+        if total is None and hasattr(items, "__len__"):
+            total = len(items)  # type: ignore[arg-type]
+        bar = tqdm.tqdm(total=total, desc=record.name, leave=False)
+    start = previous = time.perf_counter()
+    try:
+        for item in items:
+            yield item
+            now = time.perf_counter()
+            record.add(now - previous)
+            previous = now
+            if bar is not None:
+                bar.update()
+    finally:
+        record.seconds = time.perf_counter() - start
+        if bar is not None:
+            bar.close()
@@ -0,0 +1,289 @@
+"""Pictures of grids and trenches, as text or PNG images.
+
+`text` turns a `Grid` and overlays, sets of offsets drawn with their own
+symbol over the cells, into a string. The cells are copied once into a
+buffer, the overlays written into it as marker bytes and the border
+columns turned into newlines, and the buffer is then decoded and
+translated to the symbols in one call each, so the cost per cell is a few
+C-level byte operations rather than a Python iteration:
+
+    >>> grid = Grid.from_text("|.\\nL-")
+    >>> print(text(grid, [({grid.offset(1, 1)}, "*")], {"|": "│"}))
+    │.
+    L*
+
+An `Image` is the same for pictures: one byte per pixel, an index into a
+palette of at most 256 colors, written by `write_png` with `zlib` only.
+`grid_image` colors a grid and its overlays, and `polygon_image` fills a
+rectilinear polygon such as day 18's trench. When the polygon is wider or
+taller than `max_size`, its coordinates are compressed: each distinct
+corner coordinate and each gap between two of them becomes a single row
+or column, so that the image grows with the number of corners rather than
+the extent. Images larger than `max_size` are downsampled by blocks,
+keeping the highest color index in each block, so that a one pixel wide
+loop or edge drawn over a background stays visible.
+"""
+
+import bisect
+import collections
+import dataclasses
+import pathlib
+import struct
+import zlib
+from typing import Iterable, Sequence
+
+from aoc.grid import Grid
+
+MAX_SIZE = 1000
+
+# Black background, then white, red and yellow for the overlays
+PALETTE = [(0, 0, 0), (255, 255, 255), (200, 30, 30), (250, 200, 40)]
+
+# Downsampling ORs the pixels of a block as one hot bit masks, so it only
+# keeps the first 8 colors apart
+ONE_HOT = bytes(1 << i if i < 8 else 0 for i in range(256))
+HIGHEST_BIT = bytes(max(i.bit_length() - 1, 0) for i in range(256))
+
+# Overlay symbols are written as these bytes, above the ASCII of the cells
+FIRST_MARKER = 0x80
+
+Overlay = tuple[Iterable[int], str | None]
+
+
+def text(
+    grid: Grid,
+    overlays: Sequence[Overlay] = (),
+    symbols: dict[str, str] | None = None,
+    background: str | None = None,
+) -> str:
+    """The cells of `grid` as lines, with `overlays` drawn over them.
+
+    An overlay is a collection of offsets and the symbol to draw there, or
+    None to show the cell itself. Later overlays are drawn over earlier
+    ones. `symbols` replaces cell characters, and `background`, when
+    given, is drawn instead of the cells that no overlay covers.
+    """
+
+    if not grid.cells.isascii():
+        raise ValueError("only grids of ASCII cells can be rendered")
+    if len(overlays) > 0xFF - FIRST_MARKER:
+        raise ValueError("too many overlays")
+    cells = grid.cells
+    table = {ord(cell): symbol for cell, symbol in (symbols or {}).items()}
+    if background is None:
+        buffer = bytearray(cells)
+    else:
+        table[FIRST_MARKER] = background
+        buffer = bytearray(FIRST_MARKER.to_bytes()) * len(cells)
+    for marker, (offsets, symbol) in enumerate(overlays, FIRST_MARKER + 1):
+        if symbol is None:
+            for offset in offsets:
+                buffer[offset] = cells[offset]
+        else:
+            table[marker] = symbol
+            for offset in offsets:
+                buffer[offset] = marker
+    lines = _strip_border(buffer, grid, b"\n")
+    del lines[-1:]
+    return lines.decode("latin-1").translate(table)
+
+
+def _strip_border(buffer: bytearray, grid: Grid, end: bytes) -> bytearray:
+    """The rows of a buffer laid out like `grid.cells`, each followed by
+    `end` (one byte, or none) instead of its border cells."""
+
+    width = grid.width
+    rows = buffer[width : width * (grid.rows + 1)]
+    # Each row is its left border, its cells, then its right border
+    if end:
+        rows[width - 1 :: width] = end * grid.rows
+    else:
+        del rows[width - 1 :: width]
+        width -= 1
+    del rows[::width]
+    return rows
+
+
+@dataclasses.dataclass
+class Image:
+    # Palette index of each pixel, row by row
+    pixels: bytearray
+    width: int
+    height: int
+
+    def count(self, index: int) -> int:
+        return self.pixels.count(index)
+
+
+def grid_image(
+    grid: Grid,
+    overlays: Sequence[tuple[Iterable[int], int]] = (),
+    colors: dict[str, int] | None = None,
+    max_size: int = MAX_SIZE,
+) -> Image:
+    """A pixel for each cell, in the palette index of its character in
+    `colors` (0 if not there), or of the last overlay that covers it."""
+
+    table = bytearray(256)
+    for cell, index in (colors or {}).items():
+        table[ord(cell)] = index
+    buffer = grid.cells.translate(table)
+    for offsets, index in overlays:
+        for offset in offsets:
+            buffer[offset] = index
+    image = Image(_strip_border(buffer, grid, b""), grid.cols, grid.rows)
+    return downsample(image, max_size)
+
+
+def polygon_image(
+    corners: Sequence[tuple[int, int]],
+    max_size: int = MAX_SIZE,
+    edge: int = 1,
+    inside: int = 2,
+) -> Image:
+    """The cells on and inside a rectilinear polygon, through the cells
+    at `corners` (row, column) in order.
+
+    Its edge is colored `edge` and its inside `inside`. Coordinates are
+    compressed if the polygon does not fit in `max_size`.
+    """
+
+    rows = sorted({i for i, _ in corners})
+    cols = sorted({j for _, j in corners})
+    compress = max(rows[-1] - rows[0], cols[-1] - cols[0]) >= max_size
+    row_starts, col_starts = _bands(rows, compress), _bands(cols, compress)
+    height, width = len(row_starts), len(col_starts)
+    # Corner coordinates always start a row or column
+    row_of = {i: r for r, i in enumerate(row_starts)}
+    col_of = {j: c for c, j in enumerate(col_starts)}
+    pixels = bytearray(width * height)
+
+    # Columns of the vertical edges by their first and last row
+    opening = collections.defaultdict(list)
+    closing = collections.defaultdict(list)
+    for (i1, j1), (i2, j2) in zip(corners, [*corners[1:], corners[0]]):
+        if j1 == j2:
+            opening[min(i1, i2)].append(j1)
+            closing[max(i1, i2)].append(j1)
+        elif i1 != i2:
+            raise ValueError("polygon edges must be horizontal or vertical")
+
+    # Which cells of a row are inside only changes at corner rows. The
+    # edges crossed by row `i` are those with `first <= i < last`, which
+    # fills each row as it is just below the corner rows, the edge itself
+    # being drawn afterwards.
+    inside_byte = inside.to_bytes()
+    crossings: list[int] = []
+    for top, bottom in zip(rows, rows[1:]):
+        for j in closing[top]:
+            crossings.remove(j)
+        for j in opening[top]:
+            bisect.insort(crossings, j)
+        start = row_of[top] * width
+        for j1, j2 in zip(crossings[::2], crossings[1::2]):
+            c1, c2 = col_of[j1], col_of[j2]
+            pixels[start + c1 : start + c2] = inside_byte * (c2 - c1)
+        row = pixels[start : start + width]
+        for r in range(row_of[top] + 1, row_of[bottom]):
+            pixels[r * width : (r + 1) * width] = row
+
+    edge_byte = edge.to_bytes()
+    for (i1, j1), (i2, j2) in zip(corners, [*corners[1:], corners[0]]):
+        r1, r2 = sorted((row_of[i1], row_of[i2]))
+        c1, c2 = sorted((col_of[j1], col_of[j2]))
+        if r1 == r2:
+            start = r1 * width
+            pixels[start + c1 : start + c2 + 1] = edge_byte * (c2 - c1 + 1)
+        else:
+            pixels[r1 * width + c1 : r2 * width + c1 + 1 : width] = (
+                edge_byte * (r2 - r1 + 1)
+            )
+    return downsample(Image(pixels, width, height), max_size)
+
+
+def _bands(coordinates: list[int], compress: bool) -> list[int]:
+    """The first coordinate of each row (or column) of the image."""
+
+    if not compress:
+        return list(range(coordinates[0], coordinates[-1] + 1))
+    starts = []
+    for coordinate, following in zip(coordinates, coordinates[1:]):
+        starts.append(coordinate)
+        if following > coordinate + 1:
+            starts.append(coordinate + 1)
+    starts.append(coordinates[-1])
+    return starts
+
+
+def downsample(image: Image, max_size: int = MAX_SIZE) -> Image:
+    """`image` shrunk by a whole factor to fit in `max_size`, each pixel
+    taking the highest color index of its block."""
+
+    factor = -(-max(image.width, image.height) // max_size)
+    if factor <= 1:
+        return image
+    if image.pixels.translate(None, bytes(range(8))):
+        raise ValueError("only images of the first 8 colors can be shrunk")
+    hot = image.pixels.translate(ONE_HOT)
+    width = image.width
+    shrunk_width = -(-width // factor)
+    shrunk_height = -(-image.height // factor)
+    shrunk = bytearray(shrunk_width * shrunk_height)
+    for i in range(shrunk_height):
+        # The rows of the block, then their columns, ORed as one integer
+        # of one byte per pixel
+        band = 0
+        for r in range(i * factor, min((i + 1) * factor, image.height)):
+            band |= int.from_bytes(hot[r * width : (r + 1) * width], "little")
+        pooled = band
+        for shift in range(8, 8 * factor, 8):
+            pooled |= band >> shift
+        shrunk[i * shrunk_width : (i + 1) * shrunk_width] = pooled.to_bytes(
+            width, "little"
+        )[::factor]
+    return Image(shrunk.translate(HIGHEST_BIT), shrunk_width, shrunk_height)
+
+
+def png(
+    image: Image, palette: Sequence[tuple[int, int, int]] = PALETTE
+) -> bytes:
+    """`image` as an 8-bit indexed color PNG file."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    if len(palette) > 256:
+        raise ValueError("a palette has at most 256 colors")
+    compressor = zlib.compressobj()
+    data = []
+    width = image.width
+    for i in range(image.height):
+        # Each row starts with its filter type, 0 for none
+        data.append(compressor.compress(b"\0"))
+        data.append(
+            compressor.compress(image.pixels[i * width : (i + 1) * width])
+        )
+    data.append(compressor.flush())
+    header = struct.pack(">IIBBBBB", width, image.height, 8, 3, 0, 0, 0)
+    return b"".join(
+        [
+            b"\x89PNG\r\n\x1a\n",
+            chunk(b"IHDR", header),
+            chunk(b"PLTE", bytes(c for color in palette for c in color)),
+            chunk(b"IDAT", b"".join(data)),
+            chunk(b"IEND", b""),
+        ]
+    )
+
+
+def write_png(
+    path: pathlib.Path | str,
+    image: Image,
+    palette: Sequence[tuple[int, int, int]] = PALETTE,
+) -> None:
+    pathlib.Path(path).write_bytes(png(image, palette))
@@ -0,0 +1,135 @@
+"""Memoized answers and timings of days whose code and inputs are unchanged.
+
+A day's fingerprint covers its `run.py`, the `aoc` modules it imports
+(directly or through other `aoc` modules) and the text files in its
+directory.
+"""
+
+import ast
+import hashlib
+import json
+import pathlib
+from typing import Any
+
+from aoc import bench, days, throughput
+
+DIRECTORY = days.STATE / "cache" / "results"
+
+
+def local_imports(path: pathlib.Path) -> set[pathlib.Path]:
+    """The `aoc` modules imported by the Python file at `path`."""
+
+    modules = set()
+    for node in ast.walk(ast.parse(path.read_text())):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module is not None:
+            modules.add(node.module)
+            # `from aoc import grid` imports the module aoc.grid
+            modules.update(
+                f"{node.module}.{alias.name}" for alias in node.names
+            )
+    paths = set()
+    for module in modules:
+        if module != "aoc" and not module.startswith("aoc."):
+            continue
+        relative = pathlib.Path(*module.split("."))
+        for candidate in (
+            days.ROOT / relative.with_suffix(".py"),
+            days.ROOT / relative / "__init__.py",
+        ):
+            if candidate.is_file():
+                paths.add(candidate)
+    return paths
+
+
+def dependencies(day_directory: pathlib.Path) -> list[pathlib.Path]:
+    found: set[pathlib.Path] = set()
+    pending = [day_directory / "run.py"]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+        pending.extend(local_imports(path))
+    found.update(day_directory.glob("*.txt"))
+    return sorted(found)
+
+
+def fingerprint(day_directory: pathlib.Path) -> dict[str, str]:
+    return {
+        str(path.relative_to(days.ROOT)): hashlib.sha256(
+            path.read_bytes()
+        ).hexdigest()
+        for path in dependencies(day_directory)
+    }
+
+
+def describe_changes(old: dict[str, str], new: dict[str, str]) -> str:
+    changed = sorted(
+        path
+        for path in old.keys() | new.keys()
+        if old.get(path) != new.get(path)
+    )
+    return "changed " + ", ".join(changed)
+
+
+class ResultCache:
+    def __init__(
+        self,
+        settings: dict[str, Any],
+        force: bool = False,
+        directory: pathlib.Path = DIRECTORY,
+    ):
+        # Runs with different settings (repeats, ...) do not share results
+        self.settings = settings
+        self.force = force
+        self.directory = directory
+
+    def path(self, day: str, phases: tuple[str, ...]) -> pathlib.Path:
+        return self.directory / f"{day}-{'-'.join(phases)}.json"
+
+    def lookup(
+        self, day: str, phases: tuple[str, ...], current: dict[str, str]
+    ) -> tuple[list[bench.Timing] | None, str]:
+        """Cached timings, or None and the reason they cannot be used."""
+
+        path = self.path(day, phases)
+        if self.force:
+            return None, "forced"
+        if not path.exists():
+            return None, "not cached"
+        entry = json.loads(path.read_text())
+        if entry["settings"] != self.settings:
+            return None, "settings changed"
+        if entry["fingerprint"] != current:
+            return None, describe_changes(entry["fingerprint"], current)
+        return [
+            bench.Timing(
+                timing["day"],
+                timing["phase"],
+                timing["samples"],
+                timing["answer"],
+                cached=True,
+                throughput=[
+                    throughput.Throughput.from_dict(record)
+                    for record in timing.get("throughput", [])
+                ],
+            )
+            for timing in entry["timings"]
+        ], "cached"
+
+    def store(
+        self,
+        day: str,
+        phases: tuple[str, ...],
+        current: dict[str, str],
+        timings: list[bench.Timing],
+    ) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "settings": self.settings,
+            "fingerprint": current,
+            "timings": [timing.to_dict() for timing in timings],
+        }
+        self.path(day, phases).write_text(json.dumps(entry, default=str))
@@ -0,0 +1,238 @@
+"""How the phases of each day scale with the size of their input.
+
+Each day's `generate(scale, seed)` writes a synthetic input about `scale`
+times the size of the real one. Every phase is timed once per scale in a
+child process, which is killed once it runs past a timeout, and a line
+fitted to log(time) against log(input bytes) gives the empirical exponent
+of each phase. Exponents well above 1 point at superlinear algorithms that
+the real inputs are too small to expose.
+"""
+
+import copy
+import dataclasses
+import math
+import multiprocessing
+import pathlib
+import time
+import traceback
+from multiprocessing.connection import Connection
+
+from aoc import bench, days
+
+SCALES = (1, 10, 100, 1000)
+# Shorter phases are mostly noise and are left out of the fit
+MIN_SECONDS = 0.001
+
+
+@dataclasses.dataclass
+class Point:
+    day: str
+    scale: int
+    size: int | None = None
+    seconds: dict[str, float] = dataclasses.field(default_factory=dict)
+    # The phase that was running when the timeout hit, if it did
+    timed_out: str | None = None
+    error: str | None = None
+
+
+@dataclasses.dataclass
+class Fit:
+    day: str
+    phase: str
+    exponent: float | None
+    timed_out: bool
+    flagged: bool
+
+
+def run_generated(
+    day_directory: pathlib.Path, scale: int, seed: int, connection: Connection
+) -> None:
+    """Child process: sends the input size, then each phase's time."""
+
+    try:
+        module = days.load(day_directory)
+        text = module.generate(scale, seed)
+        connection.send(("size", len(text.encode())))
+        start = time.perf_counter()
+        parsed = module.parse(text)
+        connection.send(("parse", time.perf_counter() - start))
+        del text
+        for part in bench.PARTS:
+            solve = getattr(module, part, None)
+            if solve is None:
+                continue
+            argument = copy.deepcopy(parsed)
+            start = time.perf_counter()
+            solve(argument)
+            connection.send((part, time.perf_counter() - start))
+    except Exception as error:
+        frame = traceback.extract_tb(error.__traceback__)[-1]
+        connection.send(
+            (
+                "error",
+                f"{type(error).__name__}: {error}"
+                f" ({pathlib.Path(frame.filename).name}:{frame.lineno})",
+            )
+        )
+    finally:
+        connection.close()
+
+
+def measure(
+    day_directory: pathlib.Path, scale: int, seed: int, timeout: float
+) -> Point:
+    """Times the phases on one generated input, within `timeout` seconds.
+
+    The timeout also covers generating the input, which is not timed.
+    """
+
+    point = Point(day_directory.name, scale)
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=run_generated, args=(day_directory, scale, seed, sender)
+    )
+    process.start()
+    sender.close()
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not receiver.poll(remaining):
+            point.timed_out = next_phase(point)
+            process.kill()
+            break
+        try:
+            kind, value = receiver.recv()
+        except EOFError:
+            break
+        if kind == "size":
+            point.size = value
+        elif kind == "error":
+            point.error = value
+        else:
+            point.seconds[kind] = value
+    process.join()
+    receiver.close()
+    if point.timed_out is None and process.exitcode and point.error is None:
+        point.error = f"exit code {process.exitcode}"
+    return point
+
+
+def next_phase(point: Point) -> str:
+    if point.size is None:
+        return "generate"
+    for phase in bench.PHASES:
+        if phase not in point.seconds:
+            return phase
+    return bench.PHASES[-1]
+
+
+def scale_day(
+    day_directory: pathlib.Path,
+    scales: tuple[int, ...] = SCALES,
+    seed: int = 0,
+    timeout: float = 30.0,
+) -> list[Point]:
+    """Measures increasing scales until one times out or fails."""
+
+    points = []
+    for scale in sorted(scales):
+        point = measure(day_directory, scale, seed, timeout)
+        points.append(point)
+        if point.timed_out is not None or point.error is not None:
+            break
+    return points
+
+
+def exponent(points: list[Point], phase: str) -> float | None:
+    """Least squares slope of log(seconds) against log(input bytes)."""
+
+    xs = []
+    ys = []
+    for point in points:
+        seconds = point.seconds.get(phase)
+        if point.size and seconds is not None and seconds >= MIN_SECONDS:
+            xs.append(math.log(point.size))
+            ys.append(math.log(seconds))
+    if len(xs) < 2:
+        return None
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return None
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    return sxy / sxx
+
+
+def fit(points: list[Point], tolerance: float) -> list[Fit]:
+    """Exponent of each phase; flags superlinear phases and timeouts."""
+
+    fits = []
+    for phase in bench.PHASES:
+        timed_out = any(point.timed_out == phase for point in points)
+        if not timed_out and not any(
+            phase in point.seconds for point in points
+        ):
+            continue
+        slope = exponent(points, phase)
+        flagged = timed_out or (slope is not None and slope > 1 + tolerance)
+        fits.append(Fit(points[0].day, phase, slope, timed_out, flagged))
+    return fits
+
+
+def format_report(
+    points: list[Point], fits: list[Fit], scales: tuple[int, ...]
+) -> str:
+    scales = tuple(sorted(scales))
+    header = (
+        f"{'day':>3}  {'phase':<6}"
+        + "".join(f"  {f'{scale}x ms':>10}" for scale in scales)
+        + f"  {'exponent':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    by_key = {(point.day, point.scale): point for point in points}
+    day = None
+    for fit_ in fits:
+        if fit_.day != day:
+            day = fit_.day
+            sizes = []
+            for scale in scales:
+                point = by_key.get((day, scale))
+                size = None if point is None else point.size
+                sizes.append("" if size is None else f"{size / 2**10:.0f}")
+            lines.append(
+                f"{day:>3}  {'KiB':<6}"
+                + "".join(f"  {size:>10}" for size in sizes)
+            )
+        cells = []
+        for scale in scales:
+            point = by_key.get((fit_.day, scale))
+            if point is None:
+                cells.append("")
+            elif fit_.phase in point.seconds:
+                cells.append(f"{point.seconds[fit_.phase] * 1000:.1f}")
+            elif point.timed_out == fit_.phase:
+                cells.append("timeout")
+            else:
+                cells.append("-")
+        slope = "" if fit_.exponent is None else f"{fit_.exponent:.2f}"
+        if fit_.timed_out:
+            flag = "  timed out"
+        elif fit_.flagged:
+            flag = "  superlinear"
+        else:
+            flag = ""
+        lines.append(
+            f"{fit_.day:>3}  {fit_.phase:<6}"
+            + "".join(f"  {cell:>10}" for cell in cells)
+            + f"  {slope:>8}{flag}"
+        )
+    lines.append("-" * len(header))
+    for point in points:
+        if point.timed_out == "generate":
+            lines.append(
+                f"day {point.day} at {point.scale}x: generating timed out"
+            )
+        if point.error is not None:
+            lines.append(f"day {point.day} at {point.scale}x: {point.error}")
+    return "\n".join(lines)
@@ -0,0 +1,96 @@
+"""Import cost of each day, from `python -X importtime`.
+
+Every day is loaded in a fresh interpreter, so nothing is imported yet
+apart from what the interpreter itself needs at startup. Only the imports
+made while executing `run.py` are counted.
+"""
+
+import dataclasses
+import pathlib
+import subprocess
+import sys
+import time
+
+from aoc import days
+
+MARKER = "-- run.py --"
+LOAD = f"""
+import importlib.util, sys, time
+spec = importlib.util.spec_from_file_location("day", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+sys.stderr.write({MARKER!r} + "\\n")
+start = time.perf_counter()
+spec.loader.exec_module(module)
+print(time.perf_counter() - start)
+"""
+
+
+@dataclasses.dataclass
+class StartupCost:
+    day: str
+    # Wall time of the whole interpreter, and of loading run.py in it
+    interpreter: float
+    load: float
+    # (module, cumulative seconds) of the top-level imports of run.py
+    imports: list[tuple[str, float]]
+
+    @property
+    def import_total(self) -> float:
+        return sum(seconds for _, seconds in self.imports)
+
+
+def parse_importtime(lines: list[str]) -> list[tuple[str, float]]:
+    """Top-level imports and their cumulative times in seconds."""
+
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Nested imports are indented by two spaces per level
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        imports.append((name.strip(), int(cumulative) / 1e6))
+    return imports
+
+
+def measure(day_directory: pathlib.Path) -> StartupCost:
+    command = [
+        sys.executable,
+        "-X",
+        "importtime",
+        "-c",
+        LOAD,
+        str(day_directory / "run.py"),
+    ]
+    start = time.perf_counter()
+    completed = subprocess.run(
+        command, capture_output=True, text=True, check=True
+    )
+    interpreter = time.perf_counter() - start
+    errors = completed.stderr.splitlines()
+    return StartupCost(
+        day_directory.name,
+        interpreter,
+        float(completed.stdout.split()[-1]),
+        parse_importtime(errors[errors.index(MARKER) + 1 :]),
+    )
+
+
+def format_report(costs: list[StartupCost], top: int = 3) -> str:
+    header = (
+        f"{'day':>3}  {'process ms':>10}  {'load ms':>8}  {'imports ms':>10}"
+        "  heaviest imports"
+    )
+    lines = [header, "-" * len(header)]
+    for cost in costs:
+        heaviest = sorted(cost.imports, key=lambda item: -item[1])[:top]
+        lines.append(
+            f"{cost.day:>3}  {cost.interpreter * 1000:>10.1f}"
+            f"  {cost.load * 1000:>8.1f}  {cost.import_total * 1000:>10.1f}"
+            "  "
+            + ", ".join(
+                f"{name} {seconds * 1000:.1f}" for name, seconds in heaviest
+            )
+        )
+    return "\n".join(lines)
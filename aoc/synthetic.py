@@ -0,0 +1,81 @@
+"""Building blocks for the synthetic input generators of the days."""
+
+import math
+import random
+
+
+def side(base: int, scale: int) -> int:
+    """Side of a square grid with `scale` times the cells of a `base` one."""
+
+    return max(1, round(base * math.sqrt(scale)))
+
+
+def column_convex_polygon(
+    rng: random.Random, columns: int, rows: int
+) -> list[tuple[int, int]]:
+    """Corners of a random simple rectilinear polygon, in order.
+
+    The polygon is the outline of a region made of one vertical run of
+    cells per column, where neighboring runs overlap by at least a cell.
+    Such a region has no holes and no cells touching only by a corner, so
+    its outline never touches itself. Corners are `(row, column)` points
+    with `0 <= row <= rows` and `0 <= column <= columns`.
+    """
+
+    if rows < 2:
+        raise ValueError("need at least 2 rows")
+    runs = []
+    top, bottom = rows // 4, rows - rows // 4
+    for _ in range(columns):
+        new_top = min(max(top + rng.randint(-2, 2), 0), rows - 1)
+        new_bottom = min(max(bottom + rng.randint(-2, 2), new_top + 1), rows)
+        # Keep at least one row in common with the previous run
+        if runs:
+            new_top = min(new_top, bottom - 1)
+            new_bottom = max(new_bottom, top + 1)
+        top, bottom = new_top, new_bottom
+        runs.append((top, bottom))
+
+    points = []
+    for column, (top, _) in enumerate(runs):
+        points.append((top, column))
+        points.append((top, column + 1))
+    for column in reversed(range(columns)):
+        bottom = runs[column][1]
+        points.append((bottom, column + 1))
+        points.append((bottom, column))
+
+    corners: list[tuple[int, int]] = []
+    for point in points:
+        if corners and corners[-1] == point:
+            continue
+        # Drop the middle of three collinear points
+        if len(corners) >= 2 and (
+            corners[-2][0] == corners[-1][0] == point[0]
+            or corners[-2][1] == corners[-1][1] == point[1]
+        ):
+            corners.pop()
+        corners.append(point)
+    while len(corners) >= 3 and (
+        corners[-2][0] == corners[-1][0] == corners[0][0]
+        or corners[-2][1] == corners[-1][1] == corners[0][1]
+    ):
+        corners.pop()
+    while len(corners) >= 3 and (
+        corners[-1][0] == corners[0][0] == corners[1][0]
+        or corners[-1][1] == corners[0][1] == corners[1][1]
+    ):
+        corners.pop(0)
+    return corners
+
+
+def stretch(rng: random.Random, size: int, low: int, high: int) -> list[int]:
+    """Increasing coordinates with random gaps between `low` and `high`.
+
+    Mapping the corners of a polygon through it keeps the polygon simple.
+    """
+
+    coordinates = [0]
+    for _ in range(size):
+        coordinates.append(coordinates[-1] + rng.randint(low, high))
+    return coordinates
@@ -0,0 +1,89 @@
+"""Throughput records of the loops tracked by `aoc.progress`.
+
+A record counts the items of a loop, the time they took and how their
+latencies are spread. It is only imported while loops are recorded, or
+to report records, so that `aoc.progress` costs the days nothing to
+import.
+"""
+
+import dataclasses
+from typing import Any
+
+
+@dataclasses.dataclass
+class Throughput:
+    name: str
+    items: int = 0
+    seconds: float = 0.0
+    # Items by latency: bucket k counts those of at least 2**(k - 1) and
+    # under 2**k nanoseconds
+    histogram: dict[int, int] = dataclasses.field(default_factory=dict)
+
+    def add(self, seconds: float) -> None:
+        bucket = int(seconds * 1e9).bit_length()
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+        self.items += 1
+
+    def merge(self, other: "Throughput") -> None:
+        self.items += other.items
+        self.seconds += other.seconds
+        for bucket, count in other.histogram.items():
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + count
+
+    @property
+    def rate(self) -> float:
+        """Items per second."""
+
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the `q`-quantile of the latencies, in seconds."""
+
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= q * self.items:
+                return 2**bucket / 1e9
+        return 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "items": self.items,
+            "seconds": self.seconds,
+            "rate": self.rate,
+            "histogram": self.histogram,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Throughput":
+        # JSON object keys are strings
+        histogram = {
+            int(bucket): count for bucket, count in data["histogram"].items()
+        }
+        return cls(data["name"], data["items"], data["seconds"], histogram)
+
+
+def combine(records: list[Throughput]) -> list[Throughput]:
+    """One record per loop name, adding up repeated runs of a loop."""
+
+    combined: dict[str, Throughput] = {}
+    for record in records:
+        if record.name not in combined:
+            combined[record.name] = Throughput(record.name)
+        combined[record.name].merge(record)
+    return list(combined.values())
+
+
+def format_histogram(histogram: dict[int, int]) -> str:
+    def bound(bucket: int) -> str:
+        nanoseconds = 2**bucket
+        if nanoseconds < 1000:
+            return f"{nanoseconds}ns"
+        if nanoseconds < 10**6:
+            return f"{nanoseconds / 1000:.0f}us"
+        return f"{nanoseconds / 10**6:.0f}ms"
+
+    return " ".join(
+        f"<{bound(bucket)}:{histogram[bucket]}" for bucket in sorted(histogram)
+    )
@@ -0,0 +1,248 @@
+"""Rerunning a day whenever its files change, in one interpreter.
+
+The watcher polls the modification times of the day's `run.py`, of the
+`aoc` modules it imports and of its input files. On a change, it reloads
+the changed modules with `importlib.reload` and reruns only what the
+change can affect, judged from the source of each phase: the functions and
+classes `parse`, `part1` or `part2` refer to, transitively within the
+day's module, and the module-level values they use. Parsed inputs are
+kept between runs, and reused for as long as both the input and the
+source of `parse` are unchanged.
+"""
+
+import ast
+import copy
+import dataclasses
+import hashlib
+import importlib
+import inspect
+import linecache
+import pathlib
+import sys
+import time
+from types import ModuleType
+from typing import Any, Callable
+
+from aoc import days, parallel, results
+
+INTERVAL = 0.5
+
+
+def referenced_names(source: str) -> set[str]:
+    return {
+        node.id
+        for node in ast.walk(ast.parse(source))
+        if isinstance(node, ast.Name)
+    }
+
+
+def fingerprint(module: ModuleType, name: str) -> str:
+    """Hash of the source `name` depends on within `module`."""
+
+    digest = hashlib.sha256()
+    seen = set()
+    pending = [name]
+    while pending:
+        name = pending.pop()
+        if name in seen or not hasattr(module, name):
+            continue
+        seen.add(name)
+        value = inspect.unwrap(getattr(module, name))
+        digest.update(name.encode())
+        if inspect.isfunction(value) or inspect.isclass(value):
+            # Code from other modules is covered by their modification time
+            if value.__module__ != module.__name__:
+                continue
+            source = inspect.getsource(value)
+            digest.update(source.encode())
+            pending.extend(sorted(referenced_names(source)))
+        elif not inspect.ismodule(value):
+            digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+@dataclasses.dataclass
+class Run:
+    source: str
+    phase: str
+    # The fingerprint of the code and input the result was computed from
+    fingerprint: str
+    answer: Any = None
+    seconds: float | None = None
+    error: str | None = None
+    # Taken from the previous run, as nothing it depends on changed
+    reused: bool = False
+    previous_seconds: float | None = None
+
+
+class Watcher:
+    def __init__(
+        self, day_directory: pathlib.Path, names: list[str] | None = None
+    ):
+        self.day_directory = day_directory
+        # Input files to run, all the text files of the day by default
+        self.names = names
+        self.module: ModuleType | None = None
+        self.load_error: str | None = None
+        # Modification time and size of the watched files; the size
+        # catches quick successive saves within the resolution of the time
+        self.mtimes: dict[pathlib.Path, tuple[int, int]] = {}
+        # Last run of each phase on each input file, by file name and
+        # phase; the answer of a parse is the parsed input
+        self.runs: dict[tuple[str, str], Run] = {}
+
+    def inputs(self) -> list[pathlib.Path]:
+        if self.names is None:
+            return sorted(self.day_directory.glob("*.txt"))
+        return [self.day_directory / name for name in self.names]
+
+    def files(self) -> list[pathlib.Path]:
+        try:
+            return results.dependencies(self.day_directory)
+        except SyntaxError:
+            # Imports cannot be read until the file is fixed, so keep
+            # watching the files known so far
+            return list(self.mtimes) or [self.day_directory / "run.py"]
+
+    def changed(self) -> list[pathlib.Path]:
+        mtimes = {}
+        for path in self.files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            mtimes[path] = (stat.st_mtime_ns, stat.st_size)
+        changed = [
+            path
+            for path in mtimes.keys() | self.mtimes.keys()
+            if mtimes.get(path) != self.mtimes.get(path)
+        ]
+        self.mtimes = mtimes
+        return sorted(changed)
+
+    def wait(self, interval: float = INTERVAL) -> list[pathlib.Path]:
+        """Blocks until some of the files change, and returns them."""
+
+        while True:
+            time.sleep(interval)
+            if changed := self.changed():
+                return changed
+
+    def reload(self, changed: list[pathlib.Path]) -> None:
+        """Loads the day, or reloads the changed modules and the day."""
+
+        self.load_error = None
+        try:
+            if self.module is None:
+                self.module = days.load(self.day_directory)
+                return
+            for path in changed:
+                if path.suffix != ".py" or path.name == "run.py":
+                    continue
+                name = ".".join(
+                    path.relative_to(days.ROOT).with_suffix("").parts
+                )
+                if name in sys.modules:
+                    importlib.reload(sys.modules[name])
+                # Library code is not fingerprinted, so rerun everything
+                self.runs = {
+                    key: dataclasses.replace(run, fingerprint="")
+                    for key, run in self.runs.items()
+                }
+            # inspect.getsource reads through the line cache
+            linecache.checkcache()
+            # What importlib.reload does, except that the day is found by
+            # its file location rather than looked up by name
+            spec = self.module.__spec__
+            assert spec is not None and spec.loader is not None
+            spec.loader.exec_module(self.module)
+        except Exception as error:
+            self.load_error = parallel.describe(error)
+
+    def run_phase(
+        self,
+        source: str,
+        phase: str,
+        key: str,
+        solve: Callable[[Any], Any],
+        argument: Callable[[], Any],
+    ) -> Run:
+        previous = self.runs.get((source, phase))
+        if previous is not None and previous.fingerprint == key:
+            previous = dataclasses.replace(previous, reused=True)
+            self.runs[source, phase] = previous
+            return previous
+        run = Run(source, phase, key)
+        if previous is not None:
+            run.previous_seconds = (
+                previous.seconds
+                if previous.seconds is not None
+                else previous.previous_seconds
+            )
+        try:
+            argument = argument()
+            start = time.perf_counter()
+            run.answer = solve(argument)
+            run.seconds = time.perf_counter() - start
+        except Exception as error:
+            run.error = parallel.describe(error)
+        self.runs[source, phase] = run
+        return run
+
+    def run(self) -> list[Run]:
+        """Runs every phase on every input file, reusing what it can."""
+
+        module = self.module
+        if module is None:
+            return []
+        runs = []
+        for path in self.inputs():
+            text = path.read_text()
+            text_hash = hashlib.sha256(text.encode()).hexdigest()
+            parse_key = text_hash + fingerprint(module, "parse")
+            parse = self.run_phase(
+                path.name, "parse", parse_key, module.parse, lambda: text
+            )
+            runs.append(parse)
+            if parse.error is not None:
+                continue
+            parsed = parse.answer
+            for part in days.PARTS:
+                solve = getattr(module, part, None)
+                if solve is None:
+                    continue
+                runs.append(
+                    self.run_phase(
+                        path.name,
+                        part,
+                        parse_key + fingerprint(module, part),
+                        solve,
+                        # Parts may modify their input, which is kept
+                        lambda: copy.deepcopy(parsed),
+                    )
+                )
+        return runs
+
+
+def format_runs(runs: list[Run]) -> str:
+    lines = []
+    for run in runs:
+        if run.error is not None:
+            outcome = run.error
+        elif run.phase == "parse":
+            outcome = ""
+        else:
+            outcome = repr(run.answer)
+        if run.reused:
+            timing = "unchanged"
+        elif run.seconds is None:
+            timing = "failed"
+        elif run.previous_seconds is None:
+            timing = f"{run.seconds * 1000:.3f} ms"
+        else:
+            change = run.seconds / run.previous_seconds - 1
+            timing = f"{run.seconds * 1000:.3f} ms ({change:+.0%})"
+        lines.append(
+            f"{run.source:<24} {run.phase:<6} {timing:>20}  {outcome}"
+        )
+    return "\n".join(lines)
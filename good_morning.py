@@ -1,38 +1,99 @@
 #!/usr/bin/env python
 
-import os
+import pathlib
+import stat
 
-TEMPLATE = """\
+from aoc import days
+
+TEMPLATE = '''\
 #!/usr/bin/env python
 
-from rich import print as rprint
+import copy
+import pathlib
+import random
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from aoc.output import print  # noqa: E402
+
+HERE = pathlib.Path(__file__).parent
+
+# Expected part 1 and part 2 answers of each input file, None until known
+ANSWERS = {
+    "example.txt": (None, None),
+    "input.txt": (None, None),
+}
+
+
+def parse(text):
+    return text.splitlines()
+
+
+def part1(lines):
+    return len(lines)
+
+
+def part2(lines):
+    return len(lines)
+
+
+# Add a "reference" engine next to "fast" when optimizing a part, and
+# check them with `python -m aoc diff`
+ENGINES = {"part1": {"fast": part1}, "part2": {"fast": part2}}
+
+
+def microbenchmarks(lines):
+    """The hot inner functions, with arguments they are called with."""
+
+    return {}
+
+
+def generate(scale=1, seed=0):
+    """Synthetic input with `scale` times the lines of the real one."""
+
+    rng = random.Random(seed)
+    return "\\n".join(str(rng.randint(0, 99)) for _ in range(1000 * scale))
 
 
 def main():
-    rprint("All tests passed.")
+    for name, answers in ANSWERS.items():
+        parsed = parse((HERE / name).read_text())
+        for solve, answer in zip((part1, part2), answers):
+            if answer is not None:
+                # Parts may modify their input
+                assert solve(copy.deepcopy(parsed)) == answer, (name, solve)
+    print("All tests passed.")
 
 
 if __name__ == "__main__":
     main()
-"""
+'''
 
 
 def main():
-    day = str(
-        max(
-            [int(path) for path in os.listdir(".") if path.isdigit()],
-            default=0,
-        )
-        + 1
-    ).zfill(2)
-    os.mkdir(day)
-    run_path = f"./{day}/run.py"
-    with open(run_path, "w") as f:
-        f.write(TEMPLATE)
-    os.system(f"chmod +x {run_path}")
-    os.system(f"touch ./{day}/input.txt")
-    os.system(f"touch ./{day}/example.txt")
+    # Every numbered directory, even one without a run.py yet
+    existing = [
+        int(path.name) for path in days.ROOT.iterdir() if path.name.isdigit()
+    ]
+    day = str(max(existing, default=0) + 1).zfill(2)
+    day_directory = days.ROOT / day
+    day_directory.mkdir()
+    run_path = day_directory / "run.py"
+    run_path.write_text(TEMPLATE)
+    run_path.chmod(
+        run_path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
+    )
+    (day_directory / "input.txt").touch()
+    (day_directory / "example.txt").touch()
+    # The runners find days by their directory, so check that they do and
+    # that the skeleton loads, parses and generates
+    assert day_directory in days.day_directories()
+    module = days.load(day_directory)
+    days.solve(day)
+    module.parse(module.generate())
     print(f"Created template for day {int(day)}. Good luck!")
+    print(f"Time it with: python -m aoc bench {day}")
 
 
 if __name__ == "__main__":